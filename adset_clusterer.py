@@ -0,0 +1,209 @@
+"""
+Adset Clusterer - Groups adsets with similar ROAS/CTR/spend trajectories using streaming MiniBatchKMeans
+"""
+import numpy as np
+import pandas as pd
+from sklearn.cluster import MiniBatchKMeans
+
+
+class AdsetClusterer:
+    def __init__(self, data_agent, config):
+        self.data_agent = data_agent
+        self.config = config
+        settings = config.get('clustering', {})
+        self.n_clusters = settings.get('n_clusters', 6)
+        self.n_bins = settings.get('trajectory_bins', 6)
+        self.min_days = settings.get('min_days', 5)
+        self.batch_size = settings.get('batch_size', 1024)
+        self.epochs = settings.get('epochs', 10)
+        self.decline_pct = settings.get('decline_pct', 20)
+        self.min_cluster_size = settings.get('min_cluster_size', 5)
+        self.random_state = config.get('random_seed', 42)
+        self.keys = ['campaign_name', 'adset_name']
+        self.adsets = None
+        self.features = None
+        self.model = None
+
+    def build_features(self):
+        """Fixed-length float32 trajectory per adset: ROAS, CTR and spend over equal time bins of even days"""
+        daily = self.data_agent.get_time_series_data(groupby=self.keys + ['date'])
+        active = daily.groupby(self.keys, sort=True)['date'].transform('size')
+        daily = daily[active >= self.min_days]
+        if len(daily[self.keys].drop_duplicates()) < 2:
+            self.adsets = pd.DataFrame(columns=self.keys + ['spend', 'revenue', 'roas', 'ctr', 'roas_change_pct',
+                                                            'heldout_change_pct'])
+            self.features = np.empty((0, 3 * self.n_bins + 1), dtype=np.float32)
+            return self.features
+
+        # bin every day of the overall date range, then sum each (adset, bin) with one bincount
+        codes, adsets = pd.MultiIndex.from_frame(daily[self.keys]).factorize()
+        start, end = daily['date'].min(), daily['date'].max()
+        span = max((end - start).days + 1, self.n_bins)
+        offset = (daily['date'] - start).dt.days.to_numpy()
+        bins = np.minimum(offset * self.n_bins // span, self.n_bins - 1)
+        cells = codes * self.n_bins + bins
+        size = len(adsets) * self.n_bins
+        # odd days are held out of the features so the evaluator can test clusters on data they were not formed from
+        heldout = offset % 2 == 1
+
+        def binned(column, days):
+            weights = np.where(days, daily[column].to_numpy(np.float64), 0.0)
+            return np.bincount(cells, weights=weights, minlength=size).reshape(-1, self.n_bins)
+
+        def ratio(num, den):
+            return num / np.where(den > 0, den, np.nan)
+
+        def change_pct(spend, revenue):
+            # ROAS change from the first to the second half of the bins, relative to the overall ROAS
+            half = self.n_bins // 2
+            early = ratio(revenue[:, :half].sum(axis=1), spend[:, :half].sum(axis=1))
+            late = ratio(revenue[:, half:].sum(axis=1), spend[:, half:].sum(axis=1))
+            overall = ratio(revenue.sum(axis=1), spend.sum(axis=1))
+            return (late - early) / np.where(overall > 0, overall, np.nan)
+
+        spend, revenue = binned('spend', ~heldout), binned('revenue', ~heldout)
+        clicks, impressions = binned('clicks', ~heldout), binned('impressions', ~heldout)
+        heldout_spend, heldout_revenue = binned('spend', heldout), binned('revenue', heldout)
+        total_spend = spend.sum(axis=1)
+        roas = ratio(revenue.sum(axis=1), total_spend)
+        ctr = ratio(clicks.sum(axis=1), impressions.sum(axis=1))
+
+        with np.errstate(divide='ignore', invalid='ignore'):
+            # shapes relative to the adset's own level; empty bins sit at the level (1.0)
+            roas_shape = revenue / spend / roas[:, None]
+            ctr_shape = clicks / impressions / ctr[:, None]
+            spend_shape = spend / total_spend[:, None] * self.n_bins
+            level = np.log(roas / (revenue.sum() / spend.sum()))
+        roas_shape = np.clip(np.nan_to_num(roas_shape, nan=1.0, posinf=1.0), 0, 3)
+        ctr_shape = np.clip(np.nan_to_num(ctr_shape, nan=1.0, posinf=1.0), 0, 3)
+        # an adset can spend only on held-out days (e.g. in a sparse sample): spread it evenly
+        spend_shape = np.nan_to_num(spend_shape, nan=1.0)
+        level = np.clip(np.nan_to_num(level, nan=0.0, posinf=0.0, neginf=0.0), -2, 2)
+
+        self.adsets = pd.DataFrame({
+            'campaign_name': adsets.get_level_values(0),
+            'adset_name': adsets.get_level_values(1),
+            'spend': total_spend + heldout_spend.sum(axis=1),
+            'revenue': revenue.sum(axis=1) + heldout_revenue.sum(axis=1),
+            'roas': roas,
+            'ctr': ctr,
+            'roas_change_pct': change_pct(spend, revenue) * 100,
+            'heldout_change_pct': change_pct(heldout_spend, heldout_revenue) * 100
+        })
+        self.features = np.hstack([roas_shape, ctr_shape, spend_shape, level[:, None]]).astype(np.float32)
+        return self.features
+
+    def _batches(self, rng):
+        n = len(self.features)
+        for _ in range(self.epochs):
+            order = rng.permutation(n)
+            for start in range(0, n, self.batch_size):
+                yield self.features[order[start:start + self.batch_size]]
+
+    def fit(self):
+        """Stream shuffled feature batches through partial_fit, then label adsets chunk by chunk"""
+        print("\nClustering adset trajectories...")
+        if self.features is None:
+            self.build_features()
+        if len(self.features) < 2:
+            print(f"Fewer than 2 adsets with >= {self.min_days} active days, nothing to cluster")
+            return self.adsets
+
+        n_clusters = min(self.n_clusters, len(self.features))
+        self.model = MiniBatchKMeans(n_clusters=n_clusters, batch_size=self.batch_size,
+                                     random_state=self.random_state, n_init=3)
+        rng = np.random.default_rng(self.random_state)
+        pending = None
+        for batch in self._batches(rng):
+            # the first partial_fit needs at least n_clusters rows to seed the centers
+            pending = batch if pending is None else np.vstack([pending, batch])
+            if len(pending) >= n_clusters:
+                self.model.partial_fit(pending)
+                pending = None
+
+        self.adsets['cluster'] = np.concatenate([
+            self.model.predict(self.features[start:start + self.batch_size])
+            for start in range(0, len(self.features), self.batch_size)
+        ])
+        print(f"Clustered {len(self.adsets)} adsets (>= {self.min_days} active days) into {n_clusters} clusters")
+        return self.adsets
+
+    def _audience_mix(self):
+        """Adsets with the audience type that took most of their spend"""
+        mix = self.data_agent.aggregate(self.keys + ['audience_type'], ['spend'])
+        mix = mix.sort_values('spend', ascending=False, kind='stable').drop_duplicates(self.keys)
+        return self.adsets.merge(mix[self.keys + ['audience_type']], on=self.keys, how='left')
+
+    def summarize(self):
+        """Size, spend, ROAS trend and dominant audience of every cluster, with a descriptive label"""
+        if self.model is None:
+            self.fit()
+        if self.model is None:
+            return []
+
+        adsets = self._audience_mix()
+        total_spend = adsets['spend'].sum()
+        clusters = []
+        for cluster, members in adsets.groupby('cluster'):
+            change = members['roas_change_pct'].dropna()
+            heldout = members['heldout_change_pct'].dropna()
+            rest = adsets.loc[adsets['cluster'] != cluster, 'heldout_change_pct'].dropna()
+            audience = members.groupby('audience_type')['spend'].sum().sort_values(ascending=False)
+            audience_share = audience.iloc[0] / audience.sum() if audience.sum() > 0 else 0.0
+
+            weighted_change = np.average(change, weights=members.loc[change.index, 'spend']) if len(change) else 0.0
+            trend = ('fast-fatiguing' if weighted_change < -self.decline_pct
+                     else 'improving' if weighted_change > self.decline_pct else 'stable')
+            segment = audience.index[0].lower() if audience_share >= 0.5 else 'mixed-audience'
+
+            clusters.append({
+                'cluster': int(cluster),
+                'label': f"{trend} {segment}",
+                'trend': trend,
+                'adsets': len(members),
+                'spend_share': float(members['spend'].sum() / total_spend),
+                'roas': float(members['revenue'].sum() / members['spend'].sum()),
+                'roas_change_pct': float(weighted_change),
+                'heldout_change_mean': float(heldout.mean()) if len(heldout) else 0.0,
+                'heldout_change_std': float(heldout.std()) if len(heldout) > 1 else 0.0,
+                'heldout_measured': len(heldout),
+                'rest_heldout_change_mean': float(rest.mean()) if len(rest) else 0.0,
+                'rest_heldout_change_std': float(rest.std()) if len(rest) > 1 else 0.0,
+                'rest_heldout_measured': len(rest),
+                'dominant_audience': audience.index[0],
+                'audience_share': float(audience_share),
+                'top_adsets': members.nlargest(5, 'spend')[self.keys].to_dict('records')
+            })
+        return sorted(clusters, key=lambda c: c['spend_share'], reverse=True)
+
+    def cluster_hypotheses(self):
+        """One InsightAgent hypothesis per cluster large enough to test"""
+        hypotheses = []
+        for i, cluster in enumerate(c for c in self.summarize() if c['adsets'] >= self.min_cluster_size):
+            hypotheses.append({
+                "id": f"C{i + 1}",
+                "hypothesis": f"Adset cluster C{i + 1} ({cluster['label']}) shares a ROAS trajectory",
+                "description": f"{cluster['adsets']} adsets ({cluster['spend_share']:.0%} of spend, ROAS "
+                               f"{cluster['roas']:.2f}) moved {cluster['roas_change_pct']:+.1f}% in ROAS from the "
+                               f"first to the second half of the period",
+                "evidence": cluster,
+                "priority": "HIGH" if cluster['trend'] == 'fast-fatiguing' else "MEDIUM",
+                "validation_method": "cluster_trajectory_test"
+            })
+        return hypotheses
+
+
+if __name__ == "__main__":
+    import json
+    import yaml
+    from data_agent import DataAgent
+
+    with open('config.yaml', 'r') as f:
+        config = yaml.safe_load(f)
+
+    data_agent = DataAgent()
+    data_agent.load_data()
+
+    clusterer = AdsetClusterer(data_agent, config)
+    for cluster in clusterer.summarize():
+        print(json.dumps({k: v for k, v in cluster.items() if k != 'top_adsets'}))
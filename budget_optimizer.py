@@ -0,0 +1,164 @@
+"""
+Budget Optimizer - Revenue-maximizing daily spend allocation across adsets
+"""
+import numpy as np
+import pandas as pd
+
+
+class BudgetOptimizer:
+    def __init__(self, data_agent, config):
+        self.data_agent = data_agent
+        self.config = config
+        settings = config.get('budget', {})
+        self.total_daily = settings.get('total_daily')
+        self.min_fraction = settings.get('min_fraction', 0.5)
+        self.max_fraction = settings.get('max_fraction', 2.0)
+        self.segments = settings.get('segments', 20)
+        self.min_elasticity = settings.get('min_elasticity', 0.1)
+        self.max_elasticity = settings.get('max_elasticity', 0.95)
+        self.keys = ['campaign_name', 'adset_name']
+        self.curves = None
+        self.allocation = None
+
+    def fit_response_curves(self):
+        """Fit revenue = a * spend^b per adset on daily points (log-log least squares)"""
+        daily = self.data_agent.get_time_series_data(groupby=self.keys + ['date'])
+        daily = daily[(daily['spend'] > 0) & (daily['revenue'] > 0)].copy()
+        daily['x'] = np.log(daily['spend'])
+        daily['y'] = np.log(daily['revenue'])
+        daily['xx'] = daily['x'] ** 2
+        daily['xy'] = daily['x'] * daily['y']
+
+        m = daily.groupby(self.keys).agg(
+            n=('x', 'size'), sx=('x', 'sum'), sy=('y', 'sum'), sxx=('xx', 'sum'), sxy=('xy', 'sum'),
+            current_spend=('spend', 'mean')
+        )
+
+        # pooled elasticity for adsets with too few distinct spend levels to fit their own;
+        # without any spend variation it is unidentified, so take the middle of the allowed range
+        x_c = daily['x'] - daily['x'].mean()
+        ss = float((x_c ** 2).sum())
+        if ss > 1e-12:
+            pooled = float((x_c * (daily['y'] - daily['y'].mean())).sum() / ss)
+        else:
+            pooled = (self.min_elasticity + self.max_elasticity) / 2
+
+        denom = m['n'] * m['sxx'] - m['sx'] ** 2
+        own = (m['n'] * m['sxy'] - m['sx'] * m['sy']) / denom.where((denom > 1e-9) & (m['n'] >= 3))
+        b = own.fillna(pooled).clip(self.min_elasticity, self.max_elasticity)
+        log_a = (m['sy'] - b * m['sx']) / m['n']
+
+        curves = pd.DataFrame({'a': np.exp(log_a), 'b': b, 'current_spend': m['current_spend'],
+                               'observations': m['n']})
+        self.curves = curves.reset_index()
+        return self.curves
+
+    def optimize(self, total_budget=None):
+        """Greedy marginal-ROAS allocation over piecewise-linear response curves"""
+        if self.curves is None:
+            self.fit_response_curves()
+
+        print("\nOptimizing budget allocation...")
+        curves = self.curves
+        a = curves['a'].to_numpy()
+        b = curves['b'].to_numpy()
+        current = curves['current_spend'].to_numpy()
+        lower = current * self.min_fraction
+        upper = current * self.max_fraction
+
+        budget = total_budget if total_budget is not None else self.total_daily
+        if budget is None:
+            budget = current.sum()
+        budget = float(np.clip(budget, lower.sum(), upper.sum()))
+
+        # K equal-width segments per adset; concave curves give decreasing marginal ROAS within
+        # each adset, so taking segments in global marginal order is exactly the heap-based greedy
+        k = self.segments
+        breaks = lower[:, None] + (upper - lower)[:, None] * np.linspace(0, 1, k + 1)[None, :]
+        revenue_at = a[:, None] * breaks ** b[:, None]
+        widths = np.diff(breaks, axis=1).ravel()
+        marginal = (np.diff(revenue_at, axis=1).ravel() / np.where(widths > 0, widths, np.inf))
+
+        order = np.argsort(-marginal, kind='stable')
+        taken = np.cumsum(widths[order])
+        remaining = budget - lower.sum()
+        full = taken <= remaining
+        extra = np.zeros_like(widths)
+        extra[order[full]] = widths[order[full]]
+        n_full = int(full.sum())
+        if n_full < len(order):
+            leftover = remaining - (taken[n_full - 1] if n_full else 0.0)
+            extra[order[n_full]] = leftover
+
+        recommended = lower + extra.reshape(-1, k).sum(axis=1)
+
+        allocation = curves[self.keys].copy()
+        allocation['current_spend'] = current
+        allocation['recommended_spend'] = recommended
+        allocation['change'] = recommended - current
+        allocation['current_revenue_est'] = a * current ** b
+        allocation['expected_revenue'] = a * recommended ** b
+        allocation['marginal_roas'] = a * b * recommended ** (b - 1)
+        self.allocation = allocation.sort_values('change')
+
+        current_revenue = float(allocation['current_revenue_est'].sum())
+        expected_revenue = float(allocation['expected_revenue'].sum())
+        print(f"Allocated ${budget:,.2f}/day across {len(allocation)} adsets, "
+              f"expected revenue {current_revenue:,.2f} -> {expected_revenue:,.2f}")
+
+        return {
+            'total_daily_budget': budget,
+            'adsets': len(allocation),
+            'current_revenue_est': current_revenue,
+            'expected_revenue': expected_revenue,
+            'expected_uplift_pct': (expected_revenue / current_revenue - 1) * 100 if current_revenue else 0.0,
+            'increase': self._moves(self.allocation.iloc[::-1]),
+            'decrease': self._moves(self.allocation)
+        }
+
+    def _moves(self, ordered, top_n=5):
+        """Largest spend changes as records"""
+        moves = []
+        for row in ordered.head(top_n).itertuples(index=False):
+            moves.append({
+                'campaign_name': row.campaign_name,
+                'adset_name': row.adset_name,
+                'current_spend': float(row.current_spend),
+                'recommended_spend': float(row.recommended_spend),
+                'change': float(row.change),
+                'marginal_roas': float(row.marginal_roas)
+            })
+        return moves
+
+    @staticmethod
+    def format_budget_report(result):
+        """Format the allocation summary as a markdown section"""
+        report = "\n## Budget Reallocation\n\n"
+        report += f"Optimizing a ${result['total_daily_budget']:,.2f} daily budget (adset spend per active day) "
+        report += f"across {result['adsets']} adsets is expected to move daily revenue from ${result['current_revenue_est']:,.2f} "
+        report += f"to ${result['expected_revenue']:,.2f} ({result['expected_uplift_pct']:+.1f}%).\n\n"
+
+        for title, key in [("Increase spend", 'increase'), ("Decrease spend", 'decrease')]:
+            report += f"**{title}:**\n"
+            for move in result[key]:
+                report += f"- {move['campaign_name']} / {move['adset_name']}: "
+                report += f"${move['current_spend']:,.2f} -> ${move['recommended_spend']:,.2f} "
+                report += f"(marginal ROAS {move['marginal_roas']:.2f})\n"
+            report += "\n"
+
+        return report
+
+
+if __name__ == "__main__":
+    import yaml
+    from data_agent import DataAgent
+
+    with open('config.yaml', 'r') as f:
+        config = yaml.safe_load(f)
+
+    data_agent = DataAgent()
+    data_agent.load_data()
+
+    optimizer = BudgetOptimizer(data_agent, config)
+    result = optimizer.optimize()
+    print(BudgetOptimizer.format_budget_report(result))
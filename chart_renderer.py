@@ -0,0 +1,179 @@
+"""
+Chart Renderer - Campaign trend and dimension comparison charts, rendered in parallel and cached by content
+"""
+import glob
+import hashlib
+import json
+import multiprocessing
+import os
+import re
+import time
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+# bump when the drawing code changes so cached images are re-rendered
+CHART_STYLE_VERSION = 1
+COMPARISON_DIMENSIONS = ['platform', 'creative_type', 'audience_type']
+
+
+def pool_context():
+    """forkserver so workers do not inherit locks held by the pipeline's other threads; spawn where it is missing"""
+    methods = multiprocessing.get_all_start_methods()
+    return multiprocessing.get_context('forkserver' if 'forkserver' in methods else 'spawn')
+
+
+def render_chart(spec, path):
+    """Draw one chart spec to a PNG with the Agg canvas (no pyplot state, safe in workers)"""
+    from matplotlib.backends.backend_agg import FigureCanvasAgg
+    from matplotlib.figure import Figure
+
+    fig = Figure(figsize=(8, 3.2), dpi=spec.get('dpi', 100))
+    FigureCanvasAgg(fig)
+    axes = fig.subplots(1, 2)
+
+    for ax, (metric, values) in zip(axes, spec['series'].items()):
+        if spec['kind'] == 'trend':
+            ax.plot(range(len(values)), values, marker='.', linewidth=1)
+            ticks = list(range(0, len(spec['x']), max(len(spec['x']) // 4, 1)))
+            ax.set_xticks(ticks)
+            ax.set_xticklabels([spec['x'][i][5:] for i in ticks], fontsize=7)
+        else:
+            ax.bar(range(len(values)), values, color='#4C72B0')
+            ax.set_xticks(range(len(spec['x'])))
+            ax.set_xticklabels(spec['x'], fontsize=7, rotation=20)
+        ax.set_title(metric.upper(), fontsize=9)
+        ax.tick_params(axis='y', labelsize=7)
+        ax.grid(alpha=0.3)
+
+    fig.suptitle(spec['title'], fontsize=10)
+    fig.tight_layout()
+    fig.savefig(path)
+    return path
+
+
+class ChartRenderer:
+    def __init__(self, data_agent, config):
+        self.data_agent = data_agent
+        self.config = config
+        settings = config.get('charts', {})
+        self.chart_dir = settings.get('dir', 'reports/charts')
+        self.top_campaigns = settings.get('top_campaigns', 20)
+        # more processes than cores only adds start-up cost
+        self.max_workers = min(settings.get('max_workers', 4), os.cpu_count() or 1)
+        self.min_parallel = settings.get('min_parallel', 8)
+        self.dpi = settings.get('dpi', 100)
+        self.stats = {}
+
+    @staticmethod
+    def _values(series):
+        """JSON-stable floats (NaN as None) so equal data hashes equally"""
+        return [None if v != v else round(float(v), 6) for v in series]
+
+    def build_specs(self):
+        """Aggregated series behind every chart: top campaigns by spend and each comparison dimension"""
+        specs = []
+        daily = self.data_agent.get_time_series_data(groupby=['campaign_name', 'date'])
+        spend = daily.groupby('campaign_name')['spend'].sum().sort_values(ascending=False)
+        campaigns = spend.index if self.top_campaigns is None else spend.index[:self.top_campaigns]
+
+        for campaign, series in daily[daily['campaign_name'].isin(campaigns)].groupby('campaign_name', sort=False):
+            series = series.sort_values('date')
+            specs.append({
+                'kind': 'trend',
+                'name': campaign,
+                'title': f"{campaign} - daily ROAS / CTR",
+                'x': series['date'].dt.strftime('%Y-%m-%d').tolist(),
+                'series': {'roas': self._values(series['roas']), 'ctr': self._values(series['ctr'])}
+            })
+
+        for dimension in COMPARISON_DIMENSIONS:
+            stats = self.data_agent.aggregate(dimension, ['roas', 'ctr'])
+            specs.append({
+                'kind': 'comparison',
+                'name': dimension,
+                'title': f"ROAS / CTR by {dimension.replace('_', ' ')}",
+                'x': stats[dimension].astype(str).tolist(),
+                'series': {'roas': self._values(stats['roas']), 'ctr': self._values(stats['ctr'])}
+            })
+
+        # campaigns first by spend, comparisons last, so the report order is stable
+        order = {name: i for i, name in enumerate(campaigns)}
+        specs.sort(key=lambda s: (s['kind'] != 'trend', order.get(s['name'], 0)))
+        return specs
+
+    def _paths(self, spec):
+        """Image path keyed by chart identity and a content hash of its data"""
+        slug = re.sub(r'[^a-z0-9]+', '-', spec['name'].lower()).strip('-')[:40]
+        identity = hashlib.sha256(f"{spec['kind']}|{spec['name']}".encode('utf-8')).hexdigest()[:8]
+        content = dict(spec, dpi=self.dpi, style=CHART_STYLE_VERSION)
+        digest = hashlib.sha256(json.dumps(content, sort_keys=True).encode('utf-8')).hexdigest()[:12]
+        prefix = os.path.join(self.chart_dir, f"{spec['kind']}-{slug}-{identity}")
+        return f"{prefix}-{digest}.png", prefix
+
+    def render(self):
+        """Render charts whose data changed; unchanged ones are reused from disk"""
+        print("\nRendering charts...")
+        start = time.perf_counter()
+        os.makedirs(self.chart_dir, exist_ok=True)
+
+        charts, missing = [], []
+        for spec in self.build_specs():
+            path, prefix = self._paths(spec)
+            cached = os.path.exists(path)
+            if not cached:
+                missing.append((dict(spec, dpi=self.dpi), path))
+                # drop this chart's image for older data
+                for stale in glob.glob(glob.escape(prefix) + '-*.png'):
+                    os.remove(stale)
+            charts.append({'kind': spec['kind'], 'title': spec['title'], 'path': path, 'cached': cached})
+
+        if len(missing) >= self.min_parallel and self.max_workers > 1:
+            try:
+                with ProcessPoolExecutor(max_workers=self.max_workers, mp_context=pool_context()) as pool:
+                    list(pool.map(render_chart, *zip(*missing)))
+            except BrokenProcessPool:
+                # e.g. __main__ cannot be re-imported by the workers; finish in this process
+                print("Chart worker pool failed, rendering inline")
+                for spec, path in missing:
+                    if not os.path.exists(path):
+                        render_chart(spec, path)
+        else:
+            for spec, path in missing:
+                render_chart(spec, path)
+
+        self.stats = {'charts': len(charts), 'rendered': len(missing), 'cached': len(charts) - len(missing),
+                      'seconds': time.perf_counter() - start}
+        print(f"Rendered {self.stats['rendered']} charts, reused {self.stats['cached']} "
+              f"in {self.stats['seconds']:.2f}s")
+        return charts
+
+    @staticmethod
+    def format_charts_report(charts, report_path='reports/report.md'):
+        """Markdown section embedding the charts relative to the report file"""
+        if not charts:
+            return ""
+        report_dir = os.path.dirname(report_path) or '.'
+        report = "\n## Charts\n\n"
+        for kind, heading in [('comparison', 'Dimension Comparison'), ('trend', 'Campaign Trends')]:
+            selected = [c for c in charts if c['kind'] == kind]
+            if selected:
+                report += f"### {heading}\n\n"
+                for chart in selected:
+                    link = os.path.relpath(chart['path'], report_dir).replace(os.sep, '/')
+                    report += f"![{chart['title']}]({link.replace(' ', '%20')})\n\n"
+        return report
+
+
+if __name__ == "__main__":
+    import yaml
+    from data_agent import DataAgent
+
+    with open('config.yaml', 'r') as f:
+        config = yaml.safe_load(f)
+
+    data_agent = DataAgent()
+    data_agent.load_data()
+
+    renderer = ChartRenderer(data_agent, config)
+    charts = renderer.render()
+    print(json.dumps(renderer.stats, indent=2))
@@ -2,58 +2,70 @@ import pandas as pd
 import numpy as np
 import re
 from collections import Counter
+from variant_cache import VariantCache
 
 class CreativeGenerator:
     def __init__(self, data_agent, config):
         self.data_agent = data_agent
         self.config = config
         self.recommendations = []
+        self.variant_cache = VariantCache(config)
         
     def generate_recommendations(self):
         """Generate creative recommendations for low-performing ads"""
         print("\nGenerating creative recommendations...")
         
-        segments = self.data_agent.segment_by_performance()
-        low_ctr_ads = segments['low_ctr_ads']
-        high_ctr_ads = segments['high_ctr_ads']
-        
         recommendations = []
         
         # Analyze what works in high-performing ads
-        successful_patterns = self._extract_message_patterns(high_ctr_ads)
-        
-        # Group low-performing ads by campaign/adset
-        for (campaign, adset), group in low_ctr_ads.groupby(['campaign_name', 'adset_name']):
-            
-            if len(group) == 0:
-                continue
+        successful_patterns = self._extract_message_patterns(self.data_agent.segment_messages('ctr', below=False))
+        top_messages = self._top_messages_by_type()
+        context = VariantCache.fingerprint([successful_patterns, {str(t): m for t, m in top_messages.items()}])
+        
+        # Low-performing ads per campaign/adset: the first ad's message/type and the group's totals
+        groups = self.data_agent.segment_adsets('ctr', below=True)
+        
+        for group in groups.itertuples(index=False):
+            # Variants and rationale depend only on the message and creative type, so adsets share them
+            message, creative_type = group.creative_message, group.creative_type
+            key = VariantCache.make_key(context, message, creative_type)
+            cached = self.variant_cache.get(key)
+            if cached is None:
+                top = top_messages.get(creative_type, top_messages[None])
+                cached = {
+                    'recommendations': self._generate_new_messages(message, top),
+                    'rationale': self._generate_rationale(message, creative_type, successful_patterns)
+                }
+                self.variant_cache.put(key, cached)
             
-            # Get representative ad from this group
-            sample_ad = group.iloc[0]
-            
-            # Generate recommendations
-            new_messages = self._generate_new_messages(
-                sample_ad,
-                successful_patterns,
-                high_ctr_ads
-            )
+            if self.data_agent.additive:
+                avg_ctr = group.clicks / group.impressions if group.impressions > 0 else np.nan
+                avg_roas = group.revenue / group.spend if group.spend > 0 else np.nan
+            else:
+                avg_ctr = group.ctr
+                avg_roas = group.roas
             
             recommendation = {
-                'campaign_name': campaign,
-                'adset_name': adset,
+                'campaign_name': group.campaign_name,
+                'adset_name': group.adset_name,
                 'current_performance': {
-                    'avg_ctr': float(group['ctr'].mean()),
-                    'avg_roas': float(group['roas'].mean()),
-                    'spend': float(group['spend'].sum())
+                    'avg_ctr': float(avg_ctr),
+                    'avg_roas': float(avg_roas),
+                    'spend': float(group.spend)
                 },
-                'current_message': sample_ad['creative_message'],
-                'current_creative_type': sample_ad['creative_type'],
-                'recommendations': new_messages,
-                'rationale': self._generate_rationale(sample_ad, successful_patterns)
+                'current_message': message,
+                'current_creative_type': creative_type,
+                'recommendations': [dict(m) for m in cached['recommendations']],
+                'rationale': list(cached['rationale'])
             }
             
             recommendations.append(recommendation)
         
+        self.variant_cache.save()
+        print(f"Built {len(recommendations)} adset recommendations from "
+              f"{self.variant_cache.misses} unique (message, creative type) generations "
+              f"({self.variant_cache.hits} cache hits)")
+        
         # Limit to top N recommendations
         top_n = self.config['agents']['top_creative_samples']
         recommendations = sorted(recommendations, 
@@ -64,44 +76,44 @@ class CreativeGenerator:
         print(f"Generated {len(recommendations)} creative recommendations")
         return recommendations
     
-    def _extract_message_patterns(self, high_performing_ads):
-        """Extract successful patterns from high-performing ads"""
-        messages = high_performing_ads['creative_message'].tolist()
-        
-        # Extract common words and phrases
-        all_words = []
-        for msg in messages:
-            words = re.findall(r'\b\w+\b', msg.lower())
-            all_words.extend(words)
-        
-        word_freq = Counter(all_words)
+    def _extract_message_patterns(self, high_performing_messages):
+        """Extract successful patterns from high-performing ads, given the row count of each message/type"""
+        messages = high_performing_messages['creative_message'].tolist()
+        counts = high_performing_messages['rows'].tolist()
+        total = sum(counts)
+        
+        # Extract common words and phrases, counted once per ad showing them
+        word_freq = Counter()
+        for msg, count in zip(messages, counts):
+            for word in re.findall(r'\b\w+\b', msg.lower()):
+                word_freq[word] += count
         
         # Common CTAs and power words
         cta_words = ['try', 'shop', 'discover', 'get', 'buy', 'limited', 'new', 'best']
         power_words = ['free', 'guarantee', 'exclusive', 'premium', 'comfortable', 'essential']
         
+        type_counts = high_performing_messages.groupby('creative_type', sort=False)['rows'].sum()
         patterns = {
             'top_words': [word for word, count in word_freq.most_common(20)],
-            'avg_length': np.mean([len(msg) for msg in messages]),
-            'has_cta': sum(any(cta in msg.lower() for cta in cta_words) for msg in messages) / len(messages),
-            'has_power_words': sum(any(pw in msg.lower() for pw in power_words) for msg in messages) / len(messages),
-            'creative_type_dist': high_performing_ads['creative_type'].value_counts().to_dict()
+            'avg_length': np.average([len(msg) for msg in messages], weights=counts),
+            'has_cta': sum(count for msg, count in zip(messages, counts)
+                           if any(cta in msg.lower() for cta in cta_words)) / total,
+            'has_power_words': sum(count for msg, count in zip(messages, counts)
+                                   if any(pw in msg.lower() for pw in power_words)) / total,
+            'creative_type_dist': type_counts.sort_values(ascending=False, kind='stable').to_dict()
         }
         
         return patterns
     
-    def _generate_new_messages(self, current_ad, patterns, high_ctr_ads):
+    def _top_messages_by_type(self):
+        """Top 3 high-CTR messages of every creative type; None holds the fallback for types without high-CTR ads"""
+        top = self.data_agent.segment_top('ctr', below=False, n=3, by='creative_type')
+        top_messages = {t: group['creative_message'].tolist() for t, group in top.groupby('creative_type')}
+        top_messages[None] = self.data_agent.segment_top('ctr', below=False, n=3)['creative_message'].tolist()
+        return top_messages
+    
+    def _generate_new_messages(self, current_msg, top_messages):
         """Generate new message suggestions based on successful patterns"""
-        
-        # Sample high-performing messages from similar creative type
-        similar_ads = high_ctr_ads[high_ctr_ads['creative_type'] == current_ad['creative_type']]
-        
-        if len(similar_ads) == 0:
-            similar_ads = high_ctr_ads
-        
-        # Get top 3 messages
-        top_messages = similar_ads.nlargest(3, 'ctr')['creative_message'].tolist()
-        
         new_messages = []
         
         # Recommendation 1: Adapt from best performer
@@ -113,7 +125,6 @@ class CreativeGenerator:
             })
         
         # Recommendation 2: Add strong CTA
-        current_msg = current_ad['creative_message']
         cta_options = [
             "Try now — limited time offer!",
             "Shop the collection today.",
@@ -143,11 +154,11 @@ class CreativeGenerator:
         
         return new_messages
     
-    def _generate_rationale(self, current_ad, patterns):
+    def _generate_rationale(self, current_msg, creative_type, patterns):
         """Generate explanation for recommendations"""
         rationale_points = []
         
-        current_length = len(current_ad['creative_message'])
+        current_length = len(current_msg)
         optimal_length = patterns['avg_length']
         
         if abs(current_length - optimal_length) > 20:
@@ -159,36 +170,39 @@ class CreativeGenerator:
             rationale_points.append("High-performing ads frequently include strong CTAs")
         
         best_creative_type = max(patterns['creative_type_dist'], key=patterns['creative_type_dist'].get)
-        if current_ad['creative_type'] != best_creative_type:
+        if creative_type != best_creative_type:
             rationale_points.append(f"Consider testing {best_creative_type} format")
         
         return rationale_points
     
-    def format_recommendations_report(self):
-        """Format recommendations as markdown report"""
-        report = "\n## Creative Recommendations\n\n"
-        
-        for i, rec in enumerate(self.recommendations, 1):
-            report += f"### Recommendation {i}: {rec['campaign_name']}\n\n"
-            report += f"**Current Performance:**\n"
-            report += f"- CTR: {rec['current_performance']['avg_ctr']:.4f}\n"
-            report += f"- ROAS: {rec['current_performance']['avg_roas']:.2f}\n"
-            report += f"- Spend: ${rec['current_performance']['spend']:.2f}\n\n"
-            
-            report += f"**Current Message:** {rec['current_message']}\n\n"
-            
-            report += f"**New Message Ideas:**\n"
+    @staticmethod
+    def iter_recommendations_report(recommendations, title="## Creative Recommendations"):
+        """Yield the recommendations section as markdown, one recommendation at a time"""
+        yield f"\n{title}\n\n"
+        
+        for i, rec in enumerate(recommendations, 1):
+            parts = [
+                f"### Recommendation {i}: {rec['campaign_name']}\n\n",
+                f"**Current Performance:**\n",
+                f"- CTR: {rec['current_performance']['avg_ctr']:.4f}\n",
+                f"- ROAS: {rec['current_performance']['avg_roas']:.2f}\n",
+                f"- Spend: ${rec['current_performance']['spend']:.2f}\n\n",
+                f"**Current Message:** {rec['current_message']}\n\n",
+                f"**New Message Ideas:**\n"
+            ]
             for j, msg in enumerate(rec['recommendations'], 1):
-                report += f"{j}. {msg['message']}\n"
-                report += f"   - Strategy: {msg['strategy']}\n"
-                report += f"   - Expected lift: {msg['expected_lift']}\n\n"
+                parts.append(f"{j}. {msg['message']}\n")
+                parts.append(f"   - Strategy: {msg['strategy']}\n")
+                parts.append(f"   - Expected lift: {msg['expected_lift']}\n\n")
             
-            report += f"**Rationale:**\n"
-            for point in rec['rationale']:
-                report += f"- {point}\n"
-            report += "\n---\n\n"
-        
-        return report
+            parts.append(f"**Rationale:**\n")
+            parts.extend(f"- {point}\n" for point in rec['rationale'])
+            parts.append("\n---\n\n")
+            yield ''.join(parts)
+    
+    def format_recommendations_report(self):
+        """Format recommendations as markdown report"""
+        return ''.join(self.iter_recommendations_report(self.recommendations))
 
 if __name__ == "__main__":
     import yaml
@@ -3,30 +3,441 @@ import numpy as np
 from datetime import datetime, timedelta
 import yaml
 import json
+import os
+import hashlib
+import threading
+from shared_dataset import SharedDataset
+from data_validator import DataValidator
+from stratified_sampler import StratifiedSampler
+from sketches import SummarySketch
+from sqlite_backend import SQLiteBackend
+from lag_analyzer import LagAnalyzer
+
+ADDITIVE_MEASURES = ['spend', 'revenue', 'impressions', 'clicks', 'purchases']
+MANIFEST_FILE = '_manifest.json'
+SKETCH_FILE = '_sketch.json'
 
 class DataAgent:
     def __init__(self, config_path="config.yaml"):
         with open(config_path, 'r') as f:
             self.config = yaml.safe_load(f)
-        self.df = None
+        self._df = None
+        self.backend = None
+        self._materialize_lock = threading.Lock()
+        self._lags = None
+        self._lag_lock = threading.Lock()
         self.summary = {}
+        self.validation_report = {}
+        self.quarantined = None
+        self.approx = False
+        self.sample_info = {}
+        self.full_partitions = False
+        self.additive = self.config.get('metrics', {}).get('additive_measures', False)
         
-    def load_data(self):
-        """Load the Facebook Ads dataset"""
-        csv_path = self.config['data']['csv_path']
-        print(f"Loading data from {csv_path}...")
-        self.df = pd.read_csv(csv_path)
-        self.df['date'] = pd.to_datetime(self.df['date'])
+    @property
+    def df(self):
+        """Loaded rows; with the SQLite backend they are only materialized when a stage needs them"""
+        if self._df is None and self.backend is not None:
+            with self._materialize_lock:
+                if self._df is None:
+                    print("Materializing rows from SQLite...")
+                    self._df = self.backend.read_frame()
+        return self._df
+    
+    @df.setter
+    def df(self, value):
+        self._df = value
+        self._lags = None
+    
+    def load_data(self, start_date=None, end_date=None, platforms=None):
+        """Load the Facebook Ads dataset, optionally limited to a date window/platforms"""
+        if self.config['data'].get('backend', 'pandas') == 'sqlite':
+            return self._open_sqlite(start_date, end_date, platforms)
+        
+        partition_dir = self.config['data'].get('partition_dir')
+        if partition_dir and os.path.exists(os.path.join(partition_dir, MANIFEST_FILE)):
+            print(f"Loading partitioned data from {partition_dir}...")
+            self.df = self._read_partitions(partition_dir, start_date, end_date, platforms)
+            self.full_partitions = start_date is None and end_date is None and platforms is None
+        else:
+            csv_path = self.config['data']['csv_path']
+            print(f"Loading data from {csv_path}...")
+            self.df = pd.read_csv(csv_path)
+            self.df['date'] = pd.to_datetime(self.df['date'])
+            self.full_partitions = False
+
+        if start_date is not None:
+            self.df = self.df[self.df['date'] >= pd.Timestamp(start_date)]
+        if end_date is not None:
+            self.df = self.df[self.df['date'] <= pd.Timestamp(end_date)]
+        if platforms is not None:
+            self.df = self.df[self.df['platform'].isin(platforms)]
+        self.df = self.df.reset_index(drop=True)
+
+        if self.config.get('validation', {}).get('enabled', False):
+            validator = DataValidator(self.config)
+            self.df, self.quarantined = validator.validate(self.df)
+            self.df = self.df.reset_index(drop=True)
+            self.validation_report = validator.report
+
         print(f"Loaded {len(self.df)} rows, {len(self.df.columns)} columns")
         return self.df
+
+    def load_sample(self):
+        """Switch to the cached spend-weighted stratified sample for approximate answers"""
+        sampler = StratifiedSampler(self.config)
+        self.df = sampler.load_or_draw(self)
+        self.sample_info = sampler.info
+        self.approx = True
+        return self.df
+
+    def _open_sqlite(self, start_date=None, end_date=None, platforms=None):
+        """Use the indexed SQLite database, (re)building it when the source or validation settings changed"""
+        backend = SQLiteBackend(self.config)
+        identity = json.dumps({'source': self.dataset_fingerprint(),
+                               'validation': self.config.get('validation', {})}, sort_keys=True)
+        fingerprint = hashlib.sha256(identity.encode('utf-8')).hexdigest()
+        if backend.source_fingerprint() != fingerprint:
+            backend.ingest(self._source_chunks(backend.chunksize), fingerprint)
+        backend.set_filters(start_date, end_date, platforms)
+        
+        self.backend = backend
+        self.df = None
+        self.validation_report = backend.validation_report()
+        print(f"Using SQLite backend {backend.db_path}")
+        return None
+    
+    def _source_chunks(self, chunksize):
+        """Stream the fingerprinted source: partition files when a manifest exists, else the CSV"""
+        partition_dir = self.config['data'].get('partition_dir')
+        if partition_dir and os.path.exists(os.path.join(partition_dir, MANIFEST_FILE)):
+            print(f"Reading partitioned data from {partition_dir}...")
+            for key, meta in self.read_manifest(partition_dir)['partitions'].items():
+                for file_name in meta['files']:
+                    yield from pd.read_csv(os.path.join(partition_dir, key, file_name), chunksize=chunksize)
+        else:
+            print(f"Reading data from {self.config['data']['csv_path']}...")
+            yield from pd.read_csv(self.config['data']['csv_path'], chunksize=chunksize)
+
+    @staticmethod
+    def _partition_key(date, platform=None):
+        """Relative directory of the partition holding a given date/platform"""
+        key = f"date={date.strftime('%Y-%m')}"
+        if platform is not None:
+            key += f"/platform={platform}"
+        return key
+
+    @staticmethod
+    def read_manifest(root):
+        """Read the partition manifest (per-partition date range, rows and files)"""
+        with open(os.path.join(root, MANIFEST_FILE), 'r', encoding='utf-8') as f:
+            return json.load(f)
+
+    def _read_partitions(self, root, start_date=None, end_date=None, platforms=None):
+        """Read only partitions overlapping the window and platform filter"""
+        manifest = self.read_manifest(root)
+        start = pd.Timestamp(start_date) if start_date is not None else None
+        end = pd.Timestamp(end_date) if end_date is not None else None
+
+        frames = []
+        for key, meta in manifest['partitions'].items():
+            if start is not None and pd.Timestamp(meta['max_date']) < start:
+                continue
+            if end is not None and pd.Timestamp(meta['min_date']) > end:
+                continue
+            if platforms is not None and meta.get('platform') is not None \
+                    and meta['platform'] not in platforms:
+                continue
+            for file_name in meta['files']:
+                frames.append(pd.read_csv(os.path.join(root, key, file_name)))
+
+        print(f"Reading {len(frames)} files after partition pruning")
+        if not frames:
+            return pd.DataFrame({col: pd.Series(dtype='datetime64[ns]' if col == 'date' else 'float64')
+                                 for col in manifest['columns']})
+
+        df = pd.concat(frames, ignore_index=True)
+        df['date'] = pd.to_datetime(df['date'])
+        return df.sort_values('date', kind='stable').reset_index(drop=True)
+
+    def write_partitions(self, root=None, by_platform=None, df=None):
+        """Write rows into the date=YYYY-MM[/platform=X] layout without touching existing files"""
+        root = root or self.config['data']['partition_dir']
+        if by_platform is None:
+            by_platform = self.config['data'].get('partition_by_platform', False)
+        if df is None:
+            if self.df is None:
+                self.load_data()
+            df = self.df
+
+        os.makedirs(root, exist_ok=True)
+        manifest_path = os.path.join(root, MANIFEST_FILE)
+        if os.path.exists(manifest_path):
+            manifest = self.read_manifest(root)
+        else:
+            manifest = {'by_platform': by_platform, 'columns': list(df.columns), 'partitions': {}}
+        by_platform = manifest['by_platform']
+
+        keys = [df['date'].dt.to_period('M')]
+        if by_platform:
+            keys.append(df['platform'])
+
+        for group_key, part in df.groupby(keys, sort=True):
+            group_key = group_key if isinstance(group_key, tuple) else (group_key,)
+            platform = group_key[1] if by_platform else None
+            key = self._partition_key(group_key[0].to_timestamp(), platform)
+
+            meta = manifest['partitions'].setdefault(key, {
+                'platform': platform, 'min_date': None, 'max_date': None, 'rows': 0, 'files': []
+            })
+            file_name = f"part-{len(meta['files']):05d}.csv"
+            os.makedirs(os.path.join(root, key), exist_ok=True)
+            part.to_csv(os.path.join(root, key, file_name), index=False, date_format='%Y-%m-%d')
+
+            part_min = part['date'].min().strftime('%Y-%m-%d')
+            part_max = part['date'].max().strftime('%Y-%m-%d')
+            meta['min_date'] = min(filter(None, [meta['min_date'], part_min]))
+            meta['max_date'] = max(filter(None, [meta['max_date'], part_max]))
+            meta['rows'] += len(part)
+            meta['files'].append(file_name)
+
+        manifest['partitions'] = dict(sorted(manifest['partitions'].items()))
+        with open(manifest_path, 'w', encoding='utf-8') as f:
+            json.dump(manifest, f, indent=2)
+
+        print(f"Wrote {len(df)} rows to {root}")
+        return manifest
+
+    def append_partitions(self, new_rows, root=None):
+        """Append newly exported days as new part files, skipping days their partitions already cover"""
+        root = root or self.config['data']['partition_dir']
+        new_rows = new_rows.copy()
+        new_rows['date'] = pd.to_datetime(new_rows['date'])
+        
+        if os.path.exists(os.path.join(root, MANIFEST_FILE)):
+            manifest = self.read_manifest(root)
+            keys = 'date=' + new_rows['date'].dt.strftime('%Y-%m')
+            if manifest['by_platform']:
+                keys = keys + '/platform=' + new_rows['platform'].astype(str)
+            partitions = manifest['partitions']
+            min_date = pd.to_datetime(keys.map(lambda k: partitions.get(k, {}).get('min_date')))
+            max_date = pd.to_datetime(keys.map(lambda k: partitions.get(k, {}).get('max_date')))
+            written = (new_rows['date'] >= min_date) & (new_rows['date'] <= max_date)
+            if written.any():
+                print(f"Skipping {int(written.sum())} rows on {new_rows.loc[written, 'date'].nunique()} "
+                      f"days already in {root}")
+                new_rows = new_rows[~written]
+            if new_rows.empty:
+                return manifest
+        
+        return self.write_partitions(root=root, df=new_rows)
+    
+    def sketch_partitions(self, root=None):
+        """Merge per-partition summary sketches, folding in only part files not sketched yet"""
+        root = root or self.config['data']['partition_dir']
+        manifest = self.read_manifest(root)
+        validator = DataValidator(self.config) if self.config.get('validation', {}).get('enabled', False) else None
+        
+        merged = SummarySketch(self.config)
+        # stored sketches built with other settings cannot be merged (or counted other rows) and are rebuilt
+        settings = {'hll_precision': merged.precision, 'tdigest_compression': merged.compression,
+                    'validation': self.config.get('validation', {})}
+        for key, meta in manifest['partitions'].items():
+            state_path = os.path.join(root, key, SKETCH_FILE)
+            state = None
+            if os.path.exists(state_path):
+                with open(state_path, 'r', encoding='utf-8') as f:
+                    state = json.load(f)
+            if state is not None and state.get('settings') == settings:
+                sketch = SummarySketch.from_dict(state['sketch'], self.config)
+                sketched_files = state['files']
+            else:
+                sketch, sketched_files = SummarySketch(self.config), []
+            
+            new_files = [name for name in meta['files'] if name not in sketched_files]
+            for file_name in new_files:
+                part = pd.read_csv(os.path.join(root, key, file_name))
+                part['date'] = pd.to_datetime(part['date'])
+                if validator is not None:
+                    part, _ = validator.validate(part)
+                sketch.update(part)
+            if new_files:
+                with open(state_path, 'w', encoding='utf-8') as f:
+                    json.dump({'settings': settings, 'files': sketched_files + new_files,
+                               'sketch': sketch.to_dict()}, f)
+            
+            merged.merge(sketch)
+        
+        return merged
+    
+    def dataset_fingerprint(self):
+        """Cheap identity of the source data: partition manifest or CSV path/size/mtime"""
+        partition_dir = self.config['data'].get('partition_dir')
+        if partition_dir and os.path.exists(os.path.join(partition_dir, MANIFEST_FILE)):
+            with open(os.path.join(partition_dir, MANIFEST_FILE), 'rb') as f:
+                return hashlib.sha256(f.read()).hexdigest()
+
+        csv_path = self.config['data']['csv_path']
+        stat = os.stat(csv_path)
+        identity = f"{os.path.abspath(csv_path)}|{stat.st_size}|{stat.st_mtime_ns}"
+        return hashlib.sha256(identity.encode('utf-8')).hexdigest()
+
+    def export_shared(self):
+        """Export the loaded frame into shared memory for worker processes"""
+        if self.df is None:
+            self.load_data()
+        return SharedDataset.export(self.df)
+
+    @classmethod
+    def from_shared(cls, spec, config_path="config.yaml"):
+        """Create an agent over an exported dataset without copying it"""
+        agent = cls(config_path)
+        agent.shared = SharedDataset.attach(spec)
+        agent.df = agent.shared.to_frame()
+        return agent
+
+    @staticmethod
+    def derive_ratios(agg):
+        """Recompute CTR and ROAS from summed clicks/impressions and revenue/spend"""
+        agg['ctr'] = agg['clicks'] / agg['impressions'].where(agg['impressions'] != 0)
+        agg['roas'] = agg['revenue'] / agg['spend'].where(agg['spend'] != 0)
+        return agg
+    
+    @staticmethod
+    def merge_aggregates(frames, groupby):
+        """Merge partial additive aggregates (chunks, partitions, workers) into one"""
+        combined = pd.concat(frames, ignore_index=True)
+        measures = [c for c in ADDITIVE_MEASURES if c in combined.columns]
+        merged = combined.groupby(groupby)[measures].sum().reset_index()
+        return DataAgent.derive_ratios(merged)
+    
+    def aggregate(self, groupby, measures=None, since=None):
+        """Aggregate measures by groupby; CTR/ROAS follow the configured mode. since keeps rows dated after it"""
+        if self._df is None and self.backend is None:
+            self.load_data()
+        
+        measures = measures or ADDITIVE_MEASURES
+        keys = [groupby] if isinstance(groupby, str) else list(groupby)
+        if self.approx:
+            return self._aggregate_sample(groupby, measures, since)
+        if self.backend is not None:
+            agg = self.backend.aggregate(keys, measures, since)
+            if self.additive:
+                agg = self.derive_ratios(agg)
+            return agg[keys + list(measures)]
+        
+        df = self.df if since is None else self.df[self.df['date'] > pd.Timestamp(since)]
+        if self.additive:
+            agg = df.groupby(groupby)[ADDITIVE_MEASURES].sum().reset_index()
+            agg = self.derive_ratios(agg)
+        else:
+            agg_spec = {m: 'sum' for m in measures if m in ADDITIVE_MEASURES}
+            agg_spec.update({m: 'mean' for m in measures if m in ('ctr', 'roas')})
+            agg = df.groupby(groupby).agg(agg_spec).reset_index()
+        
+        return agg[keys + list(measures)]
+    
+    def _aggregate_sample(self, groupby, measures, since=None):
+        """Weighted estimates from the sample, with a standard error column per measure"""
+        keys = [groupby] if isinstance(groupby, str) else list(groupby)
+        df = self.df if since is None else self.df[self.df['date'] > pd.Timestamp(since)]
+        agg = df.groupby(keys, sort=True).size().reset_index()[keys]
+        ratios = {'ctr': ('clicks', 'impressions'), 'roas': ('revenue', 'spend')}
+        
+        for measure in measures:
+            if measure in ratios and self.additive:
+                estimate, se = StratifiedSampler.estimate_ratio(df, *ratios[measure], groupby=keys)
+            elif measure in ratios:
+                estimate, se = StratifiedSampler.estimate_ratio(df, measure, groupby=keys)
+            else:
+                estimate, se = StratifiedSampler.estimate_total(df, measure, groupby=keys)
+            agg[measure] = estimate
+            agg[f'{measure}_se'] = se
+        
+        return agg
+    
+    def _summary_estimates(self):
+        """Population metric estimates and standard errors from the sample"""
+        estimates, standard_errors = {}, {}
+        for name, column in [('total_spend', 'spend'), ('total_revenue', 'revenue'),
+                             ('total_impressions', 'impressions'), ('total_clicks', 'clicks')]:
+            total, se = StratifiedSampler.estimate_total(self.df, column)
+            estimates[name], standard_errors[name] = float(total[0]), float(se[0])
+        
+        if self.additive:
+            ctr, ctr_se = StratifiedSampler.estimate_ratio(self.df, 'clicks', 'impressions')
+            roas, roas_se = StratifiedSampler.estimate_ratio(self.df, 'revenue', 'spend')
+        else:
+            ctr, ctr_se = StratifiedSampler.estimate_ratio(self.df, 'ctr')
+            roas, roas_se = StratifiedSampler.estimate_ratio(self.df, 'roas')
+        estimates['avg_ctr'], standard_errors['avg_ctr'] = float(ctr[0]), float(ctr_se[0])
+        estimates['avg_roas'], standard_errors['avg_roas'] = float(roas[0]), float(roas_se[0])
+        
+        # weighted median: first ROAS whose cumulative weight reaches half the total
+        ordered = self.df[['roas', 'sample_weight']].dropna().sort_values('roas')
+        cumulative = ordered['sample_weight'].cumsum()
+        estimates['median_roas'] = float(ordered['roas'][cumulative >= cumulative.iloc[-1] / 2].iloc[0])
+        return estimates, standard_errors
+    
+    def _sqlite_summary(self):
+        """get_basic_summary computed inside the SQLite database"""
+        totals, median_roas, dimensions = self.backend.summary_stats()
+        if self.additive:
+            avg_ctr = totals['clicks'] / totals['impressions'] if totals['impressions'] else float('nan')
+            avg_roas = totals['revenue'] / totals['spend'] if totals['spend'] else float('nan')
+        else:
+            avg_ctr, avg_roas = totals['mean_ctr'], totals['mean_roas']
+        
+        start, end = pd.Timestamp(totals['start']), pd.Timestamp(totals['end'])
+        return {
+            "total_rows": int(totals['rows']),
+            "date_range": {
+                "start": start.strftime('%Y-%m-%d'),
+                "end": end.strftime('%Y-%m-%d'),
+                "days": (end - start).days
+            },
+            "metrics": {
+                "total_spend": float(totals['spend']),
+                "total_revenue": float(totals['revenue']),
+                "total_impressions": int(totals['impressions']),
+                "total_clicks": int(totals['clicks']),
+                "avg_ctr": float(avg_ctr),
+                "avg_roas": float(avg_roas),
+                "median_roas": median_roas
+            },
+            "campaigns": {
+                "unique_campaigns": int(totals['campaigns']),
+                "unique_adsets": int(totals['adsets']),
+            },
+            "dimensions": dimensions
+        }
     
     def get_basic_summary(self):
         """Generate basic statistical summary"""
-        if self.df is None:
+        if self._df is None and self.backend is None:
             self.load_data()
+        
+        if self.backend is not None and self._df is None and not self.approx:
+            self.summary = self._sqlite_summary()
+            return self.summary
+        
+        if self.config.get('sketches', {}).get('enabled', False) and not self.approx:
+            if self.full_partitions:
+                sketch = self.sketch_partitions()
+            else:
+                sketch = SummarySketch(self.config).update(self.df)
+            self.summary = sketch.to_summary()
+            return self.summary
+        
+        if self.additive:
+            avg_ctr = float(self.df['clicks'].sum() / self.df['impressions'].sum())
+            avg_roas = float(self.df['revenue'].sum() / self.df['spend'].sum())
+        else:
+            avg_ctr = float(self.df['ctr'].mean())
+            avg_roas = float(self.df['roas'].mean())
             
         summary = {
-            "total_rows": len(self.df),
+            "total_rows": self.sample_info['population_rows'] if self.approx else len(self.df),
             "date_range": {
                 "start": self.df['date'].min().strftime('%Y-%m-%d'),
                 "end": self.df['date'].max().strftime('%Y-%m-%d'),
@@ -37,8 +448,8 @@ class DataAgent:
                 "total_revenue": float(self.df['revenue'].sum()),
                 "total_impressions": int(self.df['impressions'].sum()),
                 "total_clicks": int(self.df['clicks'].sum()),
-                "avg_ctr": float(self.df['ctr'].mean()),
-                "avg_roas": float(self.df['roas'].mean()),
+                "avg_ctr": avg_ctr,
+                "avg_roas": avg_roas,
                 "median_roas": float(self.df['roas'].median())
             },
             "campaigns": {
@@ -53,55 +464,116 @@ class DataAgent:
             }
         }
         
+        if self.approx:
+            estimates, standard_errors = self._summary_estimates()
+            summary['metrics'].update(estimates)
+            summary['metrics']['total_impressions'] = int(round(estimates['total_impressions']))
+            summary['metrics']['total_clicks'] = int(round(estimates['total_clicks']))
+            summary['standard_errors'] = standard_errors
+            summary['sample'] = self.sample_info
+        
         self.summary = summary
         return summary
     
-    def get_time_series_data(self, metric='roas', groupby='date'):
-        """Get time series aggregation"""
-        if self.df is None:
+    def get_time_series_data(self, metric='roas', groupby='date', since=None):
+        """Get time series aggregation, optionally only over days after since"""
+        if self._df is None and self.backend is None:
             self.load_data()
             
-        ts_data = self.df.groupby(groupby).agg({
-            'spend': 'sum',
-            'revenue': 'sum',
-            'impressions': 'sum',
-            'clicks': 'sum',
-            'ctr': 'mean',
-            'roas': 'mean',
-            'purchases': 'sum'
-        }).reset_index()
+        ts_data = self.aggregate(groupby, ['spend', 'revenue', 'impressions', 'clicks',
+                                           'ctr', 'roas', 'purchases'], since=since)
         
         return ts_data
     
-    def segment_by_performance(self):
-        """Segment ads by performance levels"""
-        if self.df is None:
+    def _use_backend(self):
+        """True when a query should run in the SQLite database rather than on loaded rows"""
+        if self._df is None and self.backend is None:
             self.load_data()
-        
-        low_ctr_threshold = self.config['thresholds']['low_ctr']
-        low_roas_threshold = self.config['thresholds']['low_roas']
-        
-        segments = {
-            "low_ctr_ads": self.df[self.df['ctr'] < low_ctr_threshold].copy(),
-            "high_ctr_ads": self.df[self.df['ctr'] >= low_ctr_threshold].copy(),
-            "low_roas_ads": self.df[self.df['roas'] < low_roas_threshold].copy(),
-            "high_roas_ads": self.df[self.df['roas'] >= low_roas_threshold].copy()
-        }
-        
+        return self.backend is not None and self._df is None
+    
+    def _segment_rows(self, metric, below):
+        """Loaded rows below (or at/above) the metric's low threshold; rows missing the metric are in neither"""
+        threshold = self.config['thresholds'][f'low_{metric}']
+        return self.df[self.df[metric] < threshold] if below else self.df[self.df[metric] >= threshold]
+    
+    def segment_by_performance(self):
+        """Row counts, measure totals and mean CTR/ROAS of the low/high CTR and ROAS segments"""
+        segments = {}
+        for metric in ['ctr', 'roas']:
+            for side, below in [('low', True), ('high', False)]:
+                if self._use_backend():
+                    stats = self.backend.segment_stats(metric, self.config['thresholds'][f'low_{metric}'], below)
+                else:
+                    rows = self._segment_rows(metric, below)
+                    stats = rows[ADDITIVE_MEASURES].sum()
+                    stats['rows'] = len(rows)
+                    stats['mean_ctr'], stats['mean_roas'] = rows['ctr'].mean(), rows['roas'].mean()
+                segments[f"{side}_{metric}_ads"] = {
+                    'rows': int(stats['rows']),
+                    **{m: float(stats[m]) for m in ADDITIVE_MEASURES},
+                    'mean_ctr': float(stats['mean_ctr']),
+                    'mean_roas': float(stats['mean_roas'])
+                }
         return segments
     
+    def segment_messages(self, metric, below):
+        """Rows per (creative_message, creative_type) on one side of the metric's threshold, by first appearance"""
+        if self._use_backend():
+            return self.backend.segment_messages(metric, self.config['thresholds'][f'low_{metric}'], below)
+        rows = self._segment_rows(metric, below)
+        return rows.groupby(['creative_message', 'creative_type'], sort=False, dropna=False).size() \
+            .reset_index(name='rows')
+    
+    def segment_adsets(self, metric, below):
+        """Per (campaign, adset) on one side of the metric's threshold: the message/type of its first row
+        (even when missing), measure totals and mean CTR/ROAS"""
+        if self._use_backend():
+            return self.backend.segment_adsets(metric, self.config['thresholds'][f'low_{metric}'], below)
+        rows = self._segment_rows(metric, below)
+        keys = ['campaign_name', 'adset_name']
+        firsts = rows.drop_duplicates(keys).set_index(keys)[['creative_message', 'creative_type']]
+        return rows.groupby(keys).agg(
+            spend=('spend', 'sum'), clicks=('clicks', 'sum'), impressions=('impressions', 'sum'),
+            revenue=('revenue', 'sum'), ctr=('ctr', 'mean'), roas=('roas', 'mean')
+        ).join(firsts).reset_index()
+    
+    def segment_top(self, metric, below, n, by=None):
+        """The n rows with the highest metric on one side of its threshold (earliest first on ties), per value of
+        `by` when given; returns their message and metric"""
+        if self._use_backend():
+            return self.backend.segment_top(metric, self.config['thresholds'][f'low_{metric}'], below, n, by)
+        rows = self._segment_rows(metric, below).sort_values(metric, ascending=False, kind='stable')
+        if by is None:
+            return rows[['creative_message', metric]].head(n).reset_index(drop=True)
+        return rows.groupby(by, sort=True).head(n).sort_values(by, kind='stable')[[by, 'creative_message', metric]] \
+            .reset_index(drop=True)
+    
+    def group_moments(self, groupby, measure='roas'):
+        """Count, mean and sample variance of a per-row measure per group (missing values skipped), e.g. for
+        ANOVA and t-tests without pulling the rows"""
+        if self._use_backend():
+            return self.backend.group_moments(groupby, measure)
+        return self.df.groupby(groupby)[measure].agg(n='count', mean='mean', var='var').reset_index()
+    
+    def creative_daily(self):
+        """Spend, impressions and clicks per (campaign, adset, creative_message) and day with the creative type of
+        the day's first row; clicks stay missing when no row of the day has them"""
+        keys = ['campaign_name', 'adset_name', 'creative_message', 'date']
+        if self._use_backend():
+            return self.backend.creative_daily(keys)
+        daily = self.df.groupby(keys).agg(
+            creative_type=('creative_type', 'first'), spend=('spend', 'sum'), impressions=('impressions', 'sum'),
+            clicks=('clicks', 'sum'), clicks_rows=('clicks', 'count')
+        ).reset_index()
+        daily['clicks'] = daily['clicks'].where(daily.pop('clicks_rows') > 0)
+        return daily
+    
     def analyze_creative_performance(self):
         """Analyze performance by creative type and message"""
-        if self.df is None:
+        if self._df is None and self.backend is None:
             self.load_data()
             
-        creative_stats = self.df.groupby('creative_type').agg({
-            'ctr': 'mean',
-            'roas': 'mean',
-            'spend': 'sum',
-            'revenue': 'sum',
-            'clicks': 'sum'
-        }).reset_index()
+        creative_stats = self.aggregate('creative_type', ['ctr', 'roas', 'spend', 'revenue', 'clicks'])
         
         creative_stats['roi'] = (creative_stats['revenue'] / creative_stats['spend']) - 1
         creative_stats = creative_stats.sort_values('roas', ascending=False)
@@ -110,39 +582,50 @@ class DataAgent:
     
     def detect_time_decay(self, window_days=7):
         """Detect performance decay over time"""
-        if self.df is None:
-            self.load_data()
+        if self.backend is not None and self._df is None:
+            decay_analysis = self.backend.campaign_roas_endpoints()
+        else:
+            if self.df is None:
+                self.load_data()
             
-        df_sorted = self.df.sort_values('date')
-        
-        df_sorted['roas_rolling'] = df_sorted.groupby('campaign_name')['roas'].transform(
-            lambda x: x.rolling(window=window_days, min_periods=1).mean()
-        )
-        
-        decay_analysis = df_sorted.groupby('campaign_name').agg({
-            'roas': ['first', 'last', 'mean'],
-            'date': ['min', 'max']
-        }).reset_index()
-        
-        decay_analysis.columns = ['campaign_name', 'roas_first', 'roas_last', 'roas_mean', 'date_start', 'date_end']
+            df_sorted = self.df.sort_values('date', kind='stable')
+            
+            df_sorted['roas_rolling'] = df_sorted.groupby('campaign_name')['roas'].transform(
+                lambda x: x.rolling(window=window_days, min_periods=1).mean()
+            )
+            
+            decay_analysis = df_sorted.groupby('campaign_name').agg({
+                'roas': ['first', 'last', 'mean'],
+                'date': ['min', 'max']
+            }).reset_index()
+            
+            decay_analysis.columns = ['campaign_name', 'roas_first', 'roas_last', 'roas_mean', 'date_start', 'date_end']
+        roas_first = decay_analysis['roas_first'].where(decay_analysis['roas_first'] > 0)
         decay_analysis['roas_change_pct'] = ((decay_analysis['roas_last'] - decay_analysis['roas_first']) / 
-                                              decay_analysis['roas_first'] * 100)
+                                              roas_first * 100)
+        
+        # Credit revenue to the spend that drove it when purchases land days later (needs full daily series)
+        if self.config.get('lag', {}).get('enabled', False) and not self.approx:
+            lags = self.get_lag_analysis()['campaigns'][['campaign_name', 'lag_days', 'lag_correlation',
+                                                         'roas_lag_adjusted', 'roas_change_pct_lag_adjusted']]
+            decay_analysis = decay_analysis.merge(lags, on='campaign_name', how='left')
         
         return decay_analysis
     
+    def get_lag_analysis(self):
+        """Spend->revenue lags per campaign and adset, computed once and shared by every stage"""
+        with self._lag_lock:
+            if self._lags is None:
+                self._lags = LagAnalyzer(self, self.config).analyze()
+        return self._lags
+    
     def get_platform_comparison(self):
         """Compare performance across platforms"""
-        if self.df is None:
+        if self._df is None and self.backend is None:
             self.load_data()
             
-        platform_stats = self.df.groupby('platform').agg({
-            'spend': 'sum',
-            'revenue': 'sum',
-            'ctr': 'mean',
-            'roas': 'mean',
-            'impressions': 'sum',
-            'clicks': 'sum'
-        }).reset_index()
+        platform_stats = self.aggregate('platform', ['spend', 'revenue', 'ctr', 'roas',
+                                                     'impressions', 'clicks'])
         
         return platform_stats
 
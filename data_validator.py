@@ -0,0 +1,99 @@
+"""
+Data Validator - Vectorized rule checks and quarantine for loaded ad rows
+"""
+import os
+import time
+import numpy as np
+import pandas as pd
+
+KEY_COLUMNS = ['campaign_name', 'adset_name', 'date']
+# a missing measure is only left out of that measure's totals; the row's other measures still count
+MEASURE_COLUMNS = ['spend', 'impressions', 'clicks', 'revenue']
+
+
+class DataValidator:
+    def __init__(self, config):
+        self.config = config
+        settings = config.get('validation', {})
+        self.ctr_tolerance = settings.get('ctr_tolerance', 0.001)
+        self.roas_tolerance = settings.get('roas_tolerance', 0.05)
+        self.quarantine_file = settings.get('quarantine_file', 'logs/quarantine.csv')
+        self.report = {}
+
+    def _rules(self, df):
+        """Rule name -> callable returning a boolean Series of violating rows"""
+        spend = df['spend'].where(df['spend'] > 0)
+        impressions = df['impressions'].where(df['impressions'] > 0)
+        return {
+            'null_required': lambda: df[KEY_COLUMNS].isna().any(axis=1),
+            'negative_value': lambda: (df[['spend', 'impressions', 'clicks', 'revenue', 'purchases']] < 0).any(axis=1),
+            'zero_spend': lambda: df['spend'] == 0,
+            'clicks_exceed_impressions': lambda: df['clicks'] > df['impressions'],
+            'ctr_mismatch': lambda: (df['ctr'] - df['clicks'] / impressions).abs() > self.ctr_tolerance,
+            'roas_mismatch': lambda: (df['roas'] - df['revenue'] / spend).abs() > self.roas_tolerance,
+            'duplicate_key': lambda: pd.Series(
+                pd.util.hash_pandas_object(df[KEY_COLUMNS], index=False).duplicated(keep='first').to_numpy(),
+                index=df.index
+            )
+        }
+
+    def validate(self, df):
+        """Split df into clean rows and quarantined rows with reason codes"""
+        print("\nValidating data quality...")
+        start = time.perf_counter()
+
+        reasons = pd.Series('', index=df.index)
+        bad = np.zeros(len(df), dtype=bool)
+        rule_stats = {}
+
+        for name, rule in self._rules(df).items():
+            rule_start = time.perf_counter()
+            violations = rule().fillna(False).to_numpy(dtype=bool)
+            rule_stats[name] = {
+                'violations': int(violations.sum()),
+                'seconds': time.perf_counter() - rule_start
+            }
+            if violations.any():
+                reasons[violations] = reasons[violations] + name + '|'
+                bad |= violations
+
+        quarantined = df[bad].copy()
+        quarantined['reason_codes'] = reasons[bad].str.rstrip('|')
+        clean = df[~bad]
+
+        self.report = {
+            'rows_checked': len(df),
+            'rows_quarantined': int(bad.sum()),
+            'rules': rule_stats,
+            'null_measures': {c: int(n) for c, n in clean[MEASURE_COLUMNS].isna().sum().items()},
+            'seconds': time.perf_counter() - start
+        }
+        for name, stats in rule_stats.items():
+            print(f"   - {name}: {stats['violations']} rows ({stats['seconds'] * 1000:.1f} ms)")
+        print(f"   - kept rows with a missing measure: {self.report['null_measures']}")
+        print(f"Quarantined {self.report['rows_quarantined']}/{len(df)} rows "
+              f"in {self.report['seconds'] * 1000:.1f} ms")
+
+        return clean, quarantined
+
+    def write_quarantine(self, quarantined):
+        """Write quarantined rows with their reason codes"""
+        os.makedirs(os.path.dirname(self.quarantine_file) or '.', exist_ok=True)
+        quarantined.to_csv(self.quarantine_file, index=False, date_format='%Y-%m-%d')
+        print(f"Saved {len(quarantined)} quarantined rows to {self.quarantine_file}")
+
+
+if __name__ == "__main__":
+    import json
+    import yaml
+
+    with open('config.yaml', 'r') as f:
+        config = yaml.safe_load(f)
+
+    df = pd.read_csv(config['data']['csv_path'])
+    df['date'] = pd.to_datetime(df['date'])
+
+    validator = DataValidator(config)
+    clean, quarantined = validator.validate(df)
+    validator.write_quarantine(quarantined)
+    print(json.dumps(validator.report, indent=2))
@@ -23,22 +23,46 @@ class Evaluator:
             return self._validate_message_pattern(hypothesis)
         elif method == 'segmentation_analysis':
             return self._validate_audience_segments(hypothesis)
+        elif method == 'cluster_trajectory_test':
+            return self._validate_cluster_trajectory(hypothesis)
         else:
             return self._default_validation(hypothesis)
     
+    def _sample_estimates(self, hypothesis_result, groupby):
+        """Attach per-group ROAS estimates with standard errors when running on the sample"""
+        if self.data_agent.approx:
+            estimates = self.data_agent.aggregate(groupby, ['roas'])
+            hypothesis_result['details']['roas_estimates'] = estimates.to_dict('records')
+        return hypothesis_result
+    
+    def _campaign_lags(self):
+        """Dominant spend->revenue lag per campaign, when lag analysis is enabled and the data is complete"""
+        if not self.config.get('lag', {}).get('enabled', False) or self.data_agent.approx:
+            return {}
+        lags = self.data_agent.get_lag_analysis()['campaigns']
+        return dict(zip(lags['campaign_name'], lags['lag_days']))
+    
+    @staticmethod
+    def _lag_adjusted_daily_roas(campaign_daily, lag):
+        """Daily ROAS crediting each day's spend with the revenue that arrived `lag` days later (0: same day)"""
+        daily = campaign_daily.set_index('date')[['spend', 'revenue']].asfreq('D', fill_value=0)
+        roas = daily['revenue'].shift(-lag) / daily['spend'].where(daily['spend'] > 0)
+        return roas.dropna().values
+    
     def _validate_time_decay(self, hypothesis):
         """Validate time-based performance decay"""
-        df = self.data_agent.df.copy()
+        daily = self.data_agent.aggregate(['campaign_name', 'date'], ['spend', 'revenue'])
         
         results = []
         campaigns = hypothesis['evidence']['campaigns_affected']
+        lags = self._campaign_lags()
         
         for campaign in campaigns[:3]:
-            campaign_data = df[df['campaign_name'] == campaign].sort_values('date')
+            lag = int(lags.get(campaign, 0))
+            y = self._lag_adjusted_daily_roas(daily[daily['campaign_name'] == campaign], lag)
             
-            if len(campaign_data) > 5:
-                X = np.arange(len(campaign_data)).reshape(-1, 1)
-                y = campaign_data['roas'].values
+            if len(y) > 5:
+                X = np.arange(len(y)).reshape(-1, 1)
                 
                 model = LinearRegression()
                 model.fit(X, y)
@@ -48,6 +72,7 @@ class Evaluator:
                 
                 results.append({
                     'campaign': campaign,
+                    'lag_days': lag,
                     'slope': float(slope),
                     'r_squared': float(r_squared),
                     'declining': slope < -0.01
@@ -65,14 +90,25 @@ class Evaluator:
             'conclusion': f"Time decay detected in {declining_count}/{len(results)} campaigns"
         }
     
+    @staticmethod
+    def _anova(moments):
+        """One-way ANOVA F statistic and p-value from per-group count, mean and variance"""
+        moments = moments[moments['n'] > 0]
+        n, k = moments['n'].sum(), len(moments)
+        if k < 2 or n <= k:
+            return np.nan, np.nan
+        grand_mean = (moments['n'] * moments['mean']).sum() / n
+        between = (moments['n'] * (moments['mean'] - grand_mean) ** 2).sum() / (k - 1)
+        within = ((moments['n'] - 1) * moments['var'].fillna(0)).sum() / (n - k)
+        f_stat = between / within
+        return f_stat, stats.f.sf(f_stat, k - 1, n - k)
+    
     def _validate_creative_impact(self, hypothesis):
         """Validate creative type performance differences using ANOVA"""
-        df = self.data_agent.df
+        moments = self.data_agent.group_moments('creative_type')
         
-        creative_groups = [group['roas'].values for name, group in df.groupby('creative_type')]
-        
-        if len(creative_groups) >= 2:
-            f_stat, p_value = stats.f_oneway(*creative_groups)
+        if len(moments) >= 2:
+            f_stat, p_value = self._anova(moments)
             
             validated = p_value < 0.05
             confidence = 1 - p_value if validated else 0
@@ -81,7 +117,7 @@ class Evaluator:
             validated = False
             confidence = 0
         
-        return {
+        return self._sample_estimates({
             'hypothesis_id': hypothesis['id'],
             'validated': validated,
             'confidence': float(min(confidence, 1.0)),
@@ -92,19 +128,16 @@ class Evaluator:
                 'significance_level': 0.05
             },
             'conclusion': f"Creative type {'significantly' if validated else 'does not significantly'} impact ROAS"
-        }
+        }, 'creative_type')
     
     def _validate_platform_difference(self, hypothesis):
         """Validate platform performance differences using t-test"""
-        df = self.data_agent.df
-        
-        platforms = df['platform'].unique()
+        moments = self.data_agent.group_moments('platform')
         
-        if len(platforms) == 2:
-            group1 = df[df['platform'] == platforms[0]]['roas']
-            group2 = df[df['platform'] == platforms[1]]['roas']
-            
-            t_stat, p_value = stats.ttest_ind(group1, group2)
+        if len(moments) == 2:
+            first, second = moments.iloc[0], moments.iloc[1]
+            t_stat, p_value = stats.ttest_ind_from_stats(first['mean'], np.sqrt(first['var']), first['n'],
+                                                         second['mean'], np.sqrt(second['var']), second['n'])
             
             validated = p_value < 0.05
             confidence = 1 - p_value if validated else 0
@@ -113,7 +146,7 @@ class Evaluator:
             validated = False
             confidence = 0
         
-        return {
+        return self._sample_estimates({
             'hypothesis_id': hypothesis['id'],
             'validated': validated,
             'confidence': float(min(confidence, 1.0)),
@@ -123,16 +156,19 @@ class Evaluator:
                 'p_value': float(p_value)
             },
             'conclusion': f"Platform difference {'is' if validated else 'is not'} statistically significant"
-        }
+        }, 'platform')
+    
+    @staticmethod
+    def _mean_message_length(messages):
+        """Mean message length over the rows counted per message"""
+        lengths = messages['creative_message'].str.len()
+        known = lengths.notna()
+        return (lengths[known] * messages['rows'][known]).sum() / messages['rows'][known].sum()
     
     def _validate_message_pattern(self, hypothesis):
         """Validate message patterns correlation with CTR"""
-        segments = self.data_agent.segment_by_performance()
-        low_ctr = segments['low_ctr_ads']
-        high_ctr = segments['high_ctr_ads']
-        
-        low_ctr_avg_length = low_ctr['creative_message'].str.len().mean()
-        high_ctr_avg_length = high_ctr['creative_message'].str.len().mean()
+        low_ctr_avg_length = self._mean_message_length(self.data_agent.segment_messages('ctr', below=True))
+        high_ctr_avg_length = self._mean_message_length(self.data_agent.segment_messages('ctr', below=False))
         
         length_diff = abs(low_ctr_avg_length - high_ctr_avg_length)
         
@@ -154,12 +190,10 @@ class Evaluator:
     
     def _validate_audience_segments(self, hypothesis):
         """Validate audience segmentation performance"""
-        df = self.data_agent.df
-        
-        audience_groups = [group['roas'].values for name, group in df.groupby('audience_type')]
+        moments = self.data_agent.group_moments('audience_type')
         
-        if len(audience_groups) >= 2:
-            f_stat, p_value = stats.f_oneway(*audience_groups)
+        if len(moments) >= 2:
+            f_stat, p_value = self._anova(moments)
             validated = p_value < 0.05
             confidence = 1 - p_value if validated else 0
         else:
@@ -167,16 +201,48 @@ class Evaluator:
             confidence = 0
             p_value = 1
         
-        return {
+        return self._sample_estimates({
             'hypothesis_id': hypothesis['id'],
             'validated': validated,
             'confidence': float(min(confidence, 1.0)),
             'method': 'anova',
             'details': {
-                'audience_count': len(audience_groups),
-                'p_value': float(p_value) if len(audience_groups) >= 2 else None
+                'audience_count': len(moments),
+                'p_value': float(p_value) if len(moments) >= 2 else None
             },
             'conclusion': f"Audience segments show {'significant' if validated else 'no significant'} performance variation"
+        }, 'audience_type')
+    
+    def _validate_cluster_trajectory(self, hypothesis):
+        """Welch t-test of the cluster's per-adset ROAS change on held-out days against all other adsets"""
+        cluster = hypothesis['evidence']
+        
+        if cluster['heldout_measured'] >= 2 and cluster['rest_heldout_measured'] >= 2:
+            t_stat, p_value = stats.ttest_ind_from_stats(
+                cluster['heldout_change_mean'], cluster['heldout_change_std'], cluster['heldout_measured'],
+                cluster['rest_heldout_change_mean'], cluster['rest_heldout_change_std'],
+                cluster['rest_heldout_measured'], equal_var=False
+            )
+            validated = p_value < 0.05
+            confidence = 1 - p_value if validated else 0
+        else:
+            t_stat, p_value = 0, 1
+            validated = False
+            confidence = 0
+        
+        return {
+            'hypothesis_id': hypothesis['id'],
+            'validated': validated,
+            'confidence': float(min(confidence, 1.0)),
+            'method': 'welch_t_test',
+            'details': {
+                't_statistic': float(t_stat),
+                'p_value': float(p_value),
+                'cluster_heldout_roas_change_pct': cluster['heldout_change_mean'],
+                'other_heldout_roas_change_pct': cluster['rest_heldout_change_mean']
+            },
+            'conclusion': f"'{cluster['label']}' adsets {'differ' if validated else 'do not differ'} significantly "
+                          f"in ROAS trajectory from the rest on held-out days"
         }
     
     def _default_validation(self, hypothesis):
@@ -0,0 +1,91 @@
+"""
+Fatigue Engine - Creative fatigue per (adset, creative_message) from age and exposure
+"""
+import numpy as np
+import pandas as pd
+
+
+class FatigueEngine:
+    def __init__(self, data_agent, config):
+        self.data_agent = data_agent
+        self.config = config
+        self.fatigue_days = config['thresholds']['fatigue_days']
+        self.min_spend = config['thresholds']['min_spend']
+        self.keys = ['campaign_name', 'adset_name', 'creative_message']
+        self.creatives = None
+
+    def compute_exposure(self):
+        """Daily age (days since first seen) and cumulative impressions per creative"""
+        exposure = self.data_agent.creative_daily()
+        grouped = exposure.groupby(self.keys, sort=False)
+
+        exposure['ctr'] = exposure['clicks'] / exposure['impressions'].where(exposure['impressions'] > 0)
+        exposure['age_days'] = (exposure['date'] - grouped['date'].transform('min')).dt.days
+        exposure['cum_impressions'] = grouped['impressions'].cumsum()
+        return exposure
+
+    def analyze(self):
+        """Fit CTR against cumulative exposure for every creative with grouped sums"""
+        print("\nAnalyzing creative fatigue...")
+        exposure = self.compute_exposure()
+
+        # least-squares slope of CTR on cumulative impressions (millions) from grouped moments
+        fit = exposure[exposure['ctr'].notna()].copy()
+        fit['x'] = fit['cum_impressions'] / 1e6
+        fit['xx'] = fit['x'] ** 2
+        fit['xy'] = fit['x'] * fit['ctr']
+        moments = fit.groupby(self.keys, sort=False).agg(
+            n=('x', 'size'), sx=('x', 'sum'), sy=('ctr', 'sum'), sxx=('xx', 'sum'), sxy=('xy', 'sum'),
+            x_min=('x', 'min'), x_max=('x', 'max')
+        )
+        denom = moments['n'] * moments['sxx'] - moments['sx'] ** 2
+        slope = (moments['n'] * moments['sxy'] - moments['sx'] * moments['sy']) / denom.where(denom > 0)
+
+        grouped = exposure.groupby(self.keys, sort=False)
+        creatives = grouped.agg(
+            creative_type=('creative_type', 'first'),
+            first_seen=('date', 'min'),
+            last_seen=('date', 'max'),
+            age_days=('age_days', 'max'),
+            appearances=('date', 'size'),
+            cum_impressions=('cum_impressions', 'max'),
+            spend=('spend', 'sum'),
+            ctr_first=('ctr', 'first'),
+            ctr_last=('ctr', 'last')
+        )
+        creatives['ctr_slope_per_million'] = slope
+        mean_ctr = moments['sy'] / moments['n']
+        # fitted CTR change across the creative's observed exposure, relative to its mean CTR
+        creatives['ctr_decay_pct'] = slope * (moments['x_max'] - moments['x_min']) / mean_ctr * 100
+
+        creatives['fatigued'] = (
+            (creatives['age_days'] >= self.fatigue_days) &
+            (creatives['spend'] >= self.min_spend) &
+            (creatives['ctr_slope_per_million'] < 0)
+        )
+
+        self.creatives = creatives.reset_index()
+        print(f"Flagged {int(self.creatives['fatigued'].sum())} of {len(self.creatives)} creatives as fatigued")
+        return self.creatives
+
+    def get_fatigued_creatives(self):
+        """Fatigued creatives, strongest decay first"""
+        if self.creatives is None:
+            self.analyze()
+        fatigued = self.creatives[self.creatives['fatigued']]
+        return fatigued.sort_values('ctr_decay_pct')
+
+
+if __name__ == "__main__":
+    import yaml
+    from data_agent import DataAgent
+
+    with open('config.yaml', 'r') as f:
+        config = yaml.safe_load(f)
+
+    data_agent = DataAgent()
+    data_agent.load_data()
+
+    engine = FatigueEngine(data_agent, config)
+    fatigued = engine.get_fatigued_creatives()
+    print(fatigued[['adset_name', 'creative_message', 'age_days', 'spend', 'ctr_decay_pct']].head(10).to_string())
@@ -0,0 +1,168 @@
+"""
+Forecaster - Batched exponential smoothing / Holt linear trend forecasts for ROAS and spend
+"""
+import numpy as np
+import pandas as pd
+
+
+class Forecaster:
+    def __init__(self, data_agent, config):
+        self.data_agent = data_agent
+        self.config = config
+        settings = config.get('forecast', {})
+        self.horizons = settings.get('horizons', [7, 14])
+        self.alphas = settings.get('alphas', [0.1, 0.2, 0.3, 0.5, 0.7])
+        self.betas = settings.get('betas', [0.0, 0.05, 0.1, 0.2])
+        self.min_observations = settings.get('min_observations', 5)
+        self.interval_z = settings.get('interval_z', 1.96)
+        self.daily = {}
+        self.forecasts = {}
+
+    def build_matrix(self, keys, metric):
+        """Padded (series x days) matrix of a daily metric, NaN where a series has no data"""
+        if tuple(keys) not in self.daily:
+            self.daily[tuple(keys)] = self.data_agent.get_time_series_data(groupby=keys + ['date'])
+        daily = self.daily[tuple(keys)]
+        matrix = daily.pivot_table(index=keys, columns='date', values=metric, aggfunc='first')
+        all_days = pd.date_range(daily['date'].min(), daily['date'].max(), freq='D')
+        return matrix.reindex(columns=all_days)
+
+    def _smooth(self, values, alpha, beta):
+        """Run Holt's recurrences for every (parameter set, series) pair at once
+
+        values is (S, T); alpha/beta are (G, 1). Days without data leave the state untouched,
+        so each series is smoothed over its own observations.
+        """
+        n_params, (n_series, n_days) = alpha.shape[0], values.shape
+        level = np.full((n_params, n_series), np.nan)
+        trend = np.zeros((n_params, n_series))
+        sse = np.zeros((n_params, n_series))
+        n_resid = np.zeros(n_series)
+        last = np.full(n_series, np.nan)
+        last_day = np.zeros(n_series, dtype=int)
+
+        for t in range(n_days):
+            y = values[:, t]
+            observed = ~np.isnan(y)
+            started = ~np.isnan(level[0])
+
+            scored = observed & started
+            predicted = level + trend
+            sse += np.where(scored, (y - predicted) ** 2, 0.0)
+            n_resid += scored
+
+            new_level = alpha * y + (1 - alpha) * predicted
+            new_trend = beta * (new_level - level) + (1 - beta) * trend
+            level = np.where(scored, new_level, level)
+            trend = np.where(scored, new_trend, trend)
+
+            # the first observation of a series initializes its level
+            first = observed & ~started
+            level = np.where(first, y, level)
+            last = np.where(observed, y, last)
+            last_day = np.where(observed, t, last_day)
+
+        return level, trend, sse, n_resid, last, last_day
+
+    def forecast(self, keys, metric):
+        """Fit every series, pick its best (alpha, beta) by one-step MSE and forecast ahead"""
+        matrix = self.build_matrix(keys, metric)
+        values = matrix.to_numpy(dtype=float, copy=True)
+        values[~np.isfinite(values)] = np.nan
+
+        grid = np.array([(a, b) for a in self.alphas for b in self.betas])
+        alpha, beta = grid[:, :1], grid[:, 1:]
+        level, trend, sse, n_resid, last, last_day = self._smooth(values, alpha, beta)
+
+        mse = sse / np.maximum(n_resid, 1)
+        best = np.argmin(mse, axis=0)
+        cols = np.arange(values.shape[0])
+        level, trend, mse = level[best, cols], trend[best, cols], mse[best, cols]
+        best_alpha, best_beta = grid[best, 0], grid[best, 1]
+
+        result = matrix.index.to_frame(index=False)
+        result['metric'] = metric
+        result['observations'] = (n_resid + ~np.isnan(last)).astype(int)
+        result['last_value'] = last
+        result['level'] = level
+        result['trend'] = trend
+        result['alpha'] = best_alpha
+        result['beta'] = best_beta
+        result['last_date'] = matrix.columns[last_day]
+
+        # horizons count from the last day in the data, so a series that stopped early
+        # is projected the extra days since its own last observation
+        gap = values.shape[1] - 1 - last_day
+        sigma = np.sqrt(mse)
+        for h in self.horizons:
+            # Holt forecast variance: sigma^2 * (1 + sum_{j<m} alpha^2 (1 + j*beta)^2), m = steps ahead
+            m = h + gap
+            var_factor = 1 + best_alpha ** 2 * ((m - 1) + best_beta * (m - 1) * m
+                                                + best_beta ** 2 * (m - 1) * m * (2 * m - 1) / 6)
+            point = level + m * trend
+            half_width = self.interval_z * sigma * np.sqrt(var_factor)
+            result[f'forecast_{h}d'] = point
+            result[f'lower_{h}d'] = np.maximum(point - half_width, 0.0)
+            result[f'upper_{h}d'] = point + half_width
+
+        return result[result['observations'] >= self.min_observations].reset_index(drop=True)
+
+    def run(self):
+        """Forecast ROAS and spend for every campaign and adset"""
+        print("\nForecasting ROAS and spend...")
+        forecasts = {}
+        for level_name, keys in [('campaign', ['campaign_name']), ('adset', ['campaign_name', 'adset_name'])]:
+            forecasts[level_name] = pd.concat(
+                [self.forecast(keys, metric) for metric in ('roas', 'spend')], ignore_index=True
+            )
+            print(f"Forecast {len(forecasts[level_name])} {level_name} series")
+        self.forecasts = forecasts
+        return forecasts
+
+    def get_projected_declines(self, top_n=5, horizon=None):
+        """Campaigns whose ROAS is projected to fall the most, as records"""
+        horizon = horizon or self.horizons[0]
+        roas = self.forecasts['campaign']
+        roas = roas[roas['metric'] == 'roas'].copy()
+        roas['projected_change'] = roas[f'forecast_{horizon}d'] - roas['last_value']
+        declines = roas[roas['projected_change'] < 0].nsmallest(top_n, 'projected_change')
+
+        return [{
+            'campaign_name': row['campaign_name'],
+            'last_roas': float(row['last_value']),
+            'last_date': row['last_date'].strftime('%Y-%m-%d'),
+            'forecast_roas': float(row[f'forecast_{horizon}d']),
+            'lower': float(row[f'lower_{horizon}d']),
+            'upper': float(row[f'upper_{horizon}d']),
+            'horizon_days': horizon
+        } for _, row in declines.iterrows()]
+
+    @staticmethod
+    def format_forecast_report(declines):
+        """Format projected ROAS declines as a markdown section"""
+        report = "\n## ROAS Outlook\n\n"
+        if not declines:
+            report += "No campaign is projected to lose ROAS over the forecast horizon.\n\n"
+            return report
+
+        report += f"Campaigns with the largest projected ROAS decline over the next {declines[0]['horizon_days']} days:\n\n"
+        for d in declines:
+            report += f"- {d['campaign_name']}: {d['last_roas']:.2f} -> {d['forecast_roas']:.2f} "
+            report += f"(interval {d['lower']:.2f} - {d['upper']:.2f})\n"
+        report += "\n"
+        return report
+
+
+if __name__ == "__main__":
+    import yaml
+    from data_agent import DataAgent
+
+    with open('config.yaml', 'r') as f:
+        config = yaml.safe_load(f)
+
+    data_agent = DataAgent()
+    data_agent.load_data()
+
+    forecaster = Forecaster(data_agent, config)
+    forecasts = forecaster.run()
+    print(forecasts['campaign'].head(10).to_string())
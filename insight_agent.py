@@ -1,6 +1,8 @@
 import pandas as pd
 import numpy as np
 from datetime import datetime, timedelta
+from fatigue_engine import FatigueEngine
+from adset_clusterer import AdsetClusterer
 
 class InsightAgent:
     def __init__(self, data_agent):
@@ -17,14 +19,30 @@ class InsightAgent:
         decay_data = self.data_agent.detect_time_decay()
         declining_campaigns = decay_data[decay_data['roas_change_pct'] < -20]
         
+        # Creative-level fatigue: messages shown past fatigue_days with decaying CTR
+        fatigued = FatigueEngine(self.data_agent, self.data_agent.config).get_fatigued_creatives()
+        
         if len(declining_campaigns) > 0:
             hypotheses.append({
                 "id": "H1",
                 "hypothesis": "Audience fatigue causing ROAS decline",
-                "description": f"Found {len(declining_campaigns)} campaigns with >20% ROAS decline over time",
+                "description": f"Found {len(declining_campaigns)} campaigns with >20% ROAS decline over time "
+                               f"and {len(fatigued)} fatigued creatives",
                 "evidence": {
                     "campaigns_affected": declining_campaigns['campaign_name'].tolist()[:5],
-                    "avg_decline_pct": float(declining_campaigns['roas_change_pct'].mean())
+                    "avg_decline_pct": float(declining_campaigns['roas_change_pct'].mean()),
+                    "fatigued_creatives_count": len(fatigued),
+                    "fatigued_creatives": [
+                        {
+                            "campaign_name": row.campaign_name,
+                            "adset_name": row.adset_name,
+                            "creative_message": row.creative_message,
+                            "age_days": int(row.age_days),
+                            "spend": float(row.spend),
+                            "ctr_decay_pct": float(row.ctr_decay_pct)
+                        }
+                        for row in fatigued.head(5).itertuples()
+                    ]
                 },
                 "priority": "HIGH",
                 "validation_method": "time_series_regression"
@@ -66,18 +84,19 @@ class InsightAgent:
             })
         
         # Hypothesis 4: Low CTR correlation with messaging
-        segments = self.data_agent.segment_by_performance()
-        low_ctr = segments['low_ctr_ads']
+        low_ctr = self.data_agent.segment_by_performance()['low_ctr_ads']
         
-        if len(low_ctr) > 0:
-            low_ctr_messages = low_ctr['creative_message'].value_counts()
+        if low_ctr['rows'] > 0:
+            messages = self.data_agent.segment_messages('ctr', below=True).dropna(subset=['creative_message'])
+            low_ctr_messages = messages.groupby('creative_message', sort=False)['rows'].sum() \
+                .sort_values(ascending=False, kind='stable')
             hypotheses.append({
                 "id": "H4",
                 "hypothesis": "Low CTR linked to specific message patterns",
-                "description": f"{len(low_ctr)} ads have CTR below threshold",
+                "description": f"{low_ctr['rows']} ads have CTR below threshold",
                 "evidence": {
-                    "low_ctr_count": len(low_ctr),
-                    "avg_ctr": float(low_ctr['ctr'].mean()),
+                    "low_ctr_count": low_ctr['rows'],
+                    "avg_ctr": low_ctr['mean_ctr'],
                     "common_messages": low_ctr_messages.head(3).to_dict()
                 },
                 "priority": "HIGH",
@@ -85,12 +104,7 @@ class InsightAgent:
             })
         
         # Hypothesis 5: Audience type saturation
-        df = self.data_agent.df
-        audience_performance = df.groupby('audience_type').agg({
-            'roas': 'mean',
-            'ctr': 'mean',
-            'spend': 'sum'
-        }).reset_index()
+        audience_performance = self.data_agent.aggregate('audience_type', ['roas', 'ctr', 'spend'])
         
         hypotheses.append({
             "id": "H5",
@@ -103,6 +117,10 @@ class InsightAgent:
             "validation_method": "segmentation_analysis"
         })
         
+        # Cluster hypotheses: groups of adsets whose ROAS/CTR/spend trajectories move alike
+        if self.data_agent.config.get('clustering', {}).get('enabled', False):
+            hypotheses.extend(AdsetClusterer(self.data_agent, self.data_agent.config).cluster_hypotheses())
+        
         self.hypotheses = hypotheses
         print(f"Generated {len(hypotheses)} hypotheses")
         return hypotheses
@@ -114,17 +132,20 @@ class InsightAgent:
                                    key=lambda x: priority_order.get(x['priority'], 4))
         return sorted_hypotheses
     
+    @staticmethod
+    def iter_hypothesis_report(hypotheses):
+        """Yield the hypotheses section as markdown, one hypothesis at a time"""
+        yield "\n## Generated Hypotheses\n\n"
+        
+        for h in hypotheses:
+            yield (f"### {h['id']}: {h['hypothesis']}\n"
+                   f"**Priority**: {h['priority']}\n\n"
+                   f"{h['description']}\n\n"
+                   f"**Validation Method**: {h['validation_method']}\n\n")
+    
     def format_hypothesis_report(self):
         """Format hypotheses for reporting"""
-        report = "\n## Generated Hypotheses\n\n"
-        
-        for h in self.hypotheses:
-            report += f"### {h['id']}: {h['hypothesis']}\n"
-            report += f"**Priority**: {h['priority']}\n\n"
-            report += f"{h['description']}\n\n"
-            report += f"**Validation Method**: {h['validation_method']}\n\n"
-        
-        return report
+        return ''.join(self.iter_hypothesis_report(self.hypotheses))
 
 if __name__ == "__main__":
     from data_agent import DataAgent
@@ -0,0 +1,165 @@
+"""
+Lag Analyzer - Spend-to-revenue lag per campaign and adset from batched FFT cross-correlation
+"""
+import numpy as np
+import pandas as pd
+from scipy.fft import irfft, next_fast_len, rfft
+
+
+class LagAnalyzer:
+    def __init__(self, data_agent, config):
+        self.data_agent = data_agent
+        self.config = config
+        settings = config.get('lag', {})
+        self.max_lag = settings.get('max_lag_days', 14)
+        self.min_days = settings.get('min_days', 10)
+        self.min_correlation = settings.get('min_correlation', 0.3)
+        self.batch_rows = settings.get('batch_rows', 4096)
+        self.results = {}
+
+    def series_matrix(self, keys):
+        """Dense (series x day) spend and revenue matrices over the full date range, zero on idle days"""
+        daily = self.data_agent.get_time_series_data(groupby=keys + ['date'])
+        codes, index = pd.MultiIndex.from_frame(daily[keys]).factorize()
+        start = daily['date'].min()
+        days = (daily['date'] - start).dt.days.to_numpy()
+        shape = (len(index), int(days.max()) + 1)
+
+        spend, revenue = np.zeros(shape), np.zeros(shape)
+        spend[codes, days] = daily['spend'].to_numpy(np.float64)
+        revenue[codes, days] = daily['revenue'].to_numpy(np.float64)
+        return index, np.nan_to_num(spend), np.nan_to_num(revenue)
+
+    @staticmethod
+    def cross_correlation(spend, revenue, max_lag):
+        """Normalized correlation of spend on day t with revenue on day t+k, k = 0..max_lag, for every row"""
+        n = spend.shape[1]
+        size = next_fast_len(2 * n - 1)
+        x = spend - spend.mean(axis=1, keepdims=True)
+        y = revenue - revenue.mean(axis=1, keepdims=True)
+        # zero padding to 2n-1 makes the circular FFT correlation linear
+        cc = irfft(np.conj(rfft(x, size, axis=1)) * rfft(y, size, axis=1), size, axis=1)[:, :max_lag + 1]
+        norm = np.sqrt((x ** 2).sum(axis=1) * (y ** 2).sum(axis=1))
+        with np.errstate(divide='ignore', invalid='ignore'):
+            return cc / norm[:, None]
+
+    @staticmethod
+    def lag_adjusted_roas(spend, revenue, lags):
+        """Total and first/last-day ROAS crediting revenue `lag` days after the spend that drove it"""
+        n = spend.shape[1]
+        t = np.arange(n)
+        shifted = t[None, :] + lags[:, None]
+        valid = shifted < n
+        later_revenue = np.where(valid, np.take_along_axis(revenue, np.minimum(shifted, n - 1), axis=1), 0.0)
+        paid = np.where(valid, spend, 0.0)
+
+        with np.errstate(divide='ignore', invalid='ignore'):
+            total = later_revenue.sum(axis=1) / np.where(paid.sum(axis=1) > 0, paid.sum(axis=1), np.nan)
+            daily = np.where(paid > 0, later_revenue / paid, np.nan)
+
+        active = ~np.isnan(daily)
+        rows = np.arange(len(daily))
+        first = np.where(active.any(axis=1), daily[rows, active.argmax(axis=1)], np.nan)
+        last = np.where(active.any(axis=1), daily[rows, n - 1 - active[:, ::-1].argmax(axis=1)], np.nan)
+        return total, first, last
+
+    def analyze_level(self, keys):
+        """Dominant lag and lag-adjusted ROAS for every series at one level, in row batches"""
+        index, spend, revenue = self.series_matrix(keys)
+        max_lag = min(self.max_lag, spend.shape[1] - 1)
+        frames = []
+
+        for start in range(0, len(index), self.batch_rows):
+            s = spend[start:start + self.batch_rows]
+            r = revenue[start:start + self.batch_rows]
+            cc = self.cross_correlation(s, r, max_lag)
+            active_days = (s > 0).sum(axis=1)
+
+            best = np.nan_to_num(cc, nan=-np.inf).argmax(axis=1)
+            best_corr = cc[np.arange(len(cc)), best]
+            # only trust a lag the series has enough days and correlation to support
+            lags = np.where((active_days >= self.min_days) & (best_corr >= self.min_correlation), best, 0)
+            total, first, last = self.lag_adjusted_roas(s, r, lags)
+            with np.errstate(divide='ignore', invalid='ignore'):
+                same_day = r.sum(axis=1) / np.where(s.sum(axis=1) > 0, s.sum(axis=1), np.nan)
+
+            frames.append(pd.DataFrame({
+                'active_days': active_days,
+                'spend': s.sum(axis=1),
+                'lag_days': lags,
+                'lag_correlation': cc[np.arange(len(cc)), lags],
+                'zero_lag_correlation': cc[:, 0],
+                'roas': same_day,
+                'roas_lag_adjusted': total,
+                'roas_first_lag_adjusted': first,
+                'roas_last_lag_adjusted': last
+            }))
+
+        result = pd.concat(frames, ignore_index=True)
+        result.insert(0, keys[-1], index.get_level_values(len(keys) - 1))
+        for i, key in enumerate(keys[:-1]):
+            result.insert(i, key, index.get_level_values(i))
+        first = result['roas_first_lag_adjusted'].where(result['roas_first_lag_adjusted'] > 0)
+        result['roas_change_pct_lag_adjusted'] = (result['roas_last_lag_adjusted'] - first) / first * 100
+        return result.sort_values(keys, kind='stable').reset_index(drop=True)
+
+    def analyze(self):
+        """Lags for every campaign and adset series"""
+        print("\nAnalyzing spend->revenue lag...")
+        self.results = {
+            'campaigns': self.analyze_level(['campaign_name']),
+            'adsets': self.analyze_level(['campaign_name', 'adset_name'])
+        }
+        summary = self.summarize()
+        print(f"Dominant lag {summary['dominant_lag_days']}d; "
+              f"{summary['lagged_spend_share']:.0%} of adset spend shows a lag > 0")
+        return self.results
+
+    def summarize(self, results=None):
+        """Spend-weighted lag distribution across adsets"""
+        results = results or self.results
+        adsets = results['adsets']
+        by_lag = adsets.groupby('lag_days')['spend'].sum()
+        share = by_lag / by_lag.sum() if by_lag.sum() > 0 else by_lag
+        lagged = adsets[adsets['lag_days'] > 0]
+        return {
+            'dominant_lag_days': int(share.idxmax()) if len(share) else 0,
+            'lagged_spend_share': float(share[share.index > 0].sum()),
+            'lag_spend_share': {int(k): float(v) for k, v in share.items()},
+            'series_analyzed': len(adsets) + len(results['campaigns']),
+            'lagged_adsets': lagged.nlargest(5, 'spend')[
+                ['campaign_name', 'adset_name', 'lag_days', 'lag_correlation', 'roas', 'roas_lag_adjusted']
+            ].to_dict('records')
+        }
+
+    @staticmethod
+    def format_lag_report(summary):
+        """Markdown section for the report"""
+        report = "\n## Spend → Revenue Lag\n\n"
+        report += (f"Dominant lag: **{summary['dominant_lag_days']} days**; "
+                   f"{summary['lagged_spend_share']:.0%} of adset spend shows revenue arriving after the spend "
+                   f"({summary['series_analyzed']} campaign and adset series analyzed).\n\n")
+        if summary['lagged_adsets']:
+            report += "| Campaign | Adset | Lag (days) | Correlation | Same-day ROAS | Lag-adjusted ROAS |\n"
+            report += "|---|---|---|---|---|---|\n"
+            for row in summary['lagged_adsets']:
+                report += (f"| {row['campaign_name']} | {row['adset_name']} | {row['lag_days']} | "
+                           f"{row['lag_correlation']:.2f} | {row['roas']:.2f} | {row['roas_lag_adjusted']:.2f} |\n")
+            report += "\n"
+        return report
+
+
+if __name__ == "__main__":
+    import json
+    import yaml
+    from data_agent import DataAgent
+
+    with open('config.yaml', 'r') as f:
+        config = yaml.safe_load(f)
+
+    data_agent = DataAgent()
+    data_agent.load_data()
+
+    analyzer = LagAnalyzer(data_agent, config)
+    analyzer.analyze()
+    print(json.dumps(analyzer.summarize(), indent=2))
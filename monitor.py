@@ -0,0 +1,284 @@
+"""
+Performance Monitor - Online anomaly and drift detection on daily ROAS/CTR streams
+"""
+import json
+import math
+import os
+import bisect
+from collections import deque
+import pandas as pd
+import numpy as np
+
+
+class EWMADetector:
+    """Exponentially weighted mean/variance with a sigma band"""
+
+    def __init__(self, alpha=0.3, sigma=3.0, warmup=7, state=None):
+        self.alpha = alpha
+        self.sigma = sigma
+        self.warmup = warmup
+        state = state or {}
+        self.n = state.get('n', 0)
+        self.mean = state.get('mean', 0.0)
+        self.var = state.get('var', 0.0)
+
+    def update(self, x):
+        """Score x against the current band, then fold it into the state"""
+        alert = None
+        if self.n >= self.warmup and self.var > 0:
+            std = math.sqrt(self.var)
+            z = (x - self.mean) / std
+            if abs(z) > self.sigma:
+                alert = {
+                    'detector': 'ewma',
+                    'direction': 'down' if z < 0 else 'up',
+                    'score': float(z),
+                    'expected': float(self.mean)
+                }
+
+        if self.n == 0:
+            self.mean = x
+        else:
+            diff = x - self.mean
+            incr = self.alpha * diff
+            self.mean += incr
+            self.var = (1 - self.alpha) * (self.var + diff * incr)
+        self.n += 1
+        return alert
+
+    def to_dict(self):
+        return {'n': self.n, 'mean': self.mean, 'var': self.var}
+
+
+class CUSUMDetector:
+    """Two-sided CUSUM on values standardized by a warm-up baseline"""
+
+    def __init__(self, k=0.5, h=5.0, warmup=7, state=None):
+        self.k = k
+        self.h = h
+        self.warmup = warmup
+        state = state or {}
+        # Welford accumulators for the baseline, frozen once warm-up ends
+        self.n = state.get('n', 0)
+        self.mu = state.get('mu', 0.0)
+        self.m2 = state.get('m2', 0.0)
+        self.s_low = state.get('s_low', 0.0)
+        self.s_high = state.get('s_high', 0.0)
+
+    def update(self, x):
+        """Accumulate drift of x away from the baseline mean"""
+        if self.n < self.warmup:
+            self.n += 1
+            delta = x - self.mu
+            self.mu += delta / self.n
+            self.m2 += delta * (x - self.mu)
+            return None
+
+        sd = math.sqrt(self.m2 / (self.n - 1)) if self.n > 1 else 0.0
+        if sd == 0:
+            return None
+
+        z = (x - self.mu) / sd
+        self.s_low = max(0.0, self.s_low - z - self.k)
+        self.s_high = max(0.0, self.s_high + z - self.k)
+
+        alert = None
+        if self.s_low > self.h or self.s_high > self.h:
+            direction = 'down' if self.s_low > self.h else 'up'
+            alert = {
+                'detector': 'cusum',
+                'direction': direction,
+                'score': float(self.s_low if direction == 'down' else self.s_high),
+                'expected': float(self.mu)
+            }
+            self.s_low = 0.0
+            self.s_high = 0.0
+        return alert
+
+    def to_dict(self):
+        return {'n': self.n, 'mu': self.mu, 'm2': self.m2,
+                's_low': self.s_low, 's_high': self.s_high}
+
+
+class RollingQuantileDetector:
+    """Flags values below the q-quantile of the last `window` observations"""
+
+    def __init__(self, window=7, quantile=0.05, state=None):
+        self.window = window
+        self.quantile = quantile
+        values = (state or {}).get('values', [])
+        self.values = deque(values, maxlen=window)
+        self.sorted_values = sorted(self.values)
+
+    def update(self, x):
+        """Compare x with the window quantile; cost is bounded by the window size"""
+        alert = None
+        if len(self.values) == self.window:
+            idx = min(int(self.quantile * (self.window - 1)), self.window - 1)
+            threshold = self.sorted_values[idx]
+            if x < threshold:
+                alert = {
+                    'detector': 'rolling_quantile',
+                    'direction': 'down',
+                    'score': float(x - threshold),
+                    'expected': float(threshold)
+                }
+            oldest = self.values[0]
+            del self.sorted_values[bisect.bisect_left(self.sorted_values, oldest)]
+
+        self.values.append(x)
+        bisect.insort(self.sorted_values, x)
+        return alert
+
+    def to_dict(self):
+        return {'values': list(self.values)}
+
+
+class PerformanceMonitor:
+    def __init__(self, data_agent, config):
+        self.data_agent = data_agent
+        self.config = config
+        self.settings = config.get('monitoring', {})
+        self.keys = self.settings.get('group_by', ['campaign_name', 'adset_name'])
+        self.metrics = self.settings.get('metrics', ['roas', 'ctr'])
+        self.state_file = self.settings.get('state_file', 'logs/monitor_state.json')
+        self.alerts_file = self.settings.get('alerts_file', 'logs/monitor_alerts.jsonl')
+        self.state = {}
+        self.alerts = []
+
+    def load_state(self):
+        """Load detector state from the previous monitoring run"""
+        if os.path.exists(self.state_file):
+            with open(self.state_file, 'r', encoding='utf-8') as f:
+                self.state = json.load(f)
+        return self.state
+
+    def save_state(self):
+        """Persist detector state so the next run only consumes new days"""
+        os.makedirs(os.path.dirname(self.state_file) or '.', exist_ok=True)
+        with open(self.state_file, 'w', encoding='utf-8') as f:
+            json.dump(self.state, f)
+
+    def _make_detectors(self, saved=None):
+        """Build the detector set for one metric of one series"""
+        saved = saved or {}
+        warmup = self.settings.get('warmup_days', 7)
+        return {
+            'ewma': EWMADetector(
+                alpha=self.settings.get('ewma_alpha', 0.3),
+                sigma=self.settings.get('ewma_sigma', 3.0),
+                warmup=warmup,
+                state=saved.get('ewma')
+            ),
+            'cusum': CUSUMDetector(
+                k=self.settings.get('cusum_k', 0.5),
+                h=self.settings.get('cusum_h', 5.0),
+                warmup=warmup,
+                state=saved.get('cusum')
+            ),
+            'rolling_quantile': RollingQuantileDetector(
+                window=self.settings.get('quantile_window', 7),
+                quantile=self.settings.get('quantile', 0.05),
+                state=saved.get('rolling_quantile')
+            )
+        }
+
+    def _since(self):
+        """Earliest last_date in the state; nothing up to it needs reading again"""
+        dates = [v['last_date'] for v in self.state.values() if 'last_date' in v]
+        return pd.Timestamp(min(dates)) if dates else None
+
+    def _new_rows(self):
+        """Daily per-series rows not yet seen by the monitor"""
+        since = self._since()
+        if self.data_agent.backend is None and self.data_agent.df is None:
+            # load only the new days: partitions are pruned, the SQLite backend filters by date
+            self.data_agent.load_data(start_date=since + pd.Timedelta(days=1) if since is not None else None)
+        daily = self.data_agent.get_time_series_data(groupby=self.keys + ['date'], since=since)
+        if daily.empty:
+            return daily.assign(series=pd.Series(dtype=str))
+        daily['series'] = daily[self.keys].astype(str).agg(' | '.join, axis=1)
+
+        last_seen = pd.to_datetime(daily['series'].map(
+            {k: v['last_date'] for k, v in self.state.items()}
+        ))
+        new_rows = daily[last_seen.isna() | (daily['date'] > last_seen)]
+        return new_rows.sort_values(['series', 'date'])
+
+    def update(self):
+        """Consume new daily rows and return the alerts they raised"""
+        print("\nMonitoring ROAS/CTR streams...")
+        if not self.state:
+            self.load_state()
+
+        new_rows = self._new_rows()
+        alerts = []
+        detectors = {}
+
+        for row in new_rows.itertuples(index=False):
+            series = row.series
+            if series not in detectors:
+                saved = self.state.get(series, {}).get('detectors', {})
+                detectors[series] = {
+                    metric: self._make_detectors(saved.get(metric)) for metric in self.metrics
+                }
+
+            for metric in self.metrics:
+                value = getattr(row, metric)
+                if pd.isna(value) or np.isinf(value):
+                    continue
+                for detector in detectors[series][metric].values():
+                    alert = detector.update(float(value))
+                    if alert:
+                        alert.update({
+                            'series': series,
+                            'date': row.date.strftime('%Y-%m-%d'),
+                            'metric': metric,
+                            'value': float(value)
+                        })
+                        alerts.append(alert)
+
+            self.state[series] = {'last_date': row.date.strftime('%Y-%m-%d')}
+
+        for series, metric_detectors in detectors.items():
+            self.state[series]['detectors'] = {
+                metric: {name: d.to_dict() for name, d in dets.items()}
+                for metric, dets in metric_detectors.items()
+            }
+
+        self.alerts = alerts
+        print(f"Processed {len(new_rows)} new series-days, raised {len(alerts)} alerts")
+        return alerts
+
+    def write_alerts(self):
+        """Append alerts to the JSON lines alert log"""
+        os.makedirs(os.path.dirname(self.alerts_file) or '.', exist_ok=True)
+        with open(self.alerts_file, 'a', encoding='utf-8') as f:
+            for alert in self.alerts:
+                f.write(json.dumps(alert) + "\n")
+        print(f"Appended {len(self.alerts)} alerts to {self.alerts_file}")
+
+    def run(self):
+        """Update detectors with the latest export and persist alerts and state"""
+        alerts = self.update()
+        self.write_alerts()
+        self.save_state()
+        return alerts
+
+
+if __name__ == "__main__":
+    import sys
+    import yaml
+    from data_agent import DataAgent
+
+    with open('config.yaml', 'r') as f:
+        config = yaml.safe_load(f)
+
+    data_agent = DataAgent()
+    if len(sys.argv) > 1:
+        data_agent.config['data']['csv_path'] = sys.argv[1]
+
+    # the monitor loads only days after its saved state
+    monitor = PerformanceMonitor(data_agent, config)
+    alerts = monitor.run()
+    print(json.dumps(alerts[:5], indent=2))
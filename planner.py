@@ -90,6 +90,26 @@ class PlannerAgent:
         
         return None
     
+    @staticmethod
+    def decomposition_window(tasks):
+        """(needed, window_days) of the ROAS decomposition a task list asks for"""
+        needed = any(task['type'] in ('identify_decline', 'analyze_roas') for task in tasks)
+        window_days = next((task['time_window']['days'] for task in tasks if 'time_window' in task), None)
+        return needed, window_days
+    
+    def plan_batch(self, queries):
+        """Parse many queries into one physical plan: every analysis stage once, plus each distinct decomposition window"""
+        logical = []
+        for query in queries:
+            tasks = self.parse_query(query)
+            needed, window_days = self.decomposition_window(tasks)
+            logical.append({'query': query, 'tasks': tasks, 'decompose': needed, 'window_days': window_days})
+        
+        windows = sorted({q['window_days'] for q in logical if q['decompose']}, key=lambda w: (w is not None, w))
+        print(f"\nBatch plan: {len(queries)} queries -> {len(windows)} decomposition windows, one data scan")
+        
+        return {'queries': logical, 'decomposition_windows': windows}
+    
     def get_execution_plan(self):
         """Return ordered execution plan"""
         plan = []
@@ -126,3 +146,6 @@ if __name__ == "__main__":
     for query in test_queries:
         tasks = planner.parse_query(query)
         print(planner.format_plan_summary())
+    
+    batch = planner.plan_batch(test_queries)
+    print(f"Shared plan: decomposition windows {batch['decomposition_windows']}")
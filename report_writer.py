@@ -0,0 +1,180 @@
+"""
+Report Writer - Streams report sections to markdown or HTML files as they are produced
+"""
+import hashlib
+import html
+import os
+import re
+
+FORMATS = {'markdown': '.md', 'html': '.html'}
+
+HTML_HEAD = """<!DOCTYPE html>
+<html>
+<head>
+<meta charset="utf-8">
+<title>{title}</title>
+<style>
+body {{ font-family: -apple-system, "Segoe UI", Helvetica, Arial, sans-serif; max-width: 960px; margin: 2em auto; line-height: 1.5; }}
+table {{ border-collapse: collapse; }}
+th, td {{ border: 1px solid #ccc; padding: 4px 8px; }}
+img {{ max-width: 100%; }}
+</style>
+</head>
+<body>
+"""
+HTML_TAIL = "</body>\n</html>\n"
+
+
+class MarkdownToHTML:
+    """Line-at-a-time converter for the markdown subset the reports use"""
+
+    def __init__(self):
+        self.block = None
+        self.nested = False
+
+    @staticmethod
+    def inline(text):
+        text = html.escape(text, quote=False)
+        text = re.sub(r'!\[([^\]]*)\]\(([^)]+)\)', r'<img alt="\1" src="\2">', text)
+        text = re.sub(r'\[([^\]]+)\]\(([^)]+)\)', r'<a href="\2">\1</a>', text)
+        text = re.sub(r'\*\*(.+?)\*\*', r'<strong>\1</strong>', text)
+        text = re.sub(r'(?<![\w*])\*(?!\s)(.+?)(?<!\s)\*(?![\w*])', r'<em>\1</em>', text)
+        return re.sub(r'`([^`]+)`', r'<code>\1</code>', text)
+
+    def _open(self, block, tag=''):
+        out = self.close() if self.block != block else ''
+        if self.block != block:
+            self.block = block
+            out += tag
+        return out
+
+    def close(self):
+        """Close whatever block is open"""
+        out = ''
+        if self.nested:
+            out += '</ul>'
+            self.nested = False
+        if self.block in ('ul', 'ol'):
+            out += f'</li></{self.block}>\n'
+        elif self.block == 'table':
+            out += '</table>\n'
+        elif self.block == 'p':
+            out += '</p>\n'
+        self.block = None
+        return out
+
+    def feed(self, line):
+        """HTML for one markdown line"""
+        stripped = line.strip()
+        if not stripped:
+            return self.close()
+
+        heading = re.match(r'(#{1,6})\s+(.*)', stripped)
+        if heading and not line.startswith(' '):
+            level = len(heading.group(1))
+            return self.close() + f'<h{level}>{self.inline(heading.group(2))}</h{level}>\n'
+        if re.fullmatch(r'-{3,}', stripped):
+            return self.close() + '<hr>\n'
+
+        if stripped.startswith('|'):
+            cells = [c.strip().replace('\\|', '|') for c in re.split(r'(?<!\\)\|', stripped.strip('|'))]
+            if all(re.fullmatch(r':?-+:?', c) for c in cells):
+                return ''
+            tag = 'th' if self.block != 'table' else 'td'
+            out = self._open('table', '<table>\n')
+            return out + '<tr>' + ''.join(f'<{tag}>{self.inline(c)}</{tag}>' for c in cells) + '</tr>\n'
+
+        bullet = re.match(r'(\s*)[-*]\s+(.*)', line)
+        if bullet and bullet.group(1) and self.block in ('ul', 'ol'):
+            out = '' if self.nested else '<ul>'
+            self.nested = True
+            return out + f'<li>{self.inline(bullet.group(2))}</li>'
+        numbered = re.match(r'(\d+)\.\s+(.*)', stripped)
+        if bullet or numbered:
+            block = 'ul' if bullet else 'ol'
+            text = (bullet or numbered).group(2)
+            if self.block == block:
+                out = ('</ul>' if self.nested else '') + '</li>\n'
+                self.nested = False
+            else:
+                start = f' start="{numbered.group(1)}"' if numbered and numbered.group(1) != '1' else ''
+                out = self._open(block, f'<{block}{start}>\n')
+            return out + f'<li>{self.inline(text)}'
+
+        out = self._open('p', '<p>')
+        return out + self.inline(stripped) + ('<br>\n' if line.endswith('  ') else '\n')
+
+
+class ReportWriter:
+    def __init__(self, path, fmt='markdown', title='Report'):
+        if fmt not in FORMATS:
+            raise ValueError(f"Unknown report format '{fmt}', expected one of {list(FORMATS)}")
+        self.path = path
+        self.fmt = fmt
+        self.title = title
+        self.file = None
+        self.converter = MarkdownToHTML() if fmt == 'html' else None
+        self.partial = ''
+
+    def __enter__(self):
+        os.makedirs(os.path.dirname(self.path) or '.', exist_ok=True)
+        self.file = open(self.path, 'w', encoding='utf-8')
+        if self.converter:
+            self.file.write(HTML_HEAD.format(title=html.escape(self.title)))
+        return self
+
+    def write(self, chunk):
+        """Write one markdown chunk; HTML is converted a complete line at a time"""
+        if not self.converter:
+            self.file.write(chunk)
+            return
+        lines = (self.partial + chunk).split('\n')
+        self.partial = lines.pop()
+        for line in lines:
+            self.file.write(self.converter.feed(line))
+
+    def writelines(self, chunks):
+        for chunk in chunks:
+            self.write(chunk)
+
+    def __exit__(self, *exc):
+        if self.converter:
+            if self.partial:
+                self.file.write(self.converter.feed(self.partial))
+            self.file.write(self.converter.close() + HTML_TAIL)
+        self.file.close()
+        return False
+
+    @staticmethod
+    def file_name(name, fmt='markdown'):
+        """Stable, filesystem-safe file name for a campaign or other group"""
+        slug = re.sub(r'[^a-z0-9]+', '-', str(name).lower()).strip('-')[:60]
+        digest = hashlib.sha256(str(name).encode('utf-8')).hexdigest()[:8]
+        return f"{slug}-{digest}{FORMATS[fmt]}"
+
+    @classmethod
+    def write_split(cls, groups, directory, fmt, render, index_title):
+        """One file per (name, items) group streamed through render(name, items), plus an index file"""
+        index = []
+        for name, items in groups:
+            file_name = cls.file_name(name, fmt)
+            with cls(os.path.join(directory, file_name), fmt, title=str(name)) as writer:
+                writer.writelines(render(name, items))
+            index.append({'name': name, 'file': file_name, 'items': len(items)})
+
+        with cls(os.path.join(directory, f"index{FORMATS[fmt]}"), fmt, title=index_title) as writer:
+            writer.write(f"# {index_title}\n\n")
+            for entry in index:
+                writer.write(f"- [{entry['name']}]({entry['file']}) ({entry['items']})\n")
+        return index
+
+
+if __name__ == "__main__":
+    import sys
+
+    source = sys.argv[1] if len(sys.argv) > 1 else 'reports/report.md'
+    target = os.path.splitext(source)[0] + FORMATS['html']
+    with open(source, 'r', encoding='utf-8') as f, ReportWriter(target, 'html', title=source) as writer:
+        for line in f:
+            writer.write(line)
+    print(f"Wrote {target}")
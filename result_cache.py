@@ -0,0 +1,97 @@
+"""
+Result Cache - Persistent LRU cache of full analysis results
+"""
+import hashlib
+import json
+import os
+import time
+
+# config.yaml sections whose values change analysis output (validation decides which rows are analyzed)
+ANALYSIS_SECTIONS = ['thresholds', 'metrics', 'agents', 'decomposition', 'budget', 'forecast', 'approx', 'sketches',
+                     'charts', 'clustering', 'lag', 'validation', 'random_seed']
+
+
+class ResultCache:
+    def __init__(self, config):
+        settings = config.get('cache', {})
+        self.enabled = settings.get('enabled', True)
+        self.cache_dir = settings.get('dir', '.cache/results')
+        self.max_bytes = settings.get('max_bytes', 50 * 1024 * 1024)
+        self.index_path = os.path.join(self.cache_dir, 'index.json')
+        self.index = self._load_index()
+
+    def _load_index(self):
+        """Load key -> {size, last_access} bookkeeping"""
+        if os.path.exists(self.index_path):
+            with open(self.index_path, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        return {}
+
+    def _save_index(self):
+        os.makedirs(self.cache_dir, exist_ok=True)
+        with open(self.index_path, 'w', encoding='utf-8') as f:
+            json.dump(self.index, f)
+
+    @staticmethod
+    def make_key(tasks, config, fingerprint):
+        """Hash the normalized task list, analysis thresholds and dataset fingerprint"""
+        normalized_tasks = sorted(
+            (task['type'], task.get('time_window', {}).get('days')) for task in tasks
+        )
+        key_material = {
+            'tasks': normalized_tasks,
+            'confidence_min': config.get('confidence_min'),
+            'dataset': fingerprint
+        }
+        key_material.update({section: config.get(section, {}) for section in ANALYSIS_SECTIONS})
+        encoded = json.dumps(key_material, sort_keys=True, default=str).encode('utf-8')
+        return hashlib.sha256(encoded).hexdigest()
+
+    def _path(self, key):
+        return os.path.join(self.cache_dir, f"{key}.json")
+
+    def get(self, key):
+        """Return the cached payload for key, or None on a miss"""
+        if not self.enabled or key not in self.index or not os.path.exists(self._path(key)):
+            return None
+
+        with open(self._path(key), 'r', encoding='utf-8') as f:
+            payload = json.load(f)
+
+        # re-insert so entries accessed within one clock tick still evict in access order
+        self.index[key] = dict(self.index.pop(key), last_access=time.time())
+        self._save_index()
+        return payload
+
+    def put(self, key, payload, encoder=None):
+        """Store payload under key and evict least recently used entries over budget"""
+        if not self.enabled:
+            return
+
+        os.makedirs(self.cache_dir, exist_ok=True)
+        with open(self._path(key), 'w', encoding='utf-8') as f:
+            json.dump(payload, f, cls=encoder)
+
+        self.index.pop(key, None)
+        self.index[key] = {'size': os.path.getsize(self._path(key)), 'last_access': time.time()}
+        self._evict()
+        self._save_index()
+
+    def _evict(self):
+        """Drop least recently used entries until the cache fits in max_bytes"""
+        total = sum(entry['size'] for entry in self.index.values())
+        for key in sorted(self.index, key=lambda k: self.index[k]['last_access']):
+            if total <= self.max_bytes:
+                break
+            total -= self.index[key]['size']
+            del self.index[key]
+            if os.path.exists(self._path(key)):
+                os.remove(self._path(key))
+
+    def clear(self):
+        """Remove every cached result"""
+        for key in list(self.index):
+            if os.path.exists(self._path(key)):
+                os.remove(self._path(key))
+        self.index = {}
+        self._save_index()
@@ -0,0 +1,192 @@
+"""
+ROAS Decomposition - Period-over-period mix/rate attribution of aggregate ROAS changes
+"""
+import numpy as np
+import pandas as pd
+
+
+class ROASDecomposer:
+    def __init__(self, data_agent, config):
+        self.data_agent = data_agent
+        self.config = config
+        settings = config.get('decomposition', {})
+        self.hierarchy = settings.get('hierarchy', ['platform', 'campaign_name', 'adset_name', 'creative_type'])
+        self.window_days = settings.get('window_days', 7)
+        self.min_contribution = settings.get('min_contribution', 0.05)
+        self.max_children = settings.get('max_children', 5)
+        self.daily = None
+        self.result = {}
+
+    def _daily_totals(self):
+        """Spend/revenue per finest hierarchy node and day, scanned once and shared by every window"""
+        if self.daily is None:
+            self.daily = self.data_agent.aggregate(self.hierarchy + ['date'], ['spend', 'revenue'])
+        return self.daily
+    
+    def _period_totals(self, window_days):
+        """Spend/revenue per finest hierarchy node for the current and previous window"""
+        df = self._daily_totals()
+        end = df['date'].max()
+        current_start = end - pd.Timedelta(days=window_days - 1)
+        previous_start = current_start - pd.Timedelta(days=window_days)
+
+        in_scope = df[df['date'] >= previous_start]
+        period = np.where(in_scope['date'] >= current_start, 'curr', 'prev')
+
+        fine = in_scope.groupby(self.hierarchy + [period])[['spend', 'revenue']].sum().unstack(fill_value=0)
+        fine.columns = [f"{measure}_{p}" for measure, p in fine.columns]
+        for col in ['spend_prev', 'spend_curr', 'revenue_prev', 'revenue_curr']:
+            if col not in fine.columns:
+                fine[col] = 0.0
+
+        periods = {
+            'previous': (previous_start, current_start - pd.Timedelta(days=1)),
+            'current': (current_start, end)
+        }
+        return fine.reset_index(), periods
+
+    @staticmethod
+    def _attribute(agg, totals):
+        """Split each node's share of the ROAS change into mix and rate effects"""
+        w0 = agg['spend_prev'] / totals['spend_prev']
+        w1 = agg['spend_curr'] / totals['spend_curr']
+        r0 = agg['revenue_prev'] / agg['spend_prev'].where(agg['spend_prev'] > 0)
+        r1 = agg['revenue_curr'] / agg['spend_curr'].where(agg['spend_curr'] > 0)
+
+        # a node missing from one period keeps the other period's ROAS, so its change is pure mix
+        r0, r1 = r0.fillna(r1).fillna(0.0), r1.fillna(r0).fillna(0.0)
+        overall = (totals['roas_prev'] + totals['roas_curr']) / 2
+
+        agg = agg.copy()
+        agg['roas_prev'] = r0
+        agg['roas_curr'] = r1
+        agg['mix_effect'] = (w1 - w0) * ((r0 + r1) / 2 - overall)
+        agg['rate_effect'] = (r1 - r0) * (w0 + w1) / 2
+        agg['contribution'] = agg['mix_effect'] + agg['rate_effect']
+        return agg
+
+    def decompose(self, window_days=None):
+        """Drill down the hierarchy, pruning branches below the contribution threshold"""
+        window_days = window_days or self.window_days
+        print(f"\nDecomposing ROAS change: last {window_days} days vs previous {window_days} days...")
+        fine, periods = self._period_totals(window_days)
+
+        totals = {
+            'spend_prev': fine['spend_prev'].sum(),
+            'spend_curr': fine['spend_curr'].sum(),
+            'revenue_prev': fine['revenue_prev'].sum(),
+            'revenue_curr': fine['revenue_curr'].sum()
+        }
+        totals['roas_prev'] = totals['revenue_prev'] / totals['spend_prev'] if totals['spend_prev'] else 0.0
+        totals['roas_curr'] = totals['revenue_curr'] / totals['spend_curr'] if totals['spend_curr'] else 0.0
+        roas_change = totals['roas_curr'] - totals['roas_prev']
+
+        measures = ['spend_prev', 'spend_curr', 'revenue_prev', 'revenue_curr']
+        drivers = []
+        level_effects = {}
+        branch = fine
+
+        for depth, level in enumerate(self.hierarchy):
+            keys = self.hierarchy[:depth + 1]
+            agg = self._attribute(branch.groupby(keys)[measures].sum().reset_index(), totals)
+
+            if depth == 0:
+                level_effects = {
+                    'mix_effect': float(agg['mix_effect'].sum()),
+                    'rate_effect': float(agg['rate_effect'].sum())
+                }
+
+            # a branch must explain min_contribution of its parent's movement (of the total
+            # change at the top level); at most max_children branches per parent are expanded
+            if depth == 0:
+                agg['parent_contribution'] = roas_change
+            else:
+                parents = kept[keys[:-1] + ['contribution']].rename(columns={'contribution': 'parent_contribution'})
+                agg = agg.merge(parents, on=keys[:-1], how='left')
+            agg = agg[agg['contribution'].abs() >= self.min_contribution * agg['parent_contribution'].abs()]
+            ranked = agg.sort_values('contribution', key=np.abs, ascending=False)
+            if depth == 0:
+                kept = ranked.head(self.max_children)
+            else:
+                kept = ranked.groupby(keys[:-1], sort=False).head(self.max_children)
+            for row in kept.itertuples(index=False):
+                drivers.append({
+                    'level': level,
+                    'path': {k: getattr(row, k) for k in keys},
+                    'spend_prev': float(row.spend_prev),
+                    'spend_curr': float(row.spend_curr),
+                    'roas_prev': float(row.roas_prev),
+                    'roas_curr': float(row.roas_curr),
+                    'mix_effect': float(row.mix_effect),
+                    'rate_effect': float(row.rate_effect),
+                    'contribution': float(row.contribution),
+                    'share_of_change': float(row.contribution / roas_change) if roas_change else 0.0
+                })
+
+            if kept.empty:
+                break
+            # only children of significant branches are expanded at the next level
+            branch = branch.merge(kept[keys], on=keys, how='inner')
+
+        self.result = {
+            'window_days': window_days,
+            'previous_period': {
+                'start': periods['previous'][0].strftime('%Y-%m-%d'),
+                'end': periods['previous'][1].strftime('%Y-%m-%d'),
+                'spend': float(totals['spend_prev']),
+                'roas': float(totals['roas_prev'])
+            },
+            'current_period': {
+                'start': periods['current'][0].strftime('%Y-%m-%d'),
+                'end': periods['current'][1].strftime('%Y-%m-%d'),
+                'spend': float(totals['spend_curr']),
+                'roas': float(totals['roas_curr'])
+            },
+            'roas_change': float(roas_change),
+            'mix_effect': level_effects.get('mix_effect', 0.0),
+            'rate_effect': level_effects.get('rate_effect', 0.0),
+            'min_contribution': self.min_contribution,
+            'drivers': drivers
+        }
+
+        print(f"ROAS {totals['roas_prev']:.2f} -> {totals['roas_curr']:.2f}, {len(drivers)} significant drivers")
+        return self.result
+
+    def format_decomposition_report(self, top_n=10, result=None):
+        """Format the decomposition (the latest one by default) as a markdown section"""
+        r = result or self.result
+        report = "\n## ROAS Change Decomposition\n\n"
+        report += f"**Previous period** ({r['previous_period']['start']} to {r['previous_period']['end']}): "
+        report += f"ROAS {r['previous_period']['roas']:.2f} on ${r['previous_period']['spend']:,.2f} spend\n\n"
+        report += f"**Current period** ({r['current_period']['start']} to {r['current_period']['end']}): "
+        report += f"ROAS {r['current_period']['roas']:.2f} on ${r['current_period']['spend']:,.2f} spend\n\n"
+        report += f"**Change:** {r['roas_change']:+.2f} "
+        report += f"(mix effect {r['mix_effect']:+.2f}, rate effect {r['rate_effect']:+.2f})\n\n"
+
+        if r['drivers']:
+            report += "| Level | Segment | ROAS prev | ROAS curr | Mix | Rate | Share of change |\n"
+            report += "|---|---|---|---|---|---|---|\n"
+            for d in r['drivers'][:top_n]:
+                segment = ' > '.join(str(v) for v in d['path'].values()).replace('|', '\\|')
+                report += f"| {d['level']} | {segment} | {d['roas_prev']:.2f} | {d['roas_curr']:.2f} | "
+                report += f"{d['mix_effect']:+.3f} | {d['rate_effect']:+.3f} | {d['share_of_change']:.0%} |\n"
+            report += "\n"
+
+        return report
+
+
+if __name__ == "__main__":
+    import json
+    import yaml
+    from data_agent import DataAgent
+
+    with open('config.yaml', 'r') as f:
+        config = yaml.safe_load(f)
+
+    data_agent = DataAgent()
+    data_agent.load_data()
+
+    decomposer = ROASDecomposer(data_agent, config)
+    result = decomposer.decompose()
+    print(decomposer.format_decomposition_report())
+    print(json.dumps(result['drivers'][:3], indent=2))
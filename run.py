@@ -5,6 +5,7 @@ import yaml
 import json
 import sys
 import os
+import argparse
 from datetime import datetime
 import numpy as np
 import pandas as pd
@@ -15,6 +16,31 @@ from insight_agent import InsightAgent
 from evaluator import Evaluator
 from creative_generator import CreativeGenerator
 from planner import PlannerAgent
+from result_cache import ResultCache
+from roas_decomposition import ROASDecomposer
+from budget_optimizer import BudgetOptimizer
+from forecaster import Forecaster
+from dag_scheduler import DAGScheduler
+from run_history import RunHistory
+from chart_renderer import ChartRenderer
+from lag_analyzer import LagAnalyzer
+from report_writer import FORMATS, ReportWriter
+from data_validator import DataValidator
+
+# Custom JSON encoder to handle numpy and pandas types
+class NumpyEncoder(json.JSONEncoder):
+    def default(self, obj):
+        if isinstance(obj, np.integer):
+            return int(obj)
+        if isinstance(obj, np.floating):
+            return float(obj)
+        if isinstance(obj, np.ndarray):
+            return obj.tolist()
+        if isinstance(obj, np.bool_):
+            return bool(obj)
+        if isinstance(obj, pd.Timestamp):
+            return obj.strftime('%Y-%m-%d')
+        return super(NumpyEncoder, self).default(obj)
 
 class AgenticFBAnalyst:
     def __init__(self, config_path="config.yaml"):
@@ -28,6 +54,12 @@ class AgenticFBAnalyst:
         self.insight_agent = None
         self.evaluator = None
         self.creative_generator = None
+        self.decomposer = None
+        self.cache = ResultCache(self.config)
+        self.history = RunHistory(self.config, encoder=NumpyEncoder)
+        outputs = self.config.get('outputs', {})
+        self.report_format = outputs.get('report_format', 'markdown')
+        self.split_by_campaign = outputs.get('split_by_campaign', False)
         
         # Results storage
         self.results = {
@@ -40,8 +72,8 @@ class AgenticFBAnalyst:
             'summary': {}
         }
         
-    def run(self, user_query):
-        """Main execution flow"""
+    def run(self, user_query, force=False, approx=False):
+        """Main execution flow; approx answers from the cached stratified sample"""
         print("=" * 70)
         print("KASPARRO AGENTIC FACEBOOK ANALYST")
         print("=" * 70)
@@ -52,11 +84,112 @@ class AgenticFBAnalyst:
         tasks = self.planner.parse_query(user_query)
         self.results['tasks'] = tasks
         
-        # Step 2: Load and analyze data
+        # Reuse a previous run over the same plan, thresholds and dataset
+        cache_key = self._cache_key(tasks, approx)
+        cached = None if force else self.cache.get(cache_key)
+        if cached:
+            self.history.record_hit(user_query, cached['results'].get('run_id'))
+            return self._restore_cached(cached)
+        
+        # Steps 2-7 as a DAG: analysis stages run concurrently, file writes overlap with compute
+        needed, window_days = self.planner.decomposition_window(tasks)
+        scheduler = self._analysis_dag(approx, [window_days] if needed else [])
+        scheduler.add('results', lambda r: self._query_results(user_query, tasks, r['shared']), deps=['shared'])
+        scheduler.add('report', lambda r: self._generate_report(r['results']), deps=['results'])
+        stage_results = scheduler.run()
+        
+        self.results = stage_results['results']
+        self.results['schedule'] = scheduler.report
+        self._save_log(self.results)  # written last so it includes the schedule
+        self.results['run_id'] = self.history.record(self.results, self.data_agent.dataset_fingerprint(), approx)
+        self.cache.put(cache_key, {'results': self.results}, encoder=NumpyEncoder)
+        
+        print("\n" + "=" * 70)
+        print("ANALYSIS COMPLETE")
+        print("=" * 70)
+        print(f"\nOutputs saved to:")
+        print(f"   - reports/insights.json")
+        print(f"   - reports/creatives.json")
+        print(f"   - {stage_results['report']}")
+        
+        return self.results
+    
+    def run_batch(self, queries, force=False, approx=False):
+        """Answer many queries from one shared analysis pass, one report per query"""
+        print("=" * 70)
+        print(f"KASPARRO AGENTIC FACEBOOK ANALYST - BATCH OF {len(queries)} QUERIES")
+        print("=" * 70)
+        
+        plan = self.planner.plan_batch(queries)
+        batch_dir = os.path.join('reports', 'batch')
+        os.makedirs(batch_dir, exist_ok=True)
+        
+        def campaigns_dir(report_path):
+            # split recommendation files of each query get their own folder under batch/campaigns
+            return 'campaigns/' + os.path.splitext(os.path.basename(report_path))[0]
+        
+        pending, index = [], []
+        for i, logical in enumerate(plan['queries'], 1):
+            report_path = self._report_path(f"query_{i:02d}", batch_dir)
+            cache_key = self._cache_key(logical['tasks'], approx)
+            cached = None if force else self.cache.get(cache_key)
+            if cached:
+                # the entry may come from a differently worded question with the same plan
+                results = dict(cached['results'], query=logical['query'], tasks=logical['tasks'])
+                self._generate_report(results, report_path, campaigns_dir(report_path))
+                self.history.record_hit(logical['query'], results.get('run_id'))
+            else:
+                pending.append((logical, report_path, cache_key))
+            index.append({'query': logical['query'], 'report': report_path, 'cached': bool(cached)})
+        
+        print(f"\n{len(queries) - len(pending)} cached, {len(pending)} to compute")
+        if pending:
+            windows = [logical['window_days'] for logical, _, _ in pending if logical['decompose']]
+            scheduler = self._analysis_dag(approx, windows)
+            stage_results = scheduler.run()
+            shared = stage_results['shared']
+            
+            # fan the shared results back out into per-query results and reports; one history run covers them all
+            per_query = [self._query_results(logical['query'], logical['tasks'], shared) for logical, _, _ in pending]
+            run_id = self.history.record(per_query[0], self.data_agent.dataset_fingerprint(), approx,
+                                         queries=[logical['query'] for logical, _, _ in pending])
+            for (logical, report_path, cache_key), results in zip(pending, per_query):
+                results['run_id'] = run_id
+                self._generate_report(results, report_path, campaigns_dir(report_path))
+                self.cache.put(cache_key, {'results': results}, encoder=NumpyEncoder)
+            self.results = per_query[-1]
+            self.results['schedule'] = scheduler.report
+            self._save_log(self.results)
+        
+        with open(os.path.join(batch_dir, 'index.json'), 'w', encoding='utf-8') as f:
+            json.dump({'plan': plan, 'reports': index}, f, indent=2, cls=NumpyEncoder)
+        
+        print("\n" + "=" * 70)
+        print("BATCH COMPLETE")
+        print("=" * 70)
+        print(f"\nReports saved to {batch_dir}/ (index.json lists query -> report)")
+        
+        return index
+    
+    def _cache_key(self, tasks, approx):
+        """Result cache key of a task list over the current dataset"""
+        fingerprint = self.data_agent.dataset_fingerprint() + ('|approx' if approx else '')
+        return self.cache.make_key(tasks, self.config, fingerprint)
+    
+    def _load(self, approx):
+        """Step 2: load the data (or the cached sample) once for every stage"""
         print("\n" + "=" * 70)
-        self.data_agent.load_data()
+        if approx:
+            self.data_agent.load_sample()
+        else:
+            self.data_agent.load_data()
+            # only the pipeline writes the quarantine file, once per run
+            if self.data_agent.quarantined is not None:
+                DataValidator(self.config).write_quarantine(self.data_agent.quarantined)
+    
+    def _summarize(self, approx):
+        """Dataset overview"""
         summary = self.data_agent.get_basic_summary()
-        self.results['summary'] = summary
         
         print(f"\nDataset Overview:")
         print(f"   - Date range: {summary['date_range']['start']} to {summary['date_range']['end']}")
@@ -64,141 +197,276 @@ class AgenticFBAnalyst:
         print(f"   - Total revenue: ${summary['metrics']['total_revenue']:,.2f}")
         print(f"   - Average ROAS: {summary['metrics']['avg_roas']:.2f}")
         print(f"   - Average CTR: {summary['metrics']['avg_ctr']:.4f}")
-        
-        # Step 3: Generate insights
-        print("\n" + "=" * 70)
+        if approx:
+            print(f"   - Approximate: {summary['sample']['sample_rows']} sampled rows, "
+                  f"ROAS standard error {summary['standard_errors']['avg_roas']:.3f}")
+        return summary
+    
+    def _decompose(self, decomposition_windows):
+        """Compare each requested window with the previous period for decline/ROAS questions"""
+        self.decomposer = ROASDecomposer(self.data_agent, self.config)
+        return {window_days: self.decomposer.decompose(window_days)
+                for window_days in sorted({w or self.decomposer.window_days for w in decomposition_windows})}
+    
+    def _generate_insights(self):
+        """Step 3: Generate insights"""
         self.insight_agent = InsightAgent(self.data_agent)
-        hypotheses = self.insight_agent.generate_hypotheses()
-        self.results['hypotheses'] = hypotheses
-        
-        # Step 4: Validate hypotheses
-        print("\n" + "=" * 70)
+        return self.insight_agent.generate_hypotheses()
+    
+    def _validate(self, hypotheses):
+        """Step 4: Validate hypotheses"""
         self.evaluator = Evaluator(self.data_agent, self.config)
-        validation_results = self.evaluator.evaluate_all(hypotheses)
+        self.evaluator.evaluate_all(hypotheses)
         validated = self.evaluator.get_validated_insights()
-        self.results['validated_insights'] = validated
-        
         print(f"\n✓ Validated {len(validated)}/{len(hypotheses)} hypotheses")
-        
-        # Step 5: Generate creative recommendations
-        print("\n" + "=" * 70)
+        return validated
+    
+    def _generate_creatives(self):
+        """Step 5: Generate creative recommendations"""
         self.creative_generator = CreativeGenerator(self.data_agent, self.config)
-        recommendations = self.creative_generator.generate_recommendations()
-        self.results['creative_recommendations'] = recommendations
+        return self.creative_generator.generate_recommendations()
+    
+    def _lag_summary(self):
+        """Spend->revenue lags, shared with time-decay detection and validation"""
+        return LagAnalyzer(self.data_agent, self.config).summarize(self.data_agent.get_lag_analysis())
+    
+    def _forecast(self):
+        """Where campaign ROAS is heading"""
+        forecaster = Forecaster(self.data_agent, self.config)
+        forecaster.run()
+        return forecaster.get_projected_declines()
+    
+    def _analysis_dag(self, approx, decomposition_windows):
+        """Analysis stages keyed by what they read; everything but validation only needs the loaded data"""
+        scheduler = DAGScheduler(self.config.get('scheduler', {}).get('max_workers', 4))
+        scheduler.add('load', lambda r: self._load(approx))
+        scheduler.add('summary', lambda r: self._summarize(approx), deps=['load'])
+        scheduler.add('data_quality', lambda r: self.data_agent.validation_report, deps=['load'])
+        scheduler.add('hypotheses', lambda r: self._generate_insights(), deps=['load'])
+        scheduler.add('validated_insights', lambda r: self._validate(r['hypotheses']), deps=['hypotheses'])
+        scheduler.add('validation_results', lambda r: self.evaluator.validation_results, deps=['validated_insights'])
+        scheduler.add('creative_recommendations', lambda r: self._generate_creatives(), deps=['load'])
+        scheduler.add('save_insights', lambda r: self._save_insights(r), deps=['hypotheses', 'validated_insights'])
+        scheduler.add('save_creatives', lambda r: self._save_creatives(r), deps=['creative_recommendations'])
+        stages = ['summary', 'data_quality', 'hypotheses', 'validated_insights', 'validation_results',
+                  'creative_recommendations']
         
-        # Step 6: Save outputs
-        print("\n" + "=" * 70)
-        self._save_outputs()
+        # Decomposition, lags, forecasting and budget optimization need complete daily series, so they skip the sample
+        scheduler.add('roas_decomposition', lambda r: {} if approx or not decomposition_windows
+                      else self._decompose(decomposition_windows), deps=['load'])
+        stages.append('roas_decomposition')
+        if not approx:
+            if self.config.get('lag', {}).get('enabled', False):
+                scheduler.add('spend_revenue_lag', lambda r: self._lag_summary(), deps=['load'])
+                stages.append('spend_revenue_lag')
+            scheduler.add('roas_forecast', lambda r: self._forecast(), deps=['load'])
+            scheduler.add('budget_allocation',
+                          lambda r: BudgetOptimizer(self.data_agent, self.config).optimize(), deps=['load'])
+            stages += ['roas_forecast', 'budget_allocation']
+            if self.config.get('charts', {}).get('enabled', True):
+                scheduler.add('charts', lambda r: ChartRenderer(self.data_agent, self.config).render(), deps=['load'])
+                stages.append('charts')
         
-        # Step 7: Generate report
-        self._generate_report()
+        scheduler.add('shared', lambda r: {name: r[name] for name in stages},
+                      deps=stages + ['save_insights', 'save_creatives'])
+        return scheduler
+    
+    def _query_results(self, query, tasks, shared):
+        """One query's results out of the shared analysis"""
+        results = {
+            'query': query,
+            'timestamp': datetime.now().isoformat(),
+            'tasks': tasks
+        }
+        results.update({k: v for k, v in shared.items() if k != 'roas_decomposition'})
         
-        print("\n" + "=" * 70)
-        print("ANALYSIS COMPLETE")
-        print("=" * 70)
-        print(f"\nOutputs saved to:")
-        print(f"   - reports/insights.json")
-        print(f"   - reports/creatives.json")
-        print(f"   - reports/report.md")
+        needed, window_days = self.planner.decomposition_window(tasks)
+        if needed and shared['roas_decomposition']:
+            results['roas_decomposition'] = shared['roas_decomposition'][window_days or self.decomposer.window_days]
+        return results
+    
+    def _restore_cached(self, cached):
+        """Write outputs from a cached run instead of recomputing them"""
+        print("\nCache hit - returning results of an identical earlier analysis (use --force to recompute)")
+        self.results = dict(cached['results'], query=self.results['query'], tasks=self.results['tasks'])
+        
+        self._save_outputs()
+        self._generate_report(self.results)
         
         return self.results
     
     def _save_outputs(self):
         """Save results to files"""
-        
-        # Custom JSON encoder to handle numpy and pandas types
-        class NumpyEncoder(json.JSONEncoder):
-            def default(self, obj):
-                if isinstance(obj, np.integer):
-                    return int(obj)
-                if isinstance(obj, np.floating):
-                    return float(obj)
-                if isinstance(obj, np.ndarray):
-                    return obj.tolist()
-                if isinstance(obj, np.bool_):
-                    return bool(obj)
-                if isinstance(obj, pd.Timestamp):
-                    return obj.strftime('%Y-%m-%d')
-                return super(NumpyEncoder, self).default(obj)
-        
+        self._save_insights(self.results)
+        self._save_creatives(self.results)
+        self._save_log(self.results)
+    
+    def _save_insights(self, results):
+        """Save hypotheses and validated insights"""
         os.makedirs('reports', exist_ok=True)
-        os.makedirs('logs', exist_ok=True)
-        
-        # Save insights
         with open('reports/insights.json', 'w', encoding='utf-8') as f:
             json.dump({
-                'hypotheses': self.results['hypotheses'],
-                'validated_insights': self.results['validated_insights']
+                'hypotheses': results['hypotheses'],
+                'validated_insights': results['validated_insights']
             }, f, indent=2, cls=NumpyEncoder)
         
         print("\nSaved insights.json")
-        
-        # Save creative recommendations
+    
+    def _save_creatives(self, results):
+        """Save creative recommendations"""
+        os.makedirs('reports', exist_ok=True)
         with open('reports/creatives.json', 'w', encoding='utf-8') as f:
-            json.dump(self.results['creative_recommendations'], f, indent=2, cls=NumpyEncoder)
+            json.dump(results['creative_recommendations'], f, indent=2, cls=NumpyEncoder)
         
         print("💾 Saved creatives.json")
-        
-        # Save full log
+    
+    def _save_log(self, results):
+        """Save the full results log"""
+        os.makedirs('logs', exist_ok=True)
         with open('logs/analysis_log.json', 'w', encoding='utf-8') as f:
-            json.dump(self.results, f, indent=2, cls=NumpyEncoder)
+            json.dump(results, f, indent=2, cls=NumpyEncoder)
         
         print("Saved analysis_log.json")
     
-    def _generate_report(self):
-        """Generate markdown report"""
-        report = f"""# Facebook Ads Performance Analysis Report
+    @staticmethod
+    def _se(results, metric, fmt):
+        """' ± se' suffix for approximate metrics"""
+        standard_errors = results['summary'].get('standard_errors', {})
+        if metric not in standard_errors:
+            return ''
+        return f" ± {standard_errors[metric]:{fmt}}"
+    
+    def _report_path(self, name='report', directory='reports'):
+        """Report file in the configured format"""
+        return os.path.join(directory, name + FORMATS[self.report_format])
+    
+    def _generate_report(self, results, path=None, campaigns_dir='campaigns'):
+        """Stream the report to disk section by section, as markdown or HTML"""
+        path = path or self._report_path()
+        with ReportWriter(path, self.report_format, title="Facebook Ads Performance Analysis Report") as writer:
+            writer.writelines(self._report_sections(results, path, campaigns_dir))
+        
+        print(f"Saved {os.path.basename(path)}")
+        return path
+    
+    def _campaign_reports(self, recommendations, path, campaigns_dir='campaigns'):
+        """Write one recommendations file per campaign plus an index; yield the main report's pointer to them"""
+        by_campaign = {}
+        for rec in recommendations:
+            by_campaign.setdefault(rec['campaign_name'], []).append(rec)
+        
+        directory = os.path.join(os.path.dirname(path), campaigns_dir)
+        index = ReportWriter.write_split(
+            by_campaign.items(), directory, self.report_format,
+            lambda name, recs: CreativeGenerator.iter_recommendations_report(recs, f"# Creative Recommendations: {name}"),
+            "Creative Recommendations by Campaign"
+        )
+        
+        ext = FORMATS[self.report_format]
+        yield "\n## Creative Recommendations\n\n"
+        yield (f"{len(recommendations)} recommendations across {len(index)} campaigns, one file per campaign "
+               f"([index]({campaigns_dir}/index{ext})):\n\n")
+        for entry in index:
+            yield f"- [{entry['name']}]({campaigns_dir}/{entry['file']}): {entry['items']} recommendations\n"
+        yield "\n---\n\n"
+    
+    def _report_sections(self, results, path, campaigns_dir='campaigns'):
+        """Report markdown, yielded a section (or a single insight/recommendation) at a time"""
+        summary = results['summary']
+        yield f"""# Facebook Ads Performance Analysis Report
 
-**Query:** {self.results['query']}  
+**Query:** {results['query']}  
 **Generated:** {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}
 
 ---
 
 ## Executive Summary
 
-This analysis examined {self.results['summary']['total_rows']} ad performance records from {self.results['summary']['date_range']['start']} to {self.results['summary']['date_range']['end']}.
+This analysis examined {summary['total_rows']} ad performance records from {summary['date_range']['start']} to {summary['date_range']['end']}.
 
 **Key Metrics:**
-- Total Spend: ${self.results['summary']['metrics']['total_spend']:,.2f}
-- Total Revenue: ${self.results['summary']['metrics']['total_revenue']:,.2f}
-- Average ROAS: {self.results['summary']['metrics']['avg_roas']:.2f}
-- Average CTR: {self.results['summary']['metrics']['avg_ctr']:.4f}
-
+- Total Spend: ${summary['metrics']['total_spend']:,.2f}{self._se(results, 'total_spend', ',.2f')}
+- Total Revenue: ${summary['metrics']['total_revenue']:,.2f}{self._se(results, 'total_revenue', ',.2f')}
+- Average ROAS: {summary['metrics']['avg_roas']:.2f}{self._se(results, 'avg_roas', '.3f')}
+- Average CTR: {summary['metrics']['avg_ctr']:.4f}{self._se(results, 'avg_ctr', '.5f')}
+"""
+        quantiles = summary.get('quantiles')
+        if quantiles:
+            for metric, fmt in [('roas', '.2f'), ('ctr', '.4f')]:
+                spread = ' / '.join(f"{quantiles[metric][p]:{fmt}}" for p in quantiles[metric])
+                yield f"- {metric.upper()} {' / '.join(quantiles[metric])}: {spread}\n"
+        sample = summary.get('sample')
+        if sample:
+            yield (f"\n*Approximate answer from a spend-weighted stratified sample of {sample['sample_rows']:,} "
+                   f"rows ({sample['fraction']:.1%}); ± values are standard errors.*\n")
+        yield """
 ---
-
+"""
+        # Add period-over-period ROAS decomposition
+        if results.get('roas_decomposition'):
+            decomposer = self.decomposer or ROASDecomposer(self.data_agent, self.config)
+            yield decomposer.format_decomposition_report(result=results['roas_decomposition'])
+            yield "---\n"
+        
+        yield """
 ## Validated Insights
 
 """
         # Add validated insights
-        if len(self.results['validated_insights']) > 0:
-            for i, insight in enumerate(self.results['validated_insights'], 1):
+        if len(results['validated_insights']) > 0:
+            hypotheses = {h['id']: h for h in results['hypotheses']}
+            for i, insight in enumerate(results['validated_insights'], 1):
                 # Find corresponding hypothesis
-                hypo = next((h for h in self.results['hypotheses'] if h['id'] == insight['hypothesis_id']), None)
+                hypo = hypotheses.get(insight['hypothesis_id'])
                 if hypo:
-                    report += f"### {i}. {hypo['hypothesis']}\n\n"
-                    report += f"**Confidence:** {insight['confidence']:.2f}\n\n"
-                    report += f"**Conclusion:** {insight['conclusion']}\n\n"
-                    report += f"{hypo['description']}\n\n"
+                    yield (f"### {i}. {hypo['hypothesis']}\n\n"
+                           f"**Confidence:** {insight['confidence']:.2f}\n\n"
+                           f"**Conclusion:** {insight['conclusion']}\n\n"
+                           f"{hypo['description']}\n\n")
         else:
-            report += "No insights passed the validation threshold. Consider:\n"
-            report += "- Adjusting confidence thresholds in config.yaml\n"
-            report += "- Collecting more data for robust statistical testing\n"
-            report += "- Reviewing hypothesis generation logic\n\n"
+            yield ("No insights passed the validation threshold. Consider:\n"
+                   "- Adjusting confidence thresholds in config.yaml\n"
+                   "- Collecting more data for robust statistical testing\n"
+                   "- Reviewing hypothesis generation logic\n\n")
+        
+        yield "---\n\n"
         
-        report += "---\n\n"
+        # Add creative recommendations, inline or split into per-campaign files
+        if 'creative_recommendations' in results:
+            if self.split_by_campaign:
+                yield from self._campaign_reports(results['creative_recommendations'], path, campaigns_dir)
+            else:
+                yield from CreativeGenerator.iter_recommendations_report(results['creative_recommendations'])
         
-        # Add creative recommendations
-        if self.creative_generator:
-            report += self.creative_generator.format_recommendations_report()
+        # Add spend->revenue lag
+        if results.get('spend_revenue_lag'):
+            yield LagAnalyzer.format_lag_report(results['spend_revenue_lag'])
         
-        report += """---
+        # Add ROAS outlook
+        if 'roas_forecast' in results:
+            yield Forecaster.format_forecast_report(results['roas_forecast'])
+        
+        # Add budget reallocation
+        budget = results.get('budget_allocation')
+        if budget:
+            yield BudgetOptimizer.format_budget_report(budget)
+            reallocate = (f"Move spend toward the adsets with the highest marginal ROAS "
+                          f"(expected revenue {budget['expected_uplift_pct']:+.1f}% at the same budget, see Budget Reallocation)")
+        else:
+            reallocate = "Shift spend toward high-performing creative types and platforms"
+
+        # Add charts, linked relative to this report
+        if results.get('charts'):
+            yield ChartRenderer.format_charts_report(results['charts'], path)
+
+        yield f"""---
 
 ## Recommendations
 
 Based on this analysis:
 
 1. **Refresh Creative for Low-CTR Campaigns**: Implement the suggested message variations for underperforming ads
-2. **Reallocate Budget**: Shift spend toward high-performing creative types and platforms
+2. **Reallocate Budget**: {reallocate}
 3. **Monitor Audience Fatigue**: Track ROAS trends weekly and refresh creative when decline exceeds 15%
 4. **Test New Formats**: Experiment with creative types that show higher engagement
 
@@ -212,22 +480,30 @@ Based on this analysis:
 - Review audience targeting for fatigued campaigns
 
 """
-        
-        # Write with UTF-8 encoding to handle special characters
-        with open('reports/report.md', 'w', encoding='utf-8') as f:
-            f.write(report)
-        
-        print("Saved report.md")
 
 def main():
     """Main entry point"""
-    if len(sys.argv) > 1:
-        query = ' '.join(sys.argv[1:])
+    parser = argparse.ArgumentParser(description="Kasparro Agentic Facebook Analyst")
+    parser.add_argument('query', nargs='*', help="Analysis question")
+    parser.add_argument('--force', action='store_true', help="Ignore cached results and recompute")
+    parser.add_argument('--batch', metavar='FILE',
+                        help="Answer every question in FILE (one per line) from one shared analysis")
+    parser.add_argument('--approx', action='store_true',
+                        help="Answer from a cached stratified sample with standard errors")
+    args = parser.parse_args()
+    
+    if args.query:
+        query = ' '.join(args.query)
     else:
         query = "Analyze ROAS fluctuations and recommend creative improvements"
     
     analyst = AgenticFBAnalyst()
-    analyst.run(query)
+    if args.batch:
+        with open(args.batch, 'r', encoding='utf-8') as f:
+            queries = [line.strip() for line in f if line.strip()]
+        analyst.run_batch(queries, force=args.force, approx=args.approx)
+    else:
+        analyst.run(query, force=args.force, approx=args.approx)
 
 if __name__ == "__main__":
     main()
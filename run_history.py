@@ -0,0 +1,166 @@
+"""
+Run History - Indexed SQLite store of every analysis run and the queries it answered, for cross-run trend queries
+"""
+import json
+import os
+import sqlite3
+import uuid
+from contextlib import contextmanager
+from datetime import datetime
+import pandas as pd
+
+# runs: one row per computation; queries: every query answered, linked to the run that computed its results
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS runs (
+    run_id TEXT PRIMARY KEY, timestamp TEXT, dataset TEXT, approx INTEGER,
+    total_rows INTEGER, total_spend REAL, avg_roas REAL, avg_ctr REAL, summary TEXT
+);
+CREATE TABLE IF NOT EXISTS queries (
+    run_id TEXT, timestamp TEXT, query TEXT, cached INTEGER
+);
+CREATE TABLE IF NOT EXISTS hypotheses (
+    run_id TEXT, hypothesis_id TEXT, hypothesis TEXT, priority TEXT, validation_method TEXT, evidence TEXT
+);
+CREATE TABLE IF NOT EXISTS validations (
+    run_id TEXT, hypothesis_id TEXT, validated INTEGER, confidence REAL, method TEXT, conclusion TEXT, details TEXT
+);
+CREATE TABLE IF NOT EXISTS recommendations (
+    run_id TEXT, campaign_name TEXT, adset_name TEXT, current_ctr REAL, current_roas REAL, spend REAL,
+    current_message TEXT, recommendations TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_runs_timestamp ON runs (timestamp);
+CREATE INDEX IF NOT EXISTS idx_runs_dataset ON runs (dataset, timestamp);
+CREATE INDEX IF NOT EXISTS idx_queries_run ON queries (run_id);
+CREATE INDEX IF NOT EXISTS idx_queries_query ON queries (query, timestamp);
+CREATE INDEX IF NOT EXISTS idx_hypotheses_run ON hypotheses (run_id);
+CREATE INDEX IF NOT EXISTS idx_validations_hypothesis ON validations (hypothesis_id, run_id);
+CREATE INDEX IF NOT EXISTS idx_recommendations_run ON recommendations (run_id);
+CREATE INDEX IF NOT EXISTS idx_recommendations_adset ON recommendations (campaign_name, adset_name);
+"""
+
+
+class RunHistory:
+    def __init__(self, config, encoder=None):
+        settings = config.get('history', {})
+        self.enabled = settings.get('enabled', True)
+        self.db_path = settings.get('db_path', 'logs/run_history.db')
+        self.encoder = encoder
+
+    @contextmanager
+    def connect(self):
+        os.makedirs(os.path.dirname(self.db_path) or '.', exist_ok=True)
+        con = sqlite3.connect(self.db_path)
+        try:
+            con.executescript(SCHEMA)
+            yield con
+            con.commit()
+        finally:
+            con.close()
+
+    def _json(self, value):
+        return json.dumps(value, cls=self.encoder)
+
+    def record(self, results, fingerprint, approx=False, queries=None):
+        """Append one computation's summary, hypotheses, validation results and recommendations, and the
+        queries it answered (default: results['query'])"""
+        if not self.enabled:
+            return None
+
+        run_id = uuid.uuid4().hex
+        summary = results.get('summary', {})
+        metrics = summary.get('metrics', {})
+        validations = results.get('validation_results', results.get('validated_insights', []))
+
+        with self.connect() as con:
+            con.execute("""
+                INSERT INTO runs (run_id, timestamp, dataset, approx, total_rows, total_spend, avg_roas, avg_ctr,
+                                  summary)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)""", (
+                run_id, results['timestamp'], fingerprint, int(approx),
+                summary.get('total_rows'), metrics.get('total_spend'), metrics.get('avg_roas'),
+                metrics.get('avg_ctr'), self._json(summary)
+            ))
+            con.executemany("INSERT INTO queries VALUES (?, ?, ?, 0)", [
+                (run_id, results['timestamp'], query) for query in (queries or [results['query']])
+            ])
+            con.executemany("INSERT INTO hypotheses VALUES (?, ?, ?, ?, ?, ?)", [
+                (run_id, h['id'], h['hypothesis'], h.get('priority'), h.get('validation_method'),
+                 self._json(h.get('evidence', {})))
+                for h in results.get('hypotheses', [])
+            ])
+            con.executemany("INSERT INTO validations VALUES (?, ?, ?, ?, ?, ?, ?)", [
+                (run_id, v['hypothesis_id'], int(bool(v['validated'])), float(v['confidence']), v.get('method'),
+                 v.get('conclusion'), self._json(v.get('details', {})))
+                for v in validations
+            ])
+            con.executemany("INSERT INTO recommendations VALUES (?, ?, ?, ?, ?, ?, ?, ?)", [
+                (run_id, r['campaign_name'], r['adset_name'], r['current_performance']['avg_ctr'],
+                 r['current_performance']['avg_roas'], r['current_performance']['spend'],
+                 r.get('current_message'), self._json(r.get('recommendations', [])))
+                for r in results.get('creative_recommendations', [])
+            ])
+
+        print(f"Recorded run {run_id[:8]} in {self.db_path}")
+        return run_id
+
+    def record_hit(self, query, run_id=None):
+        """Append a query answered from the result cache, linked to the run that computed it (if known)"""
+        if not self.enabled:
+            return
+        with self.connect() as con:
+            con.execute("INSERT INTO queries VALUES (?, ?, ?, 1)", (run_id, datetime.now().isoformat(), query))
+
+    def query(self, sql, params=()):
+        with self.connect() as con:
+            return pd.read_sql_query(sql, con, params=list(params))
+
+    def recent_runs(self, limit=20, dataset=None):
+        """Latest computations with the number of queries they answered (cache hits included), newest first"""
+        where = "WHERE r.dataset = ?" if dataset else ""
+        params = [dataset] if dataset else []
+        return self.query(f"""
+            SELECT r.run_id, r.timestamp, r.dataset, r.approx, r.total_rows, r.total_spend, r.avg_roas, r.avg_ctr,
+                   (SELECT COUNT(*) FROM queries q WHERE q.run_id = r.run_id) AS queries
+            FROM runs r {where} ORDER BY r.timestamp DESC LIMIT ?""", params + [limit])
+
+    def recent_queries(self, limit=20):
+        """Latest answered queries, newest first, with whether they came from the cache and their run"""
+        return self.query("""
+            SELECT q.timestamp, q.query, q.cached, q.run_id, r.dataset
+            FROM queries q LEFT JOIN runs r ON r.run_id = q.run_id
+            ORDER BY q.timestamp DESC LIMIT ?""", [limit])
+
+    def hypothesis_confidence(self, hypothesis_id, last_runs=90):
+        """Confidence and verdict of one hypothesis over the latest runs that tested it, oldest first"""
+        history = self.query("""
+            SELECT r.run_id, r.timestamp, r.dataset, v.validated, v.confidence
+            FROM validations v JOIN runs r ON r.run_id = v.run_id
+            WHERE v.hypothesis_id = ?
+            ORDER BY r.timestamp DESC LIMIT ?""", [hypothesis_id, last_runs])
+        return history.iloc[::-1].reset_index(drop=True)
+
+    def validated_insights(self, run_id):
+        """Validated hypotheses of one run"""
+        return self.query("""
+            SELECT v.hypothesis_id, h.hypothesis, v.confidence, v.conclusion
+            FROM validations v LEFT JOIN hypotheses h ON h.run_id = v.run_id AND h.hypothesis_id = v.hypothesis_id
+            WHERE v.run_id = ? AND v.validated = 1
+            ORDER BY v.hypothesis_id""", [run_id])
+
+
+if __name__ == "__main__":
+    import sys
+    import yaml
+
+    with open('config.yaml', 'r') as f:
+        config = yaml.safe_load(f)
+
+    history = RunHistory(config)
+    hypothesis_id = sys.argv[1] if len(sys.argv) > 1 else 'H2'
+    last_runs = int(sys.argv[2]) if len(sys.argv) > 2 else 90
+
+    print(history.recent_runs(10).to_string())
+    print("\nLatest queries:")
+    print(history.recent_queries(10).to_string())
+    print(f"\nConfidence of {hypothesis_id} over the last {last_runs} runs:")
+    print(history.hypothesis_confidence(hypothesis_id, last_runs).to_string())
@@ -0,0 +1,142 @@
+"""
+Shared Dataset - Zero-copy DataFrame columns in shared memory for worker processes
+"""
+import threading
+from multiprocessing import shared_memory, resource_tracker
+import numpy as np
+import pandas as pd
+
+ALIGNMENT = 8
+_attach_lock = threading.Lock()
+
+
+class _NoTracking:
+    """Stands in for resource_tracker inside multiprocessing.shared_memory while attaching"""
+    @staticmethod
+    def register(name, rtype):
+        pass
+
+
+def _code_dtype(n_categories):
+    """Smallest signed integer dtype pandas uses for categorical codes"""
+    for dtype in (np.int8, np.int16, np.int32):
+        if n_categories < np.iinfo(dtype).max:
+            return np.dtype(dtype)
+    return np.dtype(np.int64)
+
+
+class SharedDataset:
+    def __init__(self, shm, spec, owner=False):
+        self.shm = shm
+        self.spec = spec
+        self.owner = owner
+
+    @classmethod
+    def export(cls, df):
+        """Copy numeric columns, dates and categorical codes into one shared-memory block"""
+        columns = []
+        arrays = []
+        offset = 0
+
+        for name in df.columns:
+            series = df[name]
+            if pd.api.types.is_datetime64_any_dtype(series):
+                kind, categories = 'datetime', None
+                values = series.values.astype('datetime64[ns]').view(np.int64)
+            elif pd.api.types.is_numeric_dtype(series) and not pd.api.types.is_bool_dtype(series):
+                kind, categories = 'numeric', None
+                values = series.to_numpy()
+            else:
+                kind = 'category'
+                codes, uniques = pd.factorize(series)
+                categories = uniques.tolist()
+                values = codes.astype(_code_dtype(len(categories)))
+
+            values = np.ascontiguousarray(values)
+            columns.append({
+                'name': name,
+                'kind': kind,
+                'dtype': values.dtype.str,
+                'offset': offset,
+                'categories': categories
+            })
+            arrays.append(values)
+            offset += -(-values.nbytes // ALIGNMENT) * ALIGNMENT
+
+        shm = shared_memory.SharedMemory(create=True, size=max(offset, 1))
+        for meta, values in zip(columns, arrays):
+            target = np.ndarray(values.shape, dtype=values.dtype, buffer=shm.buf, offset=meta['offset'])
+            target[:] = values
+
+        spec = {'shm_name': shm.name, 'rows': len(df), 'columns': columns}
+        return cls(shm, spec, owner=True)
+
+    @classmethod
+    def attach(cls, spec):
+        """Attach to an exported block by its spec (cheap to pickle to workers)"""
+        # Only the exporting process owns the segment, so attachments stay untracked
+        try:
+            shm = shared_memory.SharedMemory(name=spec['shm_name'], track=False)
+        except TypeError:
+            # before Python 3.13: swap the tracker only as seen by shared_memory, one attach at a time
+            with _attach_lock:
+                shared_memory.resource_tracker = _NoTracking
+                try:
+                    shm = shared_memory.SharedMemory(name=spec['shm_name'])
+                finally:
+                    shared_memory.resource_tracker = resource_tracker
+        return cls(shm, spec, owner=False)
+
+    def to_frame(self):
+        """Build a DataFrame whose numeric and date columns are views over the shared block; string columns are
+        decoded to plain values (not categoricals, which would group by every category combination)"""
+        rows = self.spec['rows']
+        data = {}
+
+        for meta in self.spec['columns']:
+            values = np.ndarray((rows,), dtype=np.dtype(meta['dtype']),
+                                buffer=self.shm.buf, offset=meta['offset'])
+            values.flags.writeable = False
+            if meta['kind'] == 'datetime':
+                data[meta['name']] = values.view('datetime64[ns]')
+            elif meta['kind'] == 'category':
+                # code -1 (missing) picks the trailing None
+                data[meta['name']] = np.array(meta['categories'] + [None], dtype=object)[values]
+            else:
+                data[meta['name']] = values
+
+        return pd.DataFrame(data, copy=False)
+
+    @property
+    def nbytes(self):
+        return self.shm.size
+
+    def close(self):
+        """Detach from the block; the exporter also frees it"""
+        try:
+            self.shm.close()
+        except BufferError:
+            # Frames built by to_frame() still reference the mapping; it is released with them
+            pass
+        if self.owner:
+            self.shm.unlink()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+if __name__ == "__main__":
+    from data_agent import DataAgent
+
+    data_agent = DataAgent()
+    data_agent.load_data()
+
+    with data_agent.export_shared() as shared:
+        print(f"Exported {shared.spec['rows']} rows into {shared.nbytes:,} bytes of shared memory")
+        # a worker process would receive only shared.spec
+        attached = DataAgent.from_shared(shared.spec)
+        print(attached.aggregate(['platform', 'creative_type'], ['spend', 'revenue', 'roas']).to_string())
+        attached.shared.close()
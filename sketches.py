@@ -0,0 +1,284 @@
+"""
+Sketches - Mergeable, serializable HyperLogLog and t-digest summaries of ad data
+"""
+import base64
+import json
+import os
+import numpy as np
+import pandas as pd
+
+SUMMED_MEASURES = ['spend', 'revenue', 'impressions', 'clicks']
+DISTINCT_COLUMNS = ['campaign_name', 'adset_name']
+QUANTILE_COLUMNS = ['roas', 'ctr']
+DIMENSION_COLUMNS = {'platforms': 'platform', 'countries': 'country',
+                     'creative_types': 'creative_type', 'audience_types': 'audience_type'}
+
+
+def _bit_length(x):
+    """Vectorized bit length of uint64 values"""
+    x = x.copy()
+    length = np.zeros(len(x), dtype=np.int64)
+    for shift in (32, 16, 8, 4, 2, 1):
+        high = x >= np.uint64(1 << shift)
+        x = np.where(high, x >> np.uint64(shift), x)
+        length += high * shift
+    return length + (x > 0)
+
+
+class HyperLogLog:
+    def __init__(self, precision=12, registers=None):
+        self.precision = precision
+        self.registers = registers if registers is not None else np.zeros(1 << precision, dtype=np.uint8)
+
+    def add(self, values):
+        """Add a column of values; hashing is stable across processes and runs"""
+        values = pd.Series(values).dropna()
+        if values.empty:
+            return self
+        hashed = pd.util.hash_array(values.astype(str).to_numpy())
+        p = self.precision
+        index = (hashed >> np.uint64(64 - p)).astype(np.int64)
+        rest = hashed & np.uint64((1 << (64 - p)) - 1)
+        rank = (64 - p) - _bit_length(rest) + 1
+        np.maximum.at(self.registers, index, rank.astype(np.uint8))
+        return self
+
+    def merge(self, other):
+        """Union of two sketches of equal precision"""
+        if other.precision != self.precision:
+            raise ValueError(f"Cannot merge HyperLogLog of precision {other.precision} into {self.precision}")
+        np.maximum(self.registers, other.registers, out=self.registers)
+        return self
+
+    def count(self):
+        """Estimated number of distinct values"""
+        m = len(self.registers)
+        alpha = 0.7213 / (1 + 1.079 / m)
+        estimate = alpha * m * m / np.sum(2.0 ** -self.registers.astype(float))
+        zeros = int(np.count_nonzero(self.registers == 0))
+        # linear counting is more accurate while many registers are still empty
+        if estimate <= 2.5 * m and zeros:
+            estimate = m * np.log(m / zeros)
+        return int(round(estimate))
+
+    def to_dict(self):
+        return {'precision': self.precision,
+                'registers': base64.b64encode(self.registers.tobytes()).decode('ascii')}
+
+    @classmethod
+    def from_dict(cls, state):
+        registers = np.frombuffer(base64.b64decode(state['registers']), dtype=np.uint8).copy()
+        return cls(state['precision'], registers)
+
+
+class TDigest:
+    def __init__(self, compression=100, means=None, weights=None, vmin=np.inf, vmax=-np.inf):
+        self.compression = compression
+        self.means = np.asarray(means if means is not None else [], dtype=float)
+        self.weights = np.asarray(weights if weights is not None else [], dtype=float)
+        self.min = vmin
+        self.max = vmax
+
+    def _compress(self, means, weights):
+        """Merge sorted centroids so each cluster spans at most one unit of the k1 scale"""
+        order = np.argsort(means, kind='stable')
+        means, weights = means[order], weights[order]
+        total = weights.sum()
+        q_left = (np.cumsum(weights) - weights) / total
+        k = self.compression / (2 * np.pi) * np.arcsin(2 * q_left - 1)
+        cluster = np.floor(k - k[0]).astype(np.int64)
+
+        sums = np.bincount(cluster, weights=means * weights)
+        counts = np.bincount(cluster, weights=weights)
+        used = counts > 0
+        self.means, self.weights = sums[used] / counts[used], counts[used]
+
+    def add(self, values):
+        """Add a batch of values"""
+        values = np.asarray(values, dtype=float)
+        values = values[np.isfinite(values)]
+        if len(values) == 0:
+            return self
+        self.min = min(self.min, float(values.min()))
+        self.max = max(self.max, float(values.max()))
+        self._compress(np.concatenate([self.means, values]),
+                       np.concatenate([self.weights, np.ones(len(values))]))
+        return self
+
+    def merge(self, other):
+        """Combine with another digest"""
+        if len(other.weights) == 0:
+            return self
+        self.min, self.max = min(self.min, other.min), max(self.max, other.max)
+        self._compress(np.concatenate([self.means, other.means]),
+                       np.concatenate([self.weights, other.weights]))
+        return self
+
+    def quantile(self, q):
+        """Approximate quantile by interpolating between centroid centers"""
+        if len(self.weights) == 0:
+            return float('nan')
+        total = self.weights.sum()
+        centers = np.cumsum(self.weights) - self.weights / 2
+        positions = np.concatenate([[0.0], centers, [total]])
+        values = np.concatenate([[self.min], self.means, [self.max]])
+        return float(np.interp(q * total, positions, values))
+
+    def to_dict(self):
+        return {'compression': self.compression, 'means': self.means.tolist(),
+                'weights': self.weights.tolist(), 'min': self.min, 'max': self.max}
+
+    @classmethod
+    def from_dict(cls, state):
+        return cls(state['compression'], state['means'], state['weights'], state['min'], state['max'])
+
+
+class SummarySketch:
+    def __init__(self, config):
+        self.config = config
+        settings = config.get('sketches', {})
+        self.precision = settings.get('hll_precision', 12)
+        self.compression = settings.get('tdigest_compression', 100)
+        self.quantiles = settings.get('quantiles', [0.1, 0.5, 0.9])
+        self.additive = config.get('metrics', {}).get('additive_measures', False)
+
+        self.rows = 0
+        self.sums = {m: 0.0 for m in SUMMED_MEASURES + QUANTILE_COLUMNS}
+        self.counts = {m: 0 for m in QUANTILE_COLUMNS}
+        self.date_min = None
+        self.date_max = None
+        self.distinct = {c: HyperLogLog(self.precision) for c in DISTINCT_COLUMNS}
+        self.digests = {c: TDigest(self.compression) for c in QUANTILE_COLUMNS}
+        self.dimensions = {name: [] for name in DIMENSION_COLUMNS}
+
+    def update(self, df):
+        """Fold a chunk of rows into the sketch"""
+        if df.empty:
+            return self
+        self.rows += len(df)
+        for m in SUMMED_MEASURES + QUANTILE_COLUMNS:
+            self.sums[m] += float(df[m].sum())
+        for m in QUANTILE_COLUMNS:
+            self.counts[m] += int(df[m].notna().sum())
+
+        self.date_min = min(filter(None, [self.date_min, df['date'].min().strftime('%Y-%m-%d')]))
+        self.date_max = max(filter(None, [self.date_max, df['date'].max().strftime('%Y-%m-%d')]))
+
+        for column, hll in self.distinct.items():
+            hll.add(df[column])
+        for column, digest in self.digests.items():
+            digest.add(df[column].to_numpy(dtype=float))
+        for name, column in DIMENSION_COLUMNS.items():
+            seen = set(self.dimensions[name])
+            self.dimensions[name] += [v for v in df[column].dropna().unique().tolist() if v not in seen]
+        return self
+
+    def merge(self, other):
+        """Combine with a sketch of another chunk, partition or worker"""
+        self.rows += other.rows
+        for m in self.sums:
+            self.sums[m] += other.sums[m]
+        for m in self.counts:
+            self.counts[m] += other.counts[m]
+        self.date_min = min(filter(None, [self.date_min, other.date_min]), default=None)
+        self.date_max = max(filter(None, [self.date_max, other.date_max]), default=None)
+        for column in self.distinct:
+            self.distinct[column].merge(other.distinct[column])
+        for column in self.digests:
+            self.digests[column].merge(other.digests[column])
+        for name in self.dimensions:
+            seen = set(self.dimensions[name])
+            self.dimensions[name] += [v for v in other.dimensions[name] if v not in seen]
+        return self
+
+    def to_summary(self):
+        """Summary in the get_basic_summary layout, plus ROAS/CTR quantiles"""
+        if self.additive:
+            avg_ctr = self.sums['clicks'] / self.sums['impressions'] if self.sums['impressions'] else 0.0
+            avg_roas = self.sums['revenue'] / self.sums['spend'] if self.sums['spend'] else 0.0
+        else:
+            avg_ctr = self.sums['ctr'] / self.counts['ctr'] if self.counts['ctr'] else 0.0
+            avg_roas = self.sums['roas'] / self.counts['roas'] if self.counts['roas'] else 0.0
+
+        return {
+            "total_rows": self.rows,
+            "date_range": {
+                "start": self.date_min,
+                "end": self.date_max,
+                "days": (pd.Timestamp(self.date_max) - pd.Timestamp(self.date_min)).days if self.rows else 0
+            },
+            "metrics": {
+                "total_spend": self.sums['spend'],
+                "total_revenue": self.sums['revenue'],
+                "total_impressions": int(self.sums['impressions']),
+                "total_clicks": int(self.sums['clicks']),
+                "avg_ctr": float(avg_ctr),
+                "avg_roas": float(avg_roas),
+                "median_roas": self.digests['roas'].quantile(0.5)
+            },
+            "quantiles": {
+                column: {f"p{int(round(q * 100))}": digest.quantile(q) for q in self.quantiles}
+                for column, digest in self.digests.items()
+            },
+            "campaigns": {
+                "unique_campaigns": self.distinct['campaign_name'].count(),
+                "unique_adsets": self.distinct['adset_name'].count(),
+            },
+            "dimensions": {name: list(values) for name, values in self.dimensions.items()}
+        }
+
+    def to_dict(self):
+        return {
+            'rows': self.rows,
+            'sums': self.sums,
+            'counts': self.counts,
+            'date_min': self.date_min,
+            'date_max': self.date_max,
+            'distinct': {c: hll.to_dict() for c, hll in self.distinct.items()},
+            'digests': {c: digest.to_dict() for c, digest in self.digests.items()},
+            'dimensions': self.dimensions
+        }
+
+    @classmethod
+    def from_dict(cls, state, config):
+        sketch = cls(config)
+        sketch.rows = state['rows']
+        sketch.sums = state['sums']
+        sketch.counts = state['counts']
+        sketch.date_min = state['date_min']
+        sketch.date_max = state['date_max']
+        sketch.distinct = {c: HyperLogLog.from_dict(s) for c, s in state['distinct'].items()}
+        sketch.digests = {c: TDigest.from_dict(s) for c, s in state['digests'].items()}
+        sketch.dimensions = state['dimensions']
+        return sketch
+
+    def save(self, path):
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(self.to_dict(), f)
+
+    @classmethod
+    def load(cls, path, config):
+        with open(path, 'r', encoding='utf-8') as f:
+            return cls.from_dict(json.load(f), config)
+
+
+if __name__ == "__main__":
+    import yaml
+    from data_agent import DataAgent
+
+    with open('config.yaml', 'r') as f:
+        config = yaml.safe_load(f)
+
+    data_agent = DataAgent()
+    df = data_agent.load_data()
+
+    # sketch two halves independently, then merge as partitions or workers would
+    half = len(df) // 2
+    left = SummarySketch(config).update(df.iloc[:half])
+    right = SummarySketch.from_dict(json.loads(json.dumps(SummarySketch(config).update(df.iloc[half:]).to_dict())), config)
+    merged = left.merge(right).to_summary()
+
+    print(json.dumps({'campaigns': merged['campaigns'], 'quantiles': merged['quantiles']}, indent=2))
+    print(f"Exact: {df['campaign_name'].nunique()} campaigns, {df['adset_name'].nunique()} adsets, "
+          f"ROAS p10/p50/p90 {df['roas'].quantile([0.1, 0.5, 0.9]).round(3).tolist()}")
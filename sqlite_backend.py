@@ -0,0 +1,264 @@
+"""
+SQLite Backend - Indexed on-disk storage with aggregates pushed down into SQL
+"""
+import os
+import sqlite3
+from contextlib import contextmanager
+import pandas as pd
+from data_validator import DataValidator
+
+TABLE = 'ads'
+INDEXES = {
+    'idx_ads_date': ['date'],
+    'idx_ads_campaign_adset_date': ['campaign_name', 'adset_name', 'date'],
+    'idx_ads_platform': ['platform'],
+    'idx_ads_country': ['country'],
+    'idx_ads_creative_type': ['creative_type'],
+    'idx_ads_audience_type': ['audience_type']
+}
+SUMMED = ['spend', 'revenue', 'impressions', 'clicks', 'purchases']
+
+
+class SQLiteBackend:
+    def __init__(self, config):
+        self.config = config
+        self.db_path = config['data'].get('sqlite_path', 'data/ads.db')
+        self.chunksize = config['data'].get('sqlite_chunksize', 100000)
+        self.additive = config.get('metrics', {}).get('additive_measures', False)
+        self.where = ''
+        self.params = []
+
+    @contextmanager
+    def connect(self):
+        """New connection per call, so stages on different threads never share one"""
+        con = sqlite3.connect(self.db_path)
+        try:
+            yield con
+            con.commit()
+        finally:
+            con.close()
+
+    def query(self, sql, params=()):
+        """Run a query and pull its (aggregated) result into pandas"""
+        with self.connect() as con:
+            result = pd.read_sql_query(sql, con, params=list(params))
+        if 'date' in result.columns:
+            result['date'] = pd.to_datetime(result['date'])
+        return result
+
+    def source_fingerprint(self):
+        """Fingerprint of the source the database was built from, or None"""
+        if not os.path.exists(self.db_path):
+            return None
+        with self.connect() as con:
+            try:
+                row = con.execute("SELECT value FROM meta WHERE key = 'fingerprint'").fetchone()
+            except sqlite3.OperationalError:
+                return None
+        return row[0] if row else None
+
+    def ingest(self, chunks, fingerprint):
+        """Stream source chunks into the database, quarantining invalid rows, then index it"""
+        print(f"Building SQLite database {self.db_path}...")
+        os.makedirs(os.path.dirname(self.db_path) or '.', exist_ok=True)
+        if os.path.exists(self.db_path):
+            os.remove(self.db_path)
+
+        validation = self.config.get('validation', {}).get('enabled', False)
+        validator = DataValidator(self.config) if validation else None
+        rows = quarantined_rows = 0
+
+        with self.connect() as con:
+            for chunk in chunks:
+                chunk['date'] = pd.to_datetime(chunk['date'])
+                if validator is not None:
+                    chunk, quarantined = validator.validate(chunk)
+                    quarantined = quarantined.assign(date=quarantined['date'].dt.strftime('%Y-%m-%d'))
+                    quarantined.to_sql('quarantine', con, if_exists='append', index=False)
+                    quarantined_rows += len(quarantined)
+                chunk = chunk.assign(date=chunk['date'].dt.strftime('%Y-%m-%d'))
+                chunk.to_sql(TABLE, con, if_exists='append', index=False)
+                rows += len(chunk)
+
+            for name, columns in INDEXES.items():
+                con.execute(f"CREATE INDEX IF NOT EXISTS {name} ON {TABLE} ({', '.join(columns)})")
+            con.execute("CREATE TABLE meta (key TEXT PRIMARY KEY, value TEXT)")
+            con.executemany("INSERT INTO meta VALUES (?, ?)", [
+                ('fingerprint', fingerprint), ('rows', str(rows)), ('quarantined', str(quarantined_rows))
+            ])
+
+        print(f"Stored {rows} rows ({quarantined_rows} quarantined) with {len(INDEXES)} indexes")
+
+    def set_filters(self, start_date=None, end_date=None, platforms=None):
+        """Restrict every query to a date window and/or platforms"""
+        clauses, params = [], []
+        if start_date is not None:
+            clauses.append("date >= ?")
+            params.append(pd.Timestamp(start_date).strftime('%Y-%m-%d'))
+        if end_date is not None:
+            clauses.append("date <= ?")
+            params.append(pd.Timestamp(end_date).strftime('%Y-%m-%d'))
+        if platforms is not None:
+            clauses.append(f"platform IN ({', '.join('?' * len(platforms))})")
+            params.extend(platforms)
+        self.where = ' AND '.join(clauses)
+        self.params = params
+
+    def _where(self, *extra):
+        """WHERE clause combining the active filters with extra conditions"""
+        clauses = [c for c in (self.where,) + extra if c]
+        return f"WHERE {' AND '.join(clauses)}" if clauses else ''
+
+    def validation_report(self):
+        with self.connect() as con:
+            meta = dict(con.execute("SELECT key, value FROM meta").fetchall())
+        return {'rows_checked': int(meta['rows']) + int(meta['quarantined']),
+                'rows_quarantined': int(meta['quarantined'])}
+
+    def read_frame(self):
+        """Materialize the filtered rows for stages that need row-level data"""
+        return self.query(f"SELECT * FROM {TABLE} {self._where()} ORDER BY rowid", self.params)
+
+    def aggregate(self, keys, measures, since=None):
+        """GROUP BY in SQL (over days after since, via the date index); only one row per group comes back"""
+        columns = [f"TOTAL({m}) AS {m}" for m in SUMMED]
+        if not self.additive:
+            columns += [f"AVG({m}) AS {m}" for m in measures if m in ('ctr', 'roas')]
+        group = ', '.join(keys)
+        extra = ["date > ?"] if since is not None else []
+        params = [pd.Timestamp(since).strftime('%Y-%m-%d')] if since is not None else []
+        sql = (f"SELECT {group}, {', '.join(columns)} FROM {TABLE} {self._where(*extra)} "
+               f"GROUP BY {group} ORDER BY {group}")
+        return self.query(sql, self.params + params)
+
+    def _segment(self, column, threshold, below, *extra):
+        """WHERE clause and params selecting the rows on one side of a threshold"""
+        condition = f"{column} {'<' if below else '>='} ?"
+        return self._where(condition, *extra), self.params + [threshold]
+
+    def segment_stats(self, column, threshold, below):
+        """Row count, measure totals and mean CTR/ROAS of the rows on one side of a threshold"""
+        where, params = self._segment(column, threshold, below)
+        totals = ', '.join(f"TOTAL({m}) AS {m}" for m in SUMMED)
+        return self.query(f"SELECT COUNT(*) AS rows, {totals}, AVG(ctr) AS mean_ctr, AVG(roas) AS mean_roas "
+                          f"FROM {TABLE} {where}", params).iloc[0].astype(float)
+
+    def segment_messages(self, column, threshold, below):
+        """Rows per (creative_message, creative_type) on one side of a threshold, by first appearance"""
+        where, params = self._segment(column, threshold, below)
+        return self.query(f"""
+            SELECT creative_message, creative_type, COUNT(*) AS rows FROM {TABLE} {where}
+            GROUP BY creative_message, creative_type ORDER BY MIN(rowid)""", params)
+
+    def segment_adsets(self, column, threshold, below):
+        """Per (campaign, adset) on one side of a threshold: totals, mean CTR/ROAS and its first row's message/type"""
+        where, params = self._segment(column, threshold, below)
+        return self.query(f"""
+            SELECT g.campaign_name, g.adset_name, g.spend, g.clicks, g.impressions, g.revenue, g.ctr, g.roas,
+                   a.creative_message, a.creative_type
+            FROM (SELECT campaign_name, adset_name, MIN(rowid) AS first_row,
+                         TOTAL(spend) AS spend, TOTAL(clicks) AS clicks, TOTAL(impressions) AS impressions,
+                         TOTAL(revenue) AS revenue, AVG(ctr) AS ctr, AVG(roas) AS roas
+                  FROM {TABLE} {where} GROUP BY campaign_name, adset_name) g
+            JOIN {TABLE} a ON a.rowid = g.first_row
+            ORDER BY g.campaign_name, g.adset_name""", params)
+
+    def segment_top(self, column, threshold, below, n, by=None):
+        """The n rows with the highest value on one side of a threshold (per value of `by` when given)"""
+        if by is None:
+            where, params = self._segment(column, threshold, below)
+            return self.query(f"SELECT creative_message, {column} FROM {TABLE} {where} "
+                              f"ORDER BY {column} DESC, rowid LIMIT ?", params + [n])
+        where, params = self._segment(column, threshold, below, f"{by} IS NOT NULL")
+        return self.query(f"""
+            SELECT {by}, creative_message, {column} FROM (
+                SELECT {by}, creative_message, {column},
+                       ROW_NUMBER() OVER (PARTITION BY {by} ORDER BY {column} DESC, rowid) AS rn
+                FROM {TABLE} {where})
+            WHERE rn <= ? ORDER BY {by}, rn""", params + [n])
+
+    def group_moments(self, keys, measure):
+        """Count, mean and sample variance of a measure per group, from sums and sums of squares"""
+        keys = [keys] if isinstance(keys, str) else list(keys)
+        group = ', '.join(keys)
+        return self.query(f"""
+            SELECT {group}, COUNT({measure}) AS n, AVG({measure}) AS mean,
+                   (TOTAL({measure} * {measure}) - TOTAL({measure}) * TOTAL({measure}) / COUNT({measure}))
+                       / (COUNT({measure}) - 1) AS var
+            FROM {TABLE} {self._where()} GROUP BY {group} ORDER BY {group}""", self.params)
+
+    def creative_daily(self, keys):
+        """Spend, impressions and clicks per creative and day, with the type of the day's first row"""
+        group = ', '.join(keys)
+        # SQLite takes the bare creative_type from the row that supplies MIN(rowid)
+        daily = self.query(f"""
+            SELECT {group}, creative_type, MIN(rowid) AS first_row, TOTAL(spend) AS spend,
+                   TOTAL(impressions) AS impressions, SUM(clicks) AS clicks
+            FROM {TABLE} {self._where()} GROUP BY {group} ORDER BY {group}""", self.params)
+        return daily.drop(columns='first_row')
+
+    def campaign_roas_endpoints(self):
+        """First/last non-null ROAS by date, mean ROAS and date range per campaign"""
+        sql = f"""
+            WITH ranked AS (
+                SELECT campaign_name, roas,
+                       ROW_NUMBER() OVER (PARTITION BY campaign_name ORDER BY date, rowid) AS rn_first,
+                       ROW_NUMBER() OVER (PARTITION BY campaign_name ORDER BY date DESC, rowid DESC) AS rn_last
+                FROM {TABLE} {self._where('roas IS NOT NULL')}
+            ),
+            endpoints AS (
+                SELECT campaign_name,
+                       MAX(CASE WHEN rn_first = 1 THEN roas END) AS roas_first,
+                       MAX(CASE WHEN rn_last = 1 THEN roas END) AS roas_last
+                FROM ranked GROUP BY campaign_name
+            ),
+            stats AS (
+                SELECT campaign_name, AVG(roas) AS roas_mean, MIN(date) AS date_start, MAX(date) AS date_end
+                FROM {TABLE} {self._where()} GROUP BY campaign_name
+            )
+            SELECT s.campaign_name, e.roas_first, e.roas_last, s.roas_mean, s.date_start, s.date_end
+            FROM stats s LEFT JOIN endpoints e ON e.campaign_name = s.campaign_name
+            ORDER BY s.campaign_name
+        """
+        result = self.query(sql, self.params + self.params)
+        result['date_start'] = pd.to_datetime(result['date_start'])
+        result['date_end'] = pd.to_datetime(result['date_end'])
+        return result
+
+    def summary_stats(self):
+        """Totals, distinct counts, date range and median ROAS computed in the database"""
+        where = self._where()
+        totals = self.query(f"""
+            SELECT COUNT(*) AS rows, MIN(date) AS start, MAX(date) AS end,
+                   TOTAL(spend) AS spend, TOTAL(revenue) AS revenue,
+                   TOTAL(impressions) AS impressions, TOTAL(clicks) AS clicks,
+                   AVG(ctr) AS mean_ctr, AVG(roas) AS mean_roas, COUNT(roas) AS roas_count,
+                   COUNT(DISTINCT campaign_name) AS campaigns, COUNT(DISTINCT adset_name) AS adsets
+            FROM {TABLE} {where}""", self.params).iloc[0]
+
+        # median as the mean of the middle one or two ROAS values, like pandas
+        count = int(totals['roas_count'])
+        median = self.query(f"""
+            SELECT AVG(roas) AS median FROM (
+                SELECT roas FROM {TABLE} {self._where('roas IS NOT NULL')}
+                ORDER BY roas LIMIT ? OFFSET ?)""",
+            self.params + [2 - count % 2, (count - 1) // 2]).iloc[0]['median'] if count else float('nan')
+
+        dimensions = {}
+        for name, column in [('platforms', 'platform'), ('countries', 'country'),
+                             ('creative_types', 'creative_type'), ('audience_types', 'audience_type')]:
+            values = self.query(f"SELECT {column} FROM {TABLE} {where} GROUP BY {column} "
+                                f"ORDER BY MIN(rowid)", self.params)
+            dimensions[name] = values[column].tolist()
+
+        return totals, float(median), dimensions
+
+
+if __name__ == "__main__":
+    from data_agent import DataAgent
+
+    data_agent = DataAgent()
+    data_agent.config['data']['backend'] = 'sqlite'
+    data_agent.load_data()
+    print(data_agent.get_platform_comparison())
+    print(data_agent.detect_time_decay().head())
@@ -0,0 +1,143 @@
+"""
+Stratified Sampler - Spend-weighted stratified sample with design-based standard errors
+"""
+import hashlib
+import json
+import os
+import time
+import numpy as np
+import pandas as pd
+
+
+class StratifiedSampler:
+    def __init__(self, config):
+        self.config = config
+        settings = config.get('approx', {})
+        self.strata = settings.get('strata', ['platform', 'creative_type', 'audience_type'])
+        self.sample_size = settings.get('sample_size', 2000)
+        self.min_per_stratum = settings.get('min_per_stratum', 5)
+        self.cache_dir = settings.get('cache_dir', '.cache/samples')
+        self.seed = config.get('random_seed', 42)
+        self.info = {}
+
+    def draw(self, df):
+        """Sample each stratum in proportion to its spend; rows carry stratum id and weight N_h / n_h"""
+        stratum = df.groupby(self.strata, sort=True).ngroup().to_numpy()
+        population = np.bincount(stratum)
+        spend = np.bincount(stratum, weights=df['spend'].fillna(0).clip(lower=0).to_numpy())
+
+        share = spend / spend.sum() if spend.sum() > 0 else population / population.sum()
+        allocation = np.round(self.sample_size * share).astype(int)
+        allocation = np.minimum(np.maximum(allocation, self.min_per_stratum), population)
+
+        # simple random sample within each stratum: shuffle once, keep the first n_h of each
+        order = np.random.default_rng(self.seed).permutation(len(df))
+        rank = pd.Series(stratum[order]).groupby(stratum[order]).cumcount().to_numpy()
+        keep = np.sort(order[rank < allocation[stratum[order]]])
+
+        sample = df.iloc[keep].copy()
+        sample['stratum'] = stratum[keep]
+        sample['sample_weight'] = (population / allocation)[stratum[keep]]
+
+        self.info = {
+            'population_rows': int(len(df)),
+            'sample_rows': int(len(sample)),
+            'strata': self.strata,
+            'strata_count': int(len(population)),
+            'fraction': float(len(sample) / len(df)) if len(df) else 0.0
+        }
+        return sample.reset_index(drop=True)
+
+    def _cache_path(self, fingerprint):
+        """Sample file for this dataset and sampling/validation settings"""
+        key_material = {
+            'dataset': fingerprint,
+            'approx': {k: v for k, v in self.config.get('approx', {}).items() if k != 'cache_dir'},
+            'validation': self.config.get('validation', {}),
+            'seed': self.seed
+        }
+        key = hashlib.sha256(json.dumps(key_material, sort_keys=True, default=str).encode('utf-8')).hexdigest()
+        return os.path.join(self.cache_dir, f"{key}.pkl")
+
+    def load_or_draw(self, data_agent):
+        """Reuse the cached sample of this dataset, drawing and caching it on first use"""
+        path = self._cache_path(data_agent.dataset_fingerprint())
+        start = time.perf_counter()
+        if os.path.exists(path):
+            cached = pd.read_pickle(path)
+            self.info = cached['info']
+            print(f"Loaded cached sample of {self.info['sample_rows']} rows "
+                  f"in {(time.perf_counter() - start) * 1000:.1f} ms")
+            return cached['sample']
+
+        data_agent.load_data()
+        sample = self.draw(data_agent.df)
+        os.makedirs(self.cache_dir, exist_ok=True)
+        pd.to_pickle({'sample': sample, 'info': self.info}, path)
+        print(f"Drew {self.info['sample_rows']}/{self.info['population_rows']} rows across "
+              f"{self.info['strata_count']} strata and cached the sample")
+        return sample
+
+    @staticmethod
+    def _variance(sample, residual, groups):
+        """Stratified variance of the estimated total of residual within each domain"""
+        stratum = sample['stratum'].to_numpy()
+        n_strata, n_groups = stratum.max() + 1, groups.max() + 1
+        n = np.bincount(stratum, minlength=n_strata)
+        N = np.bincount(stratum, weights=sample['sample_weight'].to_numpy(), minlength=n_strata)
+
+        # rows outside the domain count as zeros of the stratum's residual
+        cell = groups * n_strata + stratum
+        s1 = np.bincount(cell, weights=residual, minlength=n_groups * n_strata).reshape(n_groups, n_strata)
+        s2 = np.bincount(cell, weights=residual ** 2, minlength=n_groups * n_strata).reshape(n_groups, n_strata)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            var_h = np.where(n > 1, (s2 - s1 ** 2 / n) / (n - 1), 0.0).clip(min=0)
+            term = np.where(n > 0, N ** 2 * (1 - n / N) * var_h / n, 0.0)
+        return term.sum(axis=1)
+
+    @classmethod
+    def estimate_ratio(cls, sample, numerator, denominator=None, groupby=None):
+        """Weighted ratio estimate (sum y / sum x) and its linearized standard error per group
+
+        With no denominator the ratio is the weighted mean of the numerator.
+        """
+        y = sample[numerator].fillna(0).to_numpy(dtype=float)
+        x = sample[denominator].fillna(0).to_numpy(dtype=float) if denominator else np.ones(len(sample))
+        if denominator is None:
+            x = np.where(sample[numerator].isna(), 0.0, x)
+        weight = sample['sample_weight'].to_numpy()
+        groups = (sample.groupby(groupby, sort=True).ngroup().to_numpy() if groupby is not None
+                  else np.zeros(len(sample), dtype=int))
+
+        y_total = np.bincount(groups, weights=weight * y)
+        x_total = np.bincount(groups, weights=weight * x)
+        ratio = y_total / np.where(x_total != 0, x_total, np.nan)
+        residual = y - np.nan_to_num(ratio[groups]) * x
+        se = np.sqrt(cls._variance(sample, residual, groups)) / np.where(x_total != 0, np.abs(x_total), np.nan)
+        return ratio, se
+
+    @classmethod
+    def estimate_total(cls, sample, column, groupby=None):
+        """Weighted total estimate and its standard error per group"""
+        y = sample[column].fillna(0).to_numpy(dtype=float)
+        weight = sample['sample_weight'].to_numpy()
+        groups = (sample.groupby(groupby, sort=True).ngroup().to_numpy() if groupby is not None
+                  else np.zeros(len(sample), dtype=int))
+        total = np.bincount(groups, weights=weight * y)
+        return total, np.sqrt(cls._variance(sample, y, groups))
+
+
+if __name__ == "__main__":
+    import yaml
+    from data_agent import DataAgent
+
+    with open('config.yaml', 'r') as f:
+        config = yaml.safe_load(f)
+
+    data_agent = DataAgent()
+    sampler = StratifiedSampler(config)
+    sample = sampler.load_or_draw(data_agent)
+
+    roas, se = StratifiedSampler.estimate_ratio(sample, 'revenue', 'spend')
+    print(json.dumps(sampler.info, indent=2))
+    print(f"Estimated ROAS: {roas[0]:.3f} +/- {se[0]:.3f}")
@@ -0,0 +1,101 @@
+"""
+Tests for Adset Clusterer
+"""
+import unittest
+import numpy as np
+import pandas as pd
+from data_agent import DataAgent
+from adset_clusterer import AdsetClusterer
+from evaluator import Evaluator
+
+
+class DailyAgent:
+    """Serves a fixed per-adset daily frame in place of DataAgent"""
+    def __init__(self, daily):
+        self.daily = daily
+
+    def get_time_series_data(self, metric='roas', groupby='date', since=None):
+        return self.daily
+
+
+class TestAdsetClusterer(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        """Set up test fixtures"""
+        cls.data_agent = DataAgent()
+        cls.data_agent.load_data()
+        cls.config = cls.data_agent.config
+        cls.clusterer = AdsetClusterer(cls.data_agent, cls.config)
+        cls.hypotheses = cls.clusterer.cluster_hypotheses()
+
+    def test_features_are_fixed_length_float32(self):
+        """Test one trajectory row per adset with ROAS, CTR and spend bins plus the ROAS level"""
+        features = self.clusterer.features
+        bins = self.clusterer.n_bins
+        self.assertEqual(features.dtype, np.float32)
+        self.assertEqual(features.shape, (len(self.clusterer.adsets), 3 * bins + 1))
+        self.assertTrue(np.isfinite(features).all())
+        # spend shares are scaled so each adset's bins average 1
+        np.testing.assert_allclose(features[:, 2 * bins:3 * bins].mean(axis=1), 1.0, rtol=1e-5)
+
+    def test_every_adset_is_clustered(self):
+        """Test labels come from the streamed model and clusters partition the adsets"""
+        adsets = self.clusterer.adsets
+        self.assertTrue(adsets['cluster'].between(0, self.clusterer.n_clusters - 1).all())
+        self.assertEqual(sum(c['adsets'] for c in self.clusterer.summarize()), len(adsets))
+
+    def test_clusters_become_validated_hypotheses(self):
+        """Test each cluster hypothesis is validated by the evaluator's trajectory test"""
+        self.assertGreater(len(self.hypotheses), 0)
+        evaluator = Evaluator(self.data_agent, self.config)
+        for hypothesis in self.hypotheses:
+            self.assertEqual(hypothesis['validation_method'], 'cluster_trajectory_test')
+            result = evaluator.validate_hypothesis(hypothesis)
+            self.assertEqual(result['method'], 'welch_t_test')
+            self.assertGreaterEqual(result['confidence'], 0.0)
+            self.assertLessEqual(result['confidence'], 1.0)
+
+    def test_clusters_are_tested_on_held_out_days(self):
+        """Test the evaluator's statistic comes from the odd days left out of the features"""
+        for hypothesis in self.hypotheses:
+            evidence = hypothesis['evidence']
+            self.assertIn('heldout_change_mean', evidence)
+            self.assertEqual(evidence['heldout_measured'] + evidence['rest_heldout_measured'],
+                             int(self.clusterer.adsets['heldout_change_pct'].notna().sum()))
+
+    def test_too_few_adsets_yields_no_hypotheses(self):
+        """Test a window where no adset reaches min_days returns no clusters instead of raising"""
+        data_agent = DataAgent()
+        data_agent.load_data(end_date='2025-01-03')
+        self.assertEqual(AdsetClusterer(data_agent, self.config).cluster_hypotheses(), [])
+
+    def test_zero_roas_adset_has_no_infinite_change(self):
+        """Test an adset with spend but no revenue gets a missing ROAS change, not inf"""
+        dates = pd.date_range('2025-01-01', periods=12)
+        daily = pd.concat([
+            pd.DataFrame({'campaign_name': 'c', 'adset_name': name, 'date': dates, 'spend': 10.0,
+                          'revenue': revenue, 'clicks': 5.0, 'impressions': 100.0})
+            for name, revenue in [('a', 0.0), ('b', 20.0), ('c', 30.0)]
+        ], ignore_index=True)
+        clusterer = AdsetClusterer(DailyAgent(daily), self.config)
+        clusterer.build_features()
+        changes = clusterer.adsets[['roas_change_pct', 'heldout_change_pct']].to_numpy(np.float64)
+        self.assertFalse(np.isinf(changes).any())
+        self.assertTrue(np.isnan(changes[0]).all())
+        self.assertTrue(np.isfinite(clusterer.features).all())
+
+    def test_adset_active_only_on_held_out_days_has_finite_features(self):
+        """Test an adset with no spend on the feature days still gets finite features"""
+        dates = pd.date_range('2025-01-01', periods=12)
+        daily = pd.concat([
+            pd.DataFrame({'campaign_name': 'c', 'adset_name': name, 'date': days, 'spend': 10.0,
+                          'revenue': 20.0, 'clicks': 5.0, 'impressions': 100.0})
+            for name, days in [('a', dates[1::2]), ('b', dates), ('c', dates)]
+        ], ignore_index=True)
+        clusterer = AdsetClusterer(DailyAgent(daily), self.config)
+        clusterer.build_features()
+        self.assertTrue(np.isfinite(clusterer.features).all())
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
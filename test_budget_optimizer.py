@@ -0,0 +1,104 @@
+"""
+Tests for Budget Optimizer
+"""
+import time
+import unittest
+import numpy as np
+import pandas as pd
+import yaml
+from budget_optimizer import BudgetOptimizer
+
+class SyntheticAgent:
+    """Serves a fixed (campaign, adset, date) daily frame"""
+
+    def __init__(self, daily):
+        self.daily = daily
+
+    def get_time_series_data(self, metric='roas', groupby='date'):
+        return self.daily
+
+def synthetic_daily(n_adsets, days=14, seed=0):
+    """Daily spend/revenue following revenue = a * spend^b per adset, with a little noise"""
+    rng = np.random.default_rng(seed)
+    a = rng.uniform(1, 5, n_adsets)
+    b = rng.uniform(0.3, 0.8, n_adsets)
+    spend = rng.uniform(50, 150, (n_adsets, days))
+    revenue = a[:, None] * spend ** b[:, None] * np.exp(rng.normal(0, 0.02, (n_adsets, days)))
+    adsets = np.arange(n_adsets).astype(str)
+    return pd.DataFrame({
+        'campaign_name': np.repeat(np.char.add('campaign_', (np.arange(n_adsets) // 10).astype(str)), days),
+        'adset_name': np.repeat(np.char.add('adset_', adsets), days),
+        'date': np.tile(pd.date_range('2025-01-01', periods=days), n_adsets),
+        'spend': spend.ravel(),
+        'revenue': revenue.ravel()
+    }), a, b
+
+class TestBudgetOptimizer(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        """Set up test fixtures"""
+        with open('config.yaml', 'r') as f:
+            cls.config = yaml.safe_load(f)
+        cls.daily, cls.a, cls.b = synthetic_daily(200)
+
+    def _optimizer(self, daily=None, **budget):
+        config = dict(self.config, budget=dict(self.config['budget'], **budget))
+        return BudgetOptimizer(SyntheticAgent(self.daily if daily is None else daily), config)
+
+    def test_budget_conserved_within_bounds(self):
+        """Test the allocation spends exactly the budget and keeps every adset within its bounds"""
+        optimizer = self._optimizer()
+        curves = optimizer.fit_response_curves()
+        for budget in [None, curves['current_spend'].sum() * 1.2]:
+            result = optimizer.optimize(budget)
+            allocation = optimizer.allocation
+            expected = budget if budget is not None else allocation['current_spend'].sum()
+            self.assertAlmostEqual(allocation['recommended_spend'].sum(), expected, places=4)
+            self.assertAlmostEqual(result['total_daily_budget'], expected, places=4)
+            current = allocation['current_spend']
+            self.assertTrue((allocation['recommended_spend'] >= current * optimizer.min_fraction - 1e-9).all())
+            self.assertTrue((allocation['recommended_spend'] <= current * optimizer.max_fraction + 1e-9).all())
+            self.assertGreaterEqual(result['expected_revenue'], result['current_revenue_est'])
+
+    def test_marginal_roas_equalized(self):
+        """Test adsets left between their bounds end at (nearly) the same marginal ROAS"""
+        optimizer = self._optimizer(segments=400, min_fraction=0.2, max_fraction=5.0)
+        curves = optimizer.fit_response_curves()
+        planted = self.b[curves['adset_name'].str.replace('adset_', '').astype(int)]
+        np.testing.assert_allclose(curves['b'], planted, atol=0.1)
+        optimizer.optimize()
+        allocation = optimizer.allocation
+        at_lower = allocation['recommended_spend'] <= allocation['current_spend'] * 0.2 * 1.001
+        at_upper = allocation['recommended_spend'] >= allocation['current_spend'] * 5.0 * 0.999
+        interior = allocation.loc[~at_lower & ~at_upper, 'marginal_roas']
+        self.assertGreater(len(interior), 30)
+        self.assertLess(interior.max() / interior.min() - 1, 0.05)
+        # adsets held at a bound sit on the matching side of the common marginal ROAS
+        self.assertGreater(allocation.loc[at_upper, 'marginal_roas'].min(), interior.min() * 0.95)
+        self.assertLess(allocation.loc[at_lower, 'marginal_roas'].max(), interior.max() * 1.05)
+
+    def test_explicit_zero_budget_and_flat_spend(self):
+        """Test a zero budget is not treated as unset and flat spend does not break the pooled fit"""
+        optimizer = self._optimizer()
+        result = optimizer.optimize(total_budget=0)
+        lower = optimizer.allocation['current_spend'] * optimizer.min_fraction
+        self.assertAlmostEqual(result['total_daily_budget'], lower.sum(), places=4)
+
+        flat = self.daily.assign(spend=100.0)
+        curves = self._optimizer(flat).fit_response_curves()
+        self.assertFalse(curves['b'].isna().any())
+
+        empty = self._optimizer(self.daily.iloc[:0]).optimize()
+        self.assertEqual(empty['adsets'], 0)
+
+    def test_scales_to_100k_adsets(self):
+        """Test fitting and allocating 100k adsets takes seconds"""
+        daily, _, _ = synthetic_daily(100000, days=10, seed=1)
+        start = time.perf_counter()
+        result = self._optimizer(daily).optimize()
+        self.assertEqual(result['adsets'], 100000)
+        self.assertLess(time.perf_counter() - start, 20)
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
@@ -0,0 +1,70 @@
+"""
+Tests for Chart Renderer
+"""
+import os
+import tempfile
+import unittest
+from unittest import mock
+from data_agent import DataAgent
+from chart_renderer import ChartRenderer, pool_context
+
+class TestChartRenderer(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        """Set up test fixtures"""
+        cls.data_agent = DataAgent()
+        cls.data_agent.load_data()
+        cls.config = dict(cls.data_agent.config)
+
+    def _renderer(self, chart_dir, top_campaigns=3):
+        config = dict(self.config, charts={'dir': chart_dir, 'top_campaigns': top_campaigns, 'dpi': 40})
+        return ChartRenderer(self.data_agent, config)
+
+    def test_unchanged_charts_are_reused(self):
+        """Test a second render reuses every image and writes nothing new"""
+        with tempfile.TemporaryDirectory() as chart_dir:
+            renderer = self._renderer(chart_dir)
+            charts = renderer.render()
+            self.assertEqual(len(charts), 3 + 3)
+            self.assertEqual(renderer.stats['rendered'], len(charts))
+            self.assertTrue(all(os.path.getsize(c['path']) > 0 for c in charts))
+
+            again = renderer.render()
+            self.assertEqual(renderer.stats['rendered'], 0)
+            self.assertEqual([c['path'] for c in again], [c['path'] for c in charts])
+            self.assertEqual(len(os.listdir(chart_dir)), len(charts))
+
+    def test_changed_series_rerenders_only_that_chart(self):
+        """Test a chart whose data changed gets a new image and its stale one is removed"""
+        with tempfile.TemporaryDirectory() as chart_dir:
+            renderer = self._renderer(chart_dir)
+            charts = renderer.render()
+
+            specs = renderer.build_specs()
+            roas = specs[0]['series']['roas']
+            first = next(i for i, v in enumerate(roas) if v is not None)
+            roas[first] += 1.0
+            renderer.build_specs = lambda: specs
+            again = renderer.render()
+
+            self.assertEqual(renderer.stats['rendered'], 1)
+            self.assertNotEqual(again[0]['path'], charts[0]['path'])
+            self.assertFalse(os.path.exists(charts[0]['path']))
+            self.assertEqual(len(os.listdir(chart_dir)), len(charts))
+
+    def test_pool_falls_back_to_spawn_without_forkserver(self):
+        """Test platforms without forkserver (Windows) get a spawn context instead of a ValueError"""
+        with mock.patch('multiprocessing.get_all_start_methods', return_value=['spawn']):
+            self.assertEqual(pool_context().get_start_method(), 'spawn')
+        with mock.patch('multiprocessing.get_all_start_methods', return_value=['fork', 'spawn', 'forkserver']):
+            self.assertEqual(pool_context().get_start_method(), 'forkserver')
+
+    def test_report_links_are_relative_to_report(self):
+        """Test image links resolve from the report's own directory"""
+        charts = [{'kind': 'trend', 'title': 'A', 'path': os.path.join('reports', 'charts', 'a.png')}]
+        self.assertIn('](charts/a.png)', ChartRenderer.format_charts_report(charts, 'reports/report.md'))
+        self.assertIn('](../charts/a.png)', ChartRenderer.format_charts_report(charts, 'reports/batch/q.md'))
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
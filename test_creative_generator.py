@@ -0,0 +1,76 @@
+"""
+Tests for Creative Generator
+"""
+import os
+import tempfile
+import unittest
+from data_agent import DataAgent
+from creative_generator import CreativeGenerator
+import variant_cache
+from variant_cache import VariantCache
+
+class TestCreativeGenerator(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        """Set up test fixtures"""
+        cls.data_agent = DataAgent()
+        cls.data_agent.load_data()
+        cls.config = cls.data_agent.config
+
+    def test_variants_generated_once_per_message_and_type(self):
+        """Test adsets sharing a (message, creative_type) reuse one generation"""
+        generator = CreativeGenerator(self.data_agent, self.config)
+        generator.generate_recommendations()
+
+        firsts = self.data_agent.segment_adsets('ctr', below=True)[['creative_message', 'creative_type']]
+        cache = generator.variant_cache
+        self.assertEqual(cache.misses, len(firsts.drop_duplicates()))
+        self.assertEqual(cache.hits + cache.misses, len(firsts))
+        self.assertLess(cache.misses, len(firsts))
+
+    def test_lru_eviction(self):
+        """Test the least recently used entry is evicted past max_entries"""
+        cache = VariantCache({'variant_cache': {'max_entries': 2}})
+        cache.put('a', 1)
+        cache.put('b', 2)
+        cache.get('a')
+        cache.put('c', 3)
+        self.assertEqual(list(cache.entries), ['a', 'c'])
+        self.assertIsNone(cache.get('b'))
+
+    def test_load_trims_to_max_entries(self):
+        """Test a persisted file larger than max_entries keeps only the most recently used entries"""
+        with tempfile.TemporaryDirectory() as root:
+            settings = {'persist': True, 'path': os.path.join(root, 'variants.json')}
+            cache = VariantCache({'variant_cache': settings})
+            for key in 'abcd':
+                cache.put(key, key)
+            cache.save()
+
+            small = VariantCache({'variant_cache': dict(settings, max_entries=2)})
+            self.assertEqual(list(small.entries), ['c', 'd'])
+
+    def test_key_changes_with_generator_version(self):
+        """Test bumping the generator version stops old persisted variants from matching"""
+        key = VariantCache.make_key('ctx', 'Shop now', 'Image')
+        original = variant_cache.GENERATOR_VERSION
+        try:
+            variant_cache.GENERATOR_VERSION = original + 1
+            self.assertNotEqual(VariantCache.make_key('ctx', 'Shop now', 'Image'), key)
+        finally:
+            variant_cache.GENERATOR_VERSION = original
+
+    def test_persistent_cache_serves_next_run(self):
+        """Test a persisted cache answers every generation of an identical run"""
+        with tempfile.TemporaryDirectory() as root:
+            config = dict(self.config, variant_cache={'persist': True, 'path': os.path.join(root, 'variants.json')})
+            first = CreativeGenerator(self.data_agent, config).generate_recommendations()
+
+            generator = CreativeGenerator(self.data_agent, config)
+            second = generator.generate_recommendations()
+            self.assertEqual(generator.variant_cache.misses, 0)
+            self.assertEqual(second, first)
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
@@ -0,0 +1,35 @@
+"""
+Tests for DAG Scheduler
+"""
+import time
+import unittest
+from dag_scheduler import DAGScheduler
+
+class TestDAGScheduler(unittest.TestCase):
+
+    def test_independent_stages_overlap(self):
+        """Test independent stages run concurrently and the critical path is the longest chain"""
+        scheduler = DAGScheduler(max_workers=4)
+        scheduler.add('load', lambda r: 1)
+        scheduler.add('slow', lambda r: time.sleep(0.3) or r['load'] + 1, deps=['load'])
+        scheduler.add('fast', lambda r: time.sleep(0.1) or r['load'] + 2, deps=['load'])
+        scheduler.add('after_fast', lambda r: time.sleep(0.1) or r['fast'] * 10, deps=['fast'])
+        scheduler.add('report', lambda r: (r['slow'], r['after_fast']), deps=['slow', 'after_fast'])
+        results = scheduler.run()
+
+        self.assertEqual(results['report'], (2, 30))
+        self.assertLess(scheduler.report['wall_seconds'], 0.45)
+        self.assertEqual(scheduler.report['critical_path'], ['load', 'slow', 'report'])
+
+    def test_errors_propagate(self):
+        """Test a failing stage fails the run and unknown dependencies are rejected"""
+        scheduler = DAGScheduler()
+        scheduler.add('load', lambda r: 1 / 0)
+        scheduler.add('summary', lambda r: r['load'], deps=['load'])
+        with self.assertRaises(ZeroDivisionError):
+            scheduler.run()
+        with self.assertRaises(ValueError):
+            scheduler.add('report', lambda r: None, deps=['missing'])
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
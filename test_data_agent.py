@@ -0,0 +1,130 @@
+"""
+Tests for Data Agent
+"""
+import tempfile
+import unittest
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+import pandas as pd
+from data_agent import DataAgent
+from data_validator import DataValidator
+from shared_dataset import SharedDataset
+
+
+def shared_adset_totals(spec):
+    """Worker: attach to the shared dataset and aggregate it by two keys"""
+    agent = DataAgent.from_shared(spec)
+    return agent.aggregate(['campaign_name', 'adset_name'])
+
+class TestDataAgent(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        """Set up test fixtures"""
+        cls.data_agent = DataAgent()
+        cls.data_agent.load_data()
+
+    def test_additive_ratios(self):
+        """Test CTR/ROAS are derived from summed numerators and denominators"""
+        self.addCleanup(setattr, self.data_agent, 'additive', self.data_agent.additive)
+        self.data_agent.additive = True
+        platform_stats = self.data_agent.get_platform_comparison()
+
+        expected = platform_stats['revenue'] / platform_stats['spend']
+        np.testing.assert_allclose(platform_stats['roas'], expected)
+        expected = platform_stats['clicks'] / platform_stats['impressions']
+        np.testing.assert_allclose(platform_stats['ctr'], expected)
+
+    def test_merge_chunk_aggregates(self):
+        """Test aggregates over chunks merge into the full-data aggregate"""
+        self.addCleanup(setattr, self.data_agent, 'additive', self.data_agent.additive)
+        self.data_agent.additive = True
+        full = self.data_agent.get_time_series_data(groupby='platform')
+
+        df = self.data_agent.df
+        chunks = [df.iloc[i:i + 1000].groupby('platform')[['spend', 'revenue', 'impressions', 'clicks']]
+                  .sum().reset_index() for i in range(0, len(df), 1000)]
+        merged = DataAgent.merge_aggregates(chunks, 'platform')
+
+        np.testing.assert_allclose(merged['roas'], full['roas'])
+        np.testing.assert_allclose(merged['ctr'], full['ctr'])
+
+    def test_partitioned_round_trip_and_pruning(self):
+        """Test partitioned writes, window pruning and appends"""
+        df = self.data_agent.df
+        history = df[df['date'] < '2025-03-01']
+        new_days = df[df['date'] >= '2025-03-01']
+
+        with tempfile.TemporaryDirectory() as tmpdir:
+            agent = DataAgent()
+            agent.config['data']['partition_dir'] = tmpdir
+            agent.write_partitions(df=history, by_platform=True)
+            manifest = agent.append_partitions(new_days)
+
+            self.assertEqual(sum(m['rows'] for m in manifest['partitions'].values()), len(df))
+            self.assertEqual(len(manifest['partitions']), 6)
+
+            loaded = agent.load_data()
+            self.assertEqual(len(loaded), len(df))
+
+            window = agent.load_data(start_date='2025-03-10', platforms=['Instagram'])
+            expected = df[(df['date'] >= '2025-03-10') & (df['platform'] == 'Instagram')]
+            self.assertEqual(len(window), len(expected))
+
+    def test_overlapping_append_skips_written_days(self):
+        """Test re-appending an export that overlaps written days adds only the new days"""
+        df = self.data_agent.df
+        with tempfile.TemporaryDirectory() as tmpdir:
+            agent = DataAgent()
+            agent.config['data']['partition_dir'] = tmpdir
+            agent.write_partitions(df=df[df['date'] < '2025-03-15'], by_platform=True)
+            agent.append_partitions(df[df['date'] >= '2025-03-01'])
+            manifest = agent.append_partitions(df[df['date'] >= '2025-03-01'])
+
+            self.assertEqual(sum(m['rows'] for m in manifest['partitions'].values()), len(df))
+            self.assertEqual(len(agent.load_data()), len(df))
+
+    def test_shared_dataset_workers(self):
+        """Test workers attach to the shared dataset and aggregate it like the in-process agent"""
+        with self.data_agent.export_shared() as shared:
+            with ProcessPoolExecutor(max_workers=2) as pool:
+                totals = list(pool.map(shared_adset_totals, [shared.spec] * 2))
+
+            attached = SharedDataset.attach(shared.spec)
+            frame = attached.to_frame()
+            buffer = np.frombuffer(attached.shm.buf, dtype=np.uint8)
+            self.assertTrue(np.shares_memory(frame['spend'].to_numpy(), buffer))
+            self.assertEqual(frame['platform'].tolist(), self.data_agent.df['platform'].tolist())
+            del frame, buffer
+            attached.close()
+
+        expected = self.data_agent.aggregate(['campaign_name', 'adset_name'])
+        for actual in totals:
+            pd.testing.assert_frame_equal(actual, expected, check_dtype=False)
+
+    def test_validation_quarantine(self):
+        """Test bad rows are quarantined with every failing rule as a reason code"""
+        df = self.data_agent.df.head(10).copy()
+        df = df.reset_index(drop=True)
+        df.loc[1, 'clicks'] = df.loc[1, 'impressions'] + 1
+        df.loc[2, 'roas'] = df.loc[2, 'roas'] + 1.0
+        df.loc[3, 'adset_name'] = None
+        df.loc[4, 'clicks'] = None
+        df = pd.concat([df, df.iloc[[0]]], ignore_index=True)
+
+        validator = DataValidator(self.data_agent.config)
+        clean, quarantined = validator.validate(df)
+
+        self.assertEqual(len(clean) + len(quarantined), len(df))
+        reasons = dict(zip(quarantined.index, quarantined['reason_codes']))
+        self.assertIn('clicks_exceed_impressions', reasons[1].split('|'))
+        self.assertIn('ctr_mismatch', reasons[1].split('|'))
+        self.assertEqual(reasons[2], 'roas_mismatch')
+        self.assertEqual(reasons[3], 'null_required')
+        self.assertEqual(validator.report['rules']['duplicate_key']['violations'], 1)
+        # a missing measure keeps the row; only that measure drops out of totals
+        self.assertIn(4, clean.index)
+        self.assertEqual(validator.report['null_measures']['clicks'], 1)
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
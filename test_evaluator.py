@@ -81,6 +81,22 @@ class TestEvaluator(unittest.TestCase):
                 self.config['confidence_min'],
                 f"Confidence {insight['confidence']} below threshold {self.config['confidence_min']}"
             )
+    
+    def test_time_decay_unlagged_uses_daily_series(self):
+        """Without a lag the decay slope is fitted on the campaign's daily ROAS, not per-row ROAS"""
+        config = dict(self.config, lag={'enabled': False})
+        evaluator = Evaluator(self.data_agent, config)
+        campaign = self.data_agent.df['campaign_name'].iloc[0]
+        hypothesis = {'id': 'H1', 'evidence': {'campaigns_affected': [campaign]}}
+        
+        result = evaluator._validate_time_decay(hypothesis)['details'][0]
+        
+        campaign_rows = self.data_agent.df[self.data_agent.df['campaign_name'] == campaign]
+        daily = campaign_rows.groupby('date')[['spend', 'revenue']].sum().asfreq('D', fill_value=0)
+        y = (daily['revenue'] / daily['spend'].where(daily['spend'] > 0)).dropna().values
+        expected_slope = np.polyfit(np.arange(len(y)), y, 1)[0]
+        self.assertEqual(result['lag_days'], 0)
+        self.assertAlmostEqual(result['slope'], expected_slope, places=10)
 
 if __name__ == '__main__':
     print("🧪 Running Evaluator Tests...")
@@ -0,0 +1,48 @@
+"""
+Tests for Fatigue Engine
+"""
+import unittest
+import numpy as np
+from data_agent import DataAgent
+from fatigue_engine import FatigueEngine
+
+class TestFatigueEngine(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        """Set up test fixtures"""
+        cls.data_agent = DataAgent()
+        cls.data_agent.load_data()
+        cls.engine = FatigueEngine(cls.data_agent, cls.data_agent.config)
+        cls.creatives = cls.engine.analyze().set_index(cls.engine.keys)
+
+    def test_grouped_fit_matches_polyfit(self):
+        """Test the grouped-moment CTR slope and decline match a per-creative np.polyfit"""
+        exposure = self.engine.compute_exposure()
+        exposure = exposure[exposure['ctr'].notna()]
+
+        checked = 0
+        for key, rows in exposure.groupby(self.engine.keys):
+            x = rows['cum_impressions'].to_numpy() / 1e6
+            if len(x) < 2 or np.ptp(x) == 0:
+                self.assertTrue(np.isnan(self.creatives.loc[key, 'ctr_slope_per_million']))
+                continue
+            slope = np.polyfit(x, rows['ctr'].to_numpy(), 1)[0]
+            decline = slope * np.ptp(x) / rows['ctr'].mean() * 100
+
+            self.assertAlmostEqual(self.creatives.loc[key, 'ctr_slope_per_million'], slope, places=6)
+            self.assertAlmostEqual(self.creatives.loc[key, 'ctr_decay_pct'], decline, places=4)
+            checked += 1
+        self.assertGreater(checked, 100)
+
+    def test_fatigued_flags_follow_thresholds(self):
+        """Test flagged creatives are old enough, spent enough and have a declining fit"""
+        fatigued = self.engine.get_fatigued_creatives()
+        self.assertGreater(len(fatigued), 0)
+        self.assertTrue((fatigued['age_days'] >= self.engine.fatigue_days).all())
+        self.assertTrue((fatigued['spend'] >= self.engine.min_spend).all())
+        self.assertTrue((fatigued['ctr_slope_per_million'] < 0).all())
+        self.assertTrue(fatigued['ctr_decay_pct'].is_monotonic_increasing)
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
@@ -0,0 +1,66 @@
+"""
+Tests for Forecaster
+"""
+import unittest
+import numpy as np
+import pandas as pd
+import yaml
+from forecaster import Forecaster
+
+class SyntheticAgent:
+    """Serves a fixed daily frame"""
+
+    def __init__(self, daily):
+        self.daily = daily
+
+    def get_time_series_data(self, metric='roas', groupby='date'):
+        return self.daily
+
+class TestForecaster(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        """Set up test fixtures"""
+        with open('config.yaml', 'r') as f:
+            cls.config = yaml.safe_load(f)
+
+        # two campaigns on the same ROAS = 2 + 0.02 * day trend; 'stopped' has no data for the last 10 days
+        rng = np.random.default_rng(0)
+        cls.days = 60
+        dates = pd.date_range('2025-01-01', periods=cls.days)
+        frames = []
+        for name, n_days in [('running', cls.days), ('stopped', cls.days - 10)]:
+            t = np.arange(n_days)
+            frames.append(pd.DataFrame({
+                'campaign_name': name,
+                'date': dates[:n_days],
+                'roas': 2 + 0.02 * t + rng.normal(0, 0.01, n_days),
+                'spend': 100.0
+            }))
+        cls.forecaster = Forecaster(SyntheticAgent(pd.concat(frames, ignore_index=True)), cls.config)
+        cls.result = cls.forecaster.forecast(['campaign_name'], 'roas').set_index('campaign_name')
+
+    def test_recovers_planted_trend(self):
+        """Test Holt's trend matches the planted slope and forecasts extend it"""
+        for name in ['running', 'stopped']:
+            row = self.result.loc[name]
+            self.assertAlmostEqual(row['trend'], 0.02, delta=0.003)
+            for h in self.forecaster.horizons:
+                expected = 2 + 0.02 * (self.days - 1 + h)
+                self.assertAlmostEqual(row[f'forecast_{h}d'], expected, delta=0.05)
+
+    def test_horizons_anchor_at_data_end(self):
+        """Test a series that stopped early is forecast for the same dates, from its own last day"""
+        self.assertEqual(self.result.loc['stopped', 'last_date'], pd.Timestamp('2025-02-19'))
+        self.assertEqual(self.result.loc['running', 'last_date'], pd.Timestamp('2025-03-01'))
+
+    def test_interval_widens_with_horizon(self):
+        """Test prediction intervals get wider the further ahead they reach"""
+        widths = pd.DataFrame({h: self.result[f'upper_{h}d'] - self.result[f'lower_{h}d']
+                               for h in self.forecaster.horizons})
+        self.assertTrue((widths.diff(axis=1).iloc[:, 1:] > 0).all().all())
+        # the stopped series is further from its forecast dates, so its interval is wider
+        self.assertGreater(widths.loc['stopped'].iloc[0] / widths.loc['running'].iloc[0], 1.0)
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
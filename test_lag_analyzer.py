@@ -0,0 +1,58 @@
+"""
+Tests for Lag Analyzer
+"""
+import unittest
+import numpy as np
+import pandas as pd
+from data_agent import DataAgent
+from lag_analyzer import LagAnalyzer
+
+class TestLagAnalyzer(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        """Set up test fixtures: adsets whose revenue arrives a known number of days after spend"""
+        rng = np.random.default_rng(0)
+        dates = pd.date_range('2025-01-01', periods=60)
+        rows = []
+        for i, lag in enumerate([0, 2, 5, 5]):
+            spend = rng.gamma(2, 100, len(dates))
+            revenue = np.concatenate([np.zeros(lag), 3 * spend[:len(dates) - lag]]) + rng.normal(0, 20, len(dates))
+            rows.append(pd.DataFrame({
+                'campaign_name': f"Campaign {i // 2}", 'adset_name': f"Adset {i}", 'date': dates,
+                'spend': spend, 'revenue': revenue, 'impressions': 1000.0, 'clicks': 10.0, 'purchases': 1
+            }))
+        cls.lags = {'Adset 0': 0, 'Adset 1': 2, 'Adset 2': 5, 'Adset 3': 5}
+        cls.data_agent = DataAgent()
+        cls.data_agent.df = pd.concat(rows, ignore_index=True).assign(ctr=0.01, roas=3.0)
+        cls.analyzer = LagAnalyzer(cls.data_agent, cls.data_agent.config)
+        cls.results = cls.analyzer.analyze()
+
+    def test_fft_matches_direct_correlation(self):
+        """Test the batched FFT correlation equals the direct lagged sum"""
+        rng = np.random.default_rng(1)
+        spend, revenue = rng.random((3, 40)), rng.random((3, 40))
+        cc = LagAnalyzer.cross_correlation(spend, revenue, 10)
+        x = spend[1] - spend[1].mean()
+        y = revenue[1] - revenue[1].mean()
+        direct = [(x[:40 - k] * y[k:]).sum() / np.sqrt((x ** 2).sum() * (y ** 2).sum()) for k in range(11)]
+        np.testing.assert_allclose(cc[1], direct, atol=1e-12)
+
+    def test_recovers_adset_lags_and_adjusted_roas(self):
+        """Test each adset's dominant lag is found and lag-adjusted ROAS recovers the true 3x return"""
+        adsets = self.results['adsets'].set_index('adset_name')
+        for adset, lag in self.lags.items():
+            self.assertEqual(adsets.loc[adset, 'lag_days'], lag)
+            self.assertAlmostEqual(adsets.loc[adset, 'roas_lag_adjusted'], 3.0, delta=0.1)
+        self.assertLess(adsets.loc['Adset 2', 'roas'], adsets.loc['Adset 2', 'roas_lag_adjusted'])
+        self.assertEqual(self.analyzer.summarize()['dominant_lag_days'], 5)
+
+    def test_time_decay_gets_lag_adjusted_roas(self):
+        """Test detect_time_decay carries each campaign's lag and lag-adjusted ROAS"""
+        decay = self.data_agent.detect_time_decay().set_index('campaign_name')
+        self.assertEqual(decay.loc['Campaign 1', 'lag_days'], 5)
+        self.assertIn('roas_change_pct_lag_adjusted', decay.columns)
+        self.assertAlmostEqual(decay.loc['Campaign 1', 'roas_lag_adjusted'], 3.0, delta=0.1)
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
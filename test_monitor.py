@@ -0,0 +1,102 @@
+"""
+Tests for Performance Monitor
+"""
+import os
+import copy
+import tempfile
+import unittest
+import yaml
+from data_agent import DataAgent
+from monitor import PerformanceMonitor, EWMADetector, CUSUMDetector, RollingQuantileDetector
+
+class TestMonitor(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        """Set up test fixtures"""
+        with open('config.yaml', 'r') as f:
+            cls.config = yaml.safe_load(f)
+
+        cls.data_agent = DataAgent()
+        cls.data_agent.load_data()
+
+    def _monitor(self, tmpdir):
+        config = copy.deepcopy(self.config)
+        config['monitoring']['state_file'] = os.path.join(tmpdir, 'state.json')
+        config['monitoring']['alerts_file'] = os.path.join(tmpdir, 'alerts.jsonl')
+        return PerformanceMonitor(self.data_agent, config)
+
+    def test_detectors_flag_sudden_drop(self):
+        """Test each detector flags a drop after a stable baseline"""
+        ewma = EWMADetector(warmup=5)
+        cusum = CUSUMDetector(warmup=5, h=2.0)
+        quantile = RollingQuantileDetector(window=5)
+
+        for x in [10.0, 10.5, 9.5, 10.2, 9.8, 10.1, 9.9]:
+            ewma.update(x)
+            cusum.update(x)
+            quantile.update(x)
+
+        self.assertEqual(ewma.update(2.0)['direction'], 'down')
+        self.assertEqual(cusum.update(2.0)['direction'], 'down')
+        self.assertEqual(quantile.update(2.0)['direction'], 'down')
+
+    def test_detector_state_round_trip(self):
+        """Test detectors resume identically from serialized state"""
+        original = EWMADetector(warmup=2)
+        for x in [1.0, 2.0, 3.0]:
+            original.update(x)
+        restored = EWMADetector(warmup=2, state=original.to_dict())
+        self.assertEqual(original.update(4.0), restored.update(4.0))
+        self.assertAlmostEqual(original.mean, restored.mean)
+
+    def test_incremental_update_skips_seen_days(self):
+        """Test a second run over the same export consumes no rows"""
+        with tempfile.TemporaryDirectory() as tmpdir:
+            first = self._monitor(tmpdir)
+            first.run()
+            self.assertTrue(os.path.exists(first.state_file))
+
+            second = self._monitor(tmpdir)
+            alerts = second.run()
+            self.assertEqual(len(alerts), 0)
+            self.assertEqual(set(second.state), set(first.state))
+
+    def test_update_without_new_days(self):
+        """Test an update is a no-op when the export has no day after the saved state"""
+        with tempfile.TemporaryDirectory() as tmpdir:
+            first = self._monitor(tmpdir)
+            first.update()
+            last_date = self.data_agent.df['date'].max().strftime('%Y-%m-%d')
+            for series_state in first.state.values():
+                series_state['last_date'] = last_date
+            first.save_state()
+
+            second = self._monitor(tmpdir)
+            self.assertEqual(second.update(), [])
+            self.assertEqual(second.load_state(), first.state)
+
+    def test_update_reads_only_days_after_state(self):
+        """Test an update over a later export reads only new days and matches one full pass"""
+        with tempfile.TemporaryDirectory() as full_dir, tempfile.TemporaryDirectory() as tmpdir:
+            full = self._monitor(full_dir)
+            full.update()
+
+            history = DataAgent()
+            history.load_data(end_date='2025-03-01')
+            first = self._monitor(tmpdir)
+            first.data_agent = history
+            first.run()
+            since = first._since()
+
+            latest = DataAgent()
+            second = self._monitor(tmpdir)
+            second.data_agent = latest
+            second.update()
+
+            self.assertGreater(latest.df['date'].min(), since)
+            self.assertLess(len(latest.df), len(self.data_agent.df))
+            self.assertEqual(second.state, full.state)
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
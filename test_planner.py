@@ -0,0 +1,29 @@
+"""
+Tests for Planner Agent
+"""
+import unittest
+from planner import PlannerAgent
+
+class TestPlannerAgent(unittest.TestCase):
+
+    def setUp(self):
+        """Set up test fixtures"""
+        self.planner = PlannerAgent()
+
+    def test_batch_plan_merges_tasks_and_windows(self):
+        """Test a batch is planned as the union of its tasks with one entry per distinct window"""
+        plan = self.planner.plan_batch([
+            "Analyze ROAS drop in last 7 days",
+            "ROAS decline last week",
+            "Why did ROAS fall in the past 14 days",
+            "Compare Facebook vs Instagram performance"
+        ])
+
+        self.assertEqual(len(plan['queries']), 4)
+        self.assertEqual(plan['decomposition_windows'], [7, 14])
+        self.assertEqual([t['type'] for t in plan['queries'][3]['tasks']], ['platform_comparison'])
+        self.assertFalse(plan['queries'][3]['decompose'])
+        self.assertEqual(plan['queries'][1]['tasks'], self.planner.parse_query("ROAS decline last week"))
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
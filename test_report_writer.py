@@ -0,0 +1,64 @@
+"""
+Tests for Report Writer
+"""
+import os
+import tempfile
+import unittest
+from report_writer import ReportWriter
+from creative_generator import CreativeGenerator
+
+class TestReportWriter(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        """Set up test fixtures"""
+        cls.recommendations = [{
+            'campaign_name': campaign, 'adset_name': f"Adset-{i}", 'current_message': 'Soft <cotton> & more',
+            'current_performance': {'avg_ctr': 0.01, 'avg_roas': 2.0, 'spend': 100.0},
+            'recommendations': [{'message': 'Try now', 'strategy': 'add_strong_cta', 'expected_lift': '10-15%'}],
+            'rationale': ['CTR below average']
+        } for i, campaign in enumerate(['Men | Modal', 'Women Classics', 'Men | Modal'])]
+
+    def _write(self, path, fmt, chunks):
+        with ReportWriter(path, fmt) as writer:
+            writer.writelines(chunks)
+        with open(path, 'r', encoding='utf-8') as f:
+            return f.read()
+
+    def test_markdown_is_streamed_verbatim(self):
+        """Test markdown output is exactly the chunks written, in order"""
+        chunks = list(CreativeGenerator.iter_recommendations_report(self.recommendations))
+        self.assertEqual(len(chunks), 1 + len(self.recommendations))
+        with tempfile.TemporaryDirectory() as root:
+            self.assertEqual(self._write(os.path.join(root, 'r.md'), 'markdown', chunks), ''.join(chunks))
+
+    def test_html_independent_of_chunk_boundaries(self):
+        """Test HTML is converted line by line, whatever the chunks split on"""
+        text = ("# Title\n\n**Query:** a < b  \nnext\n\n| A | B |\n|---|---|\n| x \\| y | ![c](charts/c.png) |\n\n"
+                "1. first\n   - detail\n\n2. second\n\n- [link](campaigns/x.md)\n\n---\n")
+        with tempfile.TemporaryDirectory() as root:
+            whole = self._write(os.path.join(root, 'a.html'), 'html', [text])
+            pieces = self._write(os.path.join(root, 'b.html'), 'html', [text[i:i + 7] for i in range(0, len(text), 7)])
+        self.assertEqual(whole, pieces)
+        for fragment in ['<h1>Title</h1>', '<strong>Query:</strong> a &lt; b<br>', '<th>A</th>',
+                         '<td>x | y</td>', '<img alt="c" src="charts/c.png">', '<ol start="2">',
+                         '<ul><li>detail</li></ul>', '<a href="campaigns/x.md">link</a>', '<hr>', '</body>']:
+            self.assertIn(fragment, whole)
+
+    def test_split_writes_group_files_and_index(self):
+        """Test one file per campaign plus an index linking them"""
+        groups = {}
+        for rec in self.recommendations:
+            groups.setdefault(rec['campaign_name'], []).append(rec)
+        with tempfile.TemporaryDirectory() as root:
+            index = ReportWriter.write_split(
+                groups.items(), root, 'html',
+                lambda name, recs: CreativeGenerator.iter_recommendations_report(recs, f"# {name}"), 'Campaigns'
+            )
+            self.assertEqual([entry['items'] for entry in index], [2, 1])
+            self.assertEqual(sorted(os.listdir(root)), sorted([e['file'] for e in index] + ['index.html']))
+            with open(os.path.join(root, 'index.html'), 'r', encoding='utf-8') as f:
+                self.assertIn(f'<a href="{index[0]["file"]}">Men | Modal</a>', f.read())
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
@@ -0,0 +1,127 @@
+"""
+Tests for Result Cache
+"""
+import os
+import shutil
+import tempfile
+import unittest
+import yaml
+from planner import PlannerAgent
+from result_cache import ResultCache
+
+ROOT = os.path.dirname(os.path.abspath(__file__))
+
+class TestResultCache(unittest.TestCase):
+
+    def setUp(self):
+        """Set up test fixtures"""
+        with open(os.path.join(ROOT, 'config.yaml'), 'r') as f:
+            self.config = yaml.safe_load(f)
+        self.tmp = tempfile.TemporaryDirectory()
+        self.config['cache'] = {'dir': os.path.join(self.tmp.name, 'cache')}
+        self.planner = PlannerAgent()
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_key_is_stable_across_equivalent_plans(self):
+        """Test reordered tasks and differently worded queries with the same plan share a key"""
+        tasks = self.planner.parse_query("Why did ROAS drop in the last 7 days?")
+        same = self.planner.parse_query("Explain the ROAS decline over the past 7 days")
+        key = ResultCache.make_key(tasks, self.config, 'dataset-a')
+
+        self.assertEqual(ResultCache.make_key(same, self.config, 'dataset-a'), key)
+        self.assertEqual(ResultCache.make_key(tasks[::-1], self.config, 'dataset-a'), key)
+        other_window = self.planner.parse_query("Why did ROAS drop in the last 14 days?")
+        self.assertNotEqual(ResultCache.make_key(other_window, self.config, 'dataset-a'), key)
+
+    def test_key_changes_with_dataset_and_config(self):
+        """Test a new dataset fingerprint or changed analysis settings invalidate the entry"""
+        tasks = self.planner.parse_query("Analyze ROAS")
+        key = ResultCache.make_key(tasks, self.config, 'dataset-a')
+        self.assertNotEqual(ResultCache.make_key(tasks, self.config, 'dataset-b'), key)
+
+        for section, change in [('thresholds', {'low_ctr': 0.02}), ('lag', {'max_lag_days': 7}),
+                                ('validation', {'roas_tolerance': 0.001})]:
+            config = dict(self.config, **{section: dict(self.config[section], **change)})
+            self.assertNotEqual(ResultCache.make_key(tasks, config, 'dataset-a'), key)
+        for setting, value in [('confidence_min', 0.9), ('random_seed', 7)]:
+            config = dict(self.config, **{setting: value})
+            self.assertNotEqual(ResultCache.make_key(tasks, config, 'dataset-a'), key)
+
+        # settings that do not change results keep the key
+        config = dict(self.config, scheduler={'max_workers': 1})
+        self.assertEqual(ResultCache.make_key(tasks, config, 'dataset-a'), key)
+
+    def test_lru_eviction_by_max_bytes(self):
+        """Test the least recently used entries go first once the cache exceeds max_bytes"""
+        payload = {'results': 'x' * 1000}
+        cache = ResultCache(self.config)
+        cache.put('a', payload)
+        size = cache.index['a']['size']
+        cache.max_bytes = 2 * size
+
+        cache.put('b', payload)
+        self.assertEqual(cache.get('a'), payload)
+        cache.put('c', payload)
+
+        self.assertEqual(set(cache.index), {'a', 'c'})
+        self.assertIsNone(cache.get('b'))
+        self.assertFalse(os.path.exists(cache._path('b')))
+        self.assertEqual(set(ResultCache(self.config).index), {'a', 'c'})
+
+    def _cached_analyst(self):
+        """Analyst in a scratch working directory whose cache holds one run for 'Why did ROAS drop last 7 days?'"""
+        from run import AgenticFBAnalyst
+
+        workdir = os.path.join(self.tmp.name, 'work')
+        os.makedirs(workdir)
+        shutil.copytree(os.path.join(ROOT, 'data'), os.path.join(workdir, 'data'),
+                        ignore=shutil.ignore_patterns('*.db'))
+        config_path = os.path.join(workdir, 'config.yaml')
+        with open(config_path, 'w') as f:
+            yaml.safe_dump(self.config, f)
+        self.addCleanup(os.chdir, os.getcwd())
+        os.chdir(workdir)
+
+        analyst = AgenticFBAnalyst(config_path)
+        tasks = analyst.planner.parse_query("Why did ROAS drop last 7 days?")
+        stored = {
+            'query': "Why did ROAS drop last 7 days?", 'timestamp': '2025-04-01T08:00:00', 'tasks': tasks,
+            'summary': {'total_rows': 10, 'date_range': {'start': '2025-01-01', 'end': '2025-03-31'},
+                        'metrics': {'total_spend': 100.0, 'total_revenue': 250.0, 'avg_roas': 2.5,
+                                    'avg_ctr': 0.015}},
+            'hypotheses': [], 'validated_insights': [], 'creative_recommendations': [], 'run_id': 'run-1'
+        }
+        analyst.cache.put(analyst._cache_key(tasks, False), {'results': stored})
+        return analyst, stored
+
+    def test_run_returns_cached_results_without_loading(self):
+        """Test a hit in run() renders the stored results for the new query without touching the data"""
+        analyst, stored = self._cached_analyst()
+
+        results = analyst.run("Explain why ROAS dropped over the last 7 days")
+        self.assertEqual(results['query'], "Explain why ROAS dropped over the last 7 days")
+        self.assertEqual(results['summary'], stored['summary'])
+        self.assertIsNone(analyst.data_agent.df)
+        with open(os.path.join('reports', 'report.md'), 'r', encoding='utf-8') as f:
+            self.assertIn("**Query:** Explain why ROAS dropped over the last 7 days", f.read())
+
+        queries = analyst.history.recent_queries()
+        self.assertEqual(queries[['query', 'cached', 'run_id']].values.tolist(),
+                         [["Explain why ROAS dropped over the last 7 days", 1, 'run-1']])
+        self.assertEqual(len(analyst.history.recent_runs()), 0)
+
+    def test_batch_hit_reports_its_own_query(self):
+        """Test a batch question answered from another question's cache entry is reported under its own text"""
+        analyst, stored = self._cached_analyst()
+
+        index = analyst.run_batch(["Explain why ROAS dropped over the last 7 days"])
+        self.assertTrue(index[0]['cached'])
+        with open(index[0]['report'], 'r', encoding='utf-8') as f:
+            self.assertIn("**Query:** Explain why ROAS dropped over the last 7 days", f.read())
+        self.assertEqual(analyst.cache.get(analyst._cache_key(stored['tasks'], False))['results'], stored)
+        self.assertEqual(analyst.history.recent_queries()['cached'].tolist(), [1])
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
@@ -0,0 +1,46 @@
+"""
+Tests for ROAS Decomposition
+"""
+import unittest
+import yaml
+from data_agent import DataAgent
+from roas_decomposition import ROASDecomposer
+
+class TestROASDecomposition(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        """Set up test fixtures"""
+        with open('config.yaml', 'r') as f:
+            cls.config = yaml.safe_load(f)
+
+        cls.data_agent = DataAgent()
+        cls.data_agent.load_data()
+        cls.decomposer = ROASDecomposer(cls.data_agent, cls.config)
+
+    def test_effects_sum_to_change(self):
+        """Test mix and rate effects add up to the aggregate ROAS change"""
+        for window_days in (7, 14, 30):
+            result = self.decomposer.decompose(window_days)
+            self.assertAlmostEqual(result['mix_effect'] + result['rate_effect'], result['roas_change'])
+            self.assertAlmostEqual(
+                result['current_period']['roas'] - result['previous_period']['roas'],
+                result['roas_change']
+            )
+
+    def test_drill_down_is_pruned(self):
+        """Test only children of kept branches appear and fan-out is bounded"""
+        result = self.decomposer.decompose(7)
+        hierarchy = self.decomposer.hierarchy
+        paths = {tuple(d['path'].values()) for d in result['drivers']}
+
+        for driver in result['drivers']:
+            depth = hierarchy.index(driver['level'])
+            if depth > 0:
+                self.assertIn(tuple(driver['path'].values())[:-1], paths)
+
+        top_level = [d for d in result['drivers'] if d['level'] == hierarchy[0]]
+        self.assertLessEqual(len(top_level), self.decomposer.max_children)
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
@@ -0,0 +1,59 @@
+"""
+Tests for Run History
+"""
+import os
+import tempfile
+import unittest
+from run_history import RunHistory
+
+class TestRunHistory(unittest.TestCase):
+
+    def setUp(self):
+        """Set up test fixtures"""
+        self.tmp = tempfile.TemporaryDirectory()
+        self.history = RunHistory({'history': {'db_path': os.path.join(self.tmp.name, 'history.db')}})
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def _results(self, day, confidence):
+        return {
+            'query': f"Analyze ROAS day {day}",
+            'timestamp': f"2025-03-{day:02d}T08:00:00",
+            'summary': {'total_rows': 100, 'metrics': {'total_spend': 10.0, 'avg_roas': 2.0, 'avg_ctr': 0.01}},
+            'hypotheses': [{'id': 'H2', 'hypothesis': 'Creative type affects ROAS', 'priority': 'HIGH',
+                            'validation_method': 'anova_test', 'evidence': {}}],
+            'validation_results': [{'hypothesis_id': 'H2', 'validated': confidence > 0.6,
+                                    'confidence': confidence, 'method': 'anova', 'conclusion': '', 'details': {}}],
+            'creative_recommendations': []
+        }
+
+    def test_hypothesis_confidence_over_last_runs(self):
+        """Test the confidence trend returns the latest N runs oldest first"""
+        run_ids = [self.history.record(self._results(day, day / 10), 'dataset-a') for day in range(1, 8)]
+
+        trend = self.history.hypothesis_confidence('H2', last_runs=3)
+        self.assertEqual(trend['confidence'].round(1).tolist(), [0.5, 0.6, 0.7])
+        self.assertEqual(trend['run_id'].tolist(), run_ids[-3:])
+
+        insights = self.history.validated_insights(run_ids[-1])
+        self.assertEqual(insights['hypothesis'].tolist(), ['Creative type affects ROAS'])
+        self.assertEqual(len(self.history.recent_runs(limit=5, dataset='dataset-a')), 5)
+
+    def test_batch_is_one_run_with_linked_queries_and_hits(self):
+        """Test one computation answering several queries is one run, and cache hits are logged against it"""
+        run_id = self.history.record(self._results(1, 0.7), 'dataset-a', queries=['q1', 'q2', 'q3'])
+        self.history.record_hit('q4', run_id)
+
+        runs = self.history.recent_runs()
+        self.assertEqual(runs['run_id'].tolist(), [run_id])
+        self.assertEqual(runs['queries'].tolist(), [4])
+        self.assertEqual(len(self.history.hypothesis_confidence('H2')), 1)
+
+        queries = self.history.recent_queries().sort_values('query')
+        self.assertEqual(queries['query'].tolist(), ['q1', 'q2', 'q3', 'q4'])
+        self.assertEqual(queries['cached'].tolist(), [0, 0, 0, 1])
+        self.assertEqual(set(queries['run_id']), {run_id})
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
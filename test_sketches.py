@@ -0,0 +1,86 @@
+"""
+Tests for Sketches
+"""
+import json
+import os
+import tempfile
+import unittest
+import numpy as np
+from data_agent import DataAgent, SKETCH_FILE
+from sketches import HyperLogLog, TDigest, SummarySketch
+
+class TestSketches(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        """Set up test fixtures"""
+        cls.data_agent = DataAgent()
+        cls.data_agent.load_data()
+        cls.df = cls.data_agent.df
+        cls.config = cls.data_agent.config
+
+    def test_hyperloglog_accuracy_and_merge(self):
+        """Test distinct counts stay within a few percent and merging equals the union"""
+        values = np.arange(50000).astype(str)
+        left = HyperLogLog(12).add(values[:30000])
+        right = HyperLogLog.from_dict(json.loads(json.dumps(HyperLogLog(12).add(values[20000:]).to_dict())))
+        self.assertLess(abs(left.merge(right).count() - 50000) / 50000, 0.05)
+
+        campaigns = HyperLogLog(12).add(self.df['campaign_name'])
+        self.assertLess(abs(campaigns.count() - self.df['campaign_name'].nunique()), 5)
+
+    def test_tdigest_quantiles(self):
+        """Test merged digests track exact quantiles by rank"""
+        roas = self.df['roas'].to_numpy()
+        digest = TDigest(100).add(roas[:2000]).merge(TDigest(100).add(roas[2000:]))
+        for q in (0.1, 0.5, 0.9):
+            rank = (roas <= digest.quantile(q)).mean()
+            self.assertLess(abs(rank - q), 0.01)
+
+    def test_chunked_summary_matches_full(self):
+        """Test serialized chunk sketches merge into the same summary as one pass"""
+        full = SummarySketch(self.config).update(self.df).to_summary()
+        merged = SummarySketch(self.config)
+        for start in range(0, len(self.df), 1000):
+            chunk = SummarySketch(self.config).update(self.df.iloc[start:start + 1000])
+            merged.merge(SummarySketch.from_dict(json.loads(json.dumps(chunk.to_dict())), self.config))
+        merged = merged.to_summary()
+
+        self.assertEqual(merged['total_rows'], len(self.df))
+        self.assertEqual(merged['campaigns'], full['campaigns'])
+        self.assertEqual(merged['date_range'], full['date_range'])
+        self.assertAlmostEqual(merged['metrics']['avg_roas'], full['metrics']['avg_roas'])
+        self.assertEqual(sorted(merged['dimensions']['platforms']), sorted(full['dimensions']['platforms']))
+
+    def test_partition_sketches_are_incremental(self):
+        """Test partition sketch state is stored and only new part files are folded in"""
+        with tempfile.TemporaryDirectory() as root:
+            agent = DataAgent()
+            agent.config['data']['partition_dir'] = root
+            march = self.df['date'] >= '2025-03-01'
+            agent.write_partitions(df=self.df[~march])
+            self.assertEqual(agent.sketch_partitions().rows, (~march).sum())
+
+            agent.append_partitions(self.df[march])
+            with open(os.path.join(root, 'date=2025-01', SKETCH_FILE), 'r', encoding='utf-8') as f:
+                self.assertEqual(json.load(f)['files'], ['part-00000.csv'])
+            self.assertEqual(agent.sketch_partitions().rows, len(self.df))
+
+    def test_partition_sketches_rebuild_on_settings_change(self):
+        """Test stored partition sketches are rebuilt when sketch or validation settings change"""
+        with tempfile.TemporaryDirectory() as root:
+            agent = DataAgent()
+            agent.config['data']['partition_dir'] = root
+            agent.write_partitions(df=self.df)
+            self.assertEqual(agent.sketch_partitions().rows, len(self.df))
+
+            agent.config['sketches']['hll_precision'] = 10
+            merged = agent.sketch_partitions()
+            self.assertEqual(merged.distinct['campaign_name'].precision, 10)
+            self.assertEqual(merged.rows, len(self.df))
+
+            agent.config['validation']['roas_tolerance'] = 0.0
+            self.assertLess(agent.sketch_partitions().rows, len(self.df))
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
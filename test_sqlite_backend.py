@@ -0,0 +1,126 @@
+"""
+Tests for SQLite Backend
+"""
+import os
+import tempfile
+import unittest
+import numpy as np
+import pandas as pd
+from data_agent import DataAgent
+from insight_agent import InsightAgent
+from evaluator import Evaluator
+from creative_generator import CreativeGenerator
+from roas_decomposition import ROASDecomposer
+
+class TestSQLiteBackend(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        """Set up test fixtures"""
+        cls.tmp = tempfile.TemporaryDirectory()
+        cls.pandas_agent = DataAgent()
+        cls.pandas_agent.load_data()
+
+        cls.sqlite_agent = DataAgent()
+        cls.sqlite_agent.config['data']['backend'] = 'sqlite'
+        cls.sqlite_agent.config['data']['sqlite_path'] = os.path.join(cls.tmp.name, 'ads.db')
+        cls.sqlite_agent.load_data()
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.tmp.cleanup()
+
+    def assertSummaryEqual(self, actual, expected):
+        """Equal summaries, allowing float sums to differ in the last bits (SQLite and pandas add in different orders)"""
+        self.assertEqual(actual.keys(), expected.keys())
+        for key, value in expected.items():
+            if isinstance(value, dict):
+                self.assertSummaryEqual(actual[key], value)
+            elif isinstance(value, float):
+                self.assertAlmostEqual(actual[key], value, delta=abs(value) * 1e-12)
+            else:
+                self.assertEqual(actual[key], value)
+
+    def test_pushed_down_results_match_pandas(self):
+        """Test SQL aggregates match the in-memory implementation without loading rows"""
+        self.assertSummaryEqual(self.sqlite_agent.get_basic_summary(), self.pandas_agent.get_basic_summary())
+        for method in ['get_platform_comparison', 'analyze_creative_performance']:
+            pd.testing.assert_frame_equal(getattr(self.sqlite_agent, method)().reset_index(drop=True),
+                                          getattr(self.pandas_agent, method)().reset_index(drop=True),
+                                          check_dtype=False)
+        pd.testing.assert_frame_equal(self.sqlite_agent.get_time_series_data(groupby=['platform', 'date']),
+                                      self.pandas_agent.get_time_series_data(groupby=['platform', 'date']),
+                                      check_dtype=False)
+        pd.testing.assert_frame_equal(self.sqlite_agent.detect_time_decay(),
+                                      self.pandas_agent.detect_time_decay(), check_dtype=False)
+
+        self.assertSummaryEqual(self.sqlite_agent.segment_by_performance(),
+                                self.pandas_agent.segment_by_performance())
+        for below in [True, False]:
+            for method, args in [('segment_messages', ()), ('segment_adsets', ()), ('segment_top', (3,)),
+                                 ('segment_top', (3, 'creative_type'))]:
+                pd.testing.assert_frame_equal(getattr(self.sqlite_agent, method)('ctr', below, *args),
+                                              getattr(self.pandas_agent, method)('ctr', below, *args),
+                                              check_dtype=False, rtol=1e-12)
+        for groupby in ['creative_type', 'platform', 'audience_type']:
+            pd.testing.assert_frame_equal(self.sqlite_agent.group_moments(groupby),
+                                          self.pandas_agent.group_moments(groupby), check_dtype=False, rtol=1e-9)
+        pd.testing.assert_frame_equal(self.sqlite_agent.creative_daily(), self.pandas_agent.creative_daily(),
+                                      check_dtype=False)
+        self.assertIsNone(self.sqlite_agent._df)
+
+    def test_stages_run_on_aggregates(self):
+        """Test hypotheses, validation, creatives and decomposition match pandas and never load the rows"""
+        outputs = {}
+        for name, agent in [('sqlite', self.sqlite_agent), ('pandas', self.pandas_agent)]:
+            hypotheses = InsightAgent(agent).generate_hypotheses()
+            outputs[name] = {
+                'validations': Evaluator(agent, agent.config).evaluate_all(hypotheses),
+                'creatives': CreativeGenerator(agent, agent.config).generate_recommendations(),
+                'decomposition': ROASDecomposer(agent, agent.config).decompose()
+            }
+        self.assertIsNone(self.sqlite_agent._df)
+
+        for actual, expected in zip(outputs['sqlite']['validations'], outputs['pandas']['validations']):
+            self.assertEqual((actual['hypothesis_id'], actual['validated']),
+                             (expected['hypothesis_id'], expected['validated']))
+            self.assertAlmostEqual(actual['confidence'], expected['confidence'], places=9)
+        for actual, expected in zip(outputs['sqlite']['creatives'], outputs['pandas']['creatives']):
+            self.assertSummaryEqual(actual['current_performance'], expected['current_performance'])
+            self.assertEqual(dict(actual, current_performance=None), dict(expected, current_performance=None))
+        np.testing.assert_allclose(outputs['sqlite']['decomposition']['roas_change'],
+                                   outputs['pandas']['decomposition']['roas_change'], rtol=1e-12)
+
+    def test_filters_and_materialization(self):
+        """Test load filters apply in SQL and row-level stages can still read the frame"""
+        agent = DataAgent()
+        agent.config['data'] = dict(self.sqlite_agent.config['data'])
+        agent.load_data(start_date='2025-03-01', platforms=['Instagram'])
+
+        df = self.pandas_agent.df
+        expected = df[(df['date'] >= '2025-03-01') & (df['platform'] == 'Instagram')]
+        self.assertEqual(agent.get_basic_summary()['total_rows'], len(expected))
+        self.assertEqual(len(agent.df), len(expected))
+
+    def test_rebuild_on_validation_and_partitions(self):
+        """Test the database is rebuilt from the partitions, and again when validation settings change"""
+        with tempfile.TemporaryDirectory() as tmpdir:
+            source = DataAgent()
+            source.config['data']['partition_dir'] = os.path.join(tmpdir, 'partitions')
+            df = self.pandas_agent.df
+            source.write_partitions(df=df[df['date'] < '2025-03-01'])
+
+            agent = DataAgent()
+            agent.config['data'].update(backend='sqlite', sqlite_path=os.path.join(tmpdir, 'ads.db'),
+                                        partition_dir=source.config['data']['partition_dir'])
+            agent.load_data()
+            self.assertEqual(agent.get_basic_summary()['total_rows'], (df['date'] < '2025-03-01').sum())
+            self.assertEqual(agent.validation_report['rows_quarantined'], 0)
+
+            agent.config['validation']['roas_tolerance'] = 0.0
+            agent.config['validation']['ctr_tolerance'] = 0.0
+            agent.load_data()
+            self.assertGreater(agent.validation_report['rows_quarantined'], 0)
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
@@ -0,0 +1,63 @@
+"""
+Tests for Stratified Sampler
+"""
+import tempfile
+import unittest
+import numpy as np
+import yaml
+from data_agent import DataAgent
+from stratified_sampler import StratifiedSampler
+
+class TestStratifiedSampler(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        """Set up test fixtures"""
+        with open('config.yaml', 'r') as f:
+            cls.config = yaml.safe_load(f)
+
+        cls.data_agent = DataAgent()
+        cls.data_agent.load_data()
+        cls.df = cls.data_agent.df
+
+    def test_weights_reproduce_population(self):
+        """Test stratum weights sum to the population and allocation follows spend"""
+        sample = StratifiedSampler(self.config).draw(self.df)
+        self.assertAlmostEqual(sample['sample_weight'].sum(), len(self.df))
+        self.assertLess(len(sample), len(self.df))
+
+        roas, se = StratifiedSampler.estimate_ratio(sample, 'revenue', 'spend')
+        true_roas = self.df['revenue'].sum() / self.df['spend'].sum()
+        self.assertGreater(se[0], 0)
+        self.assertLess(abs(roas[0] - true_roas), 4 * se[0])
+
+    def test_census_has_no_error(self):
+        """Test a sample covering every row gives exact answers with zero standard error"""
+        config = dict(self.config, approx=dict(self.config['approx'], sample_size=100 * len(self.df)))
+        sample = StratifiedSampler(config).draw(self.df)
+
+        totals, se = StratifiedSampler.estimate_total(sample, 'spend', groupby='platform')
+        expected = self.df.groupby('platform')['spend'].sum()
+        np.testing.assert_allclose(totals, expected.to_numpy())
+        np.testing.assert_allclose(se, 0, atol=1e-6)
+
+    def test_sample_is_cached(self):
+        """Test the approximate agent reuses the cached sample and reports standard errors"""
+        with tempfile.TemporaryDirectory() as cache_dir:
+            agent = DataAgent()
+            agent.config['approx']['cache_dir'] = cache_dir
+            first = agent.load_sample()
+
+            again = DataAgent()
+            again.config['approx']['cache_dir'] = cache_dir
+            again.load_data = None  # a cache hit must not read the full dataset
+            second = again.load_sample()
+
+            self.assertTrue(first.equals(second))
+            summary = again.get_basic_summary()
+            self.assertEqual(summary['total_rows'], len(self.df))
+            self.assertIn('avg_roas', summary['standard_errors'])
+            self.assertIn('roas_se', again.get_platform_comparison().columns)
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
@@ -0,0 +1,53 @@
+"""
+Tests for Threshold Sweep
+"""
+import unittest
+import yaml
+from data_agent import DataAgent
+from evaluator import Evaluator
+from insight_agent import InsightAgent
+from threshold_sweep import ThresholdSweep
+
+class TestThresholdSweep(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        """Set up test fixtures"""
+        with open('config.yaml', 'r') as f:
+            cls.config = yaml.safe_load(f)
+
+        cls.data_agent = DataAgent()
+        cls.data_agent.load_data()
+        cls.sweep = ThresholdSweep(cls.data_agent, cls.config)
+
+    def test_matches_single_run_segments(self):
+        """Test the sweep reproduces segment_by_performance at the configured thresholds"""
+        segments = self.data_agent.segment_by_performance()
+        ctr = self.sweep.sweep_ctr([self.config['thresholds']['low_ctr']]).iloc[0]
+        roas = self.sweep.sweep_roas([self.config['thresholds']['low_roas']]).iloc[0]
+
+        self.assertEqual(ctr['low_rows'], segments['low_ctr_ads']['rows'])
+        self.assertEqual(ctr['high_rows'], segments['high_ctr_ads']['rows'])
+        self.assertAlmostEqual(ctr['low_spend'], segments['low_ctr_ads']['spend'], places=4)
+        self.assertEqual(ctr['flagged_adsets'], len(self.data_agent.segment_adsets('ctr', below=True)))
+        self.assertEqual(roas['low_rows'], segments['low_roas_ads']['rows'])
+
+    def test_h4_outcome_matches_evaluator(self):
+        """Test the swept H4 confidence equals the Evaluator's message analysis"""
+        hypotheses = InsightAgent(self.data_agent).generate_hypotheses()
+        h4 = next(h for h in hypotheses if h['id'] == 'H4')
+        expected = Evaluator(self.data_agent, self.config).validate_hypothesis(h4)
+
+        ctr = self.sweep.sweep_ctr([self.config['thresholds']['low_ctr']]).iloc[0]
+        self.assertAlmostEqual(ctr['h4_confidence'], expected['confidence'])
+        self.assertEqual(bool(ctr['h4_validated']), expected['validated'])
+
+    def test_grid_is_monotonic(self):
+        """Test larger thresholds never shrink the low segment"""
+        result = self.sweep.sweep_ctr()
+        self.assertEqual(len(result), self.config['sweep']['ctr']['num'])
+        self.assertTrue(result['low_rows'].is_monotonic_increasing)
+        self.assertTrue(result['low_spend'].is_monotonic_increasing)
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
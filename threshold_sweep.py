@@ -0,0 +1,126 @@
+"""
+Threshold Sweep - Evaluate a grid of low_ctr/low_roas thresholds in one sorted pass
+"""
+import json
+import os
+import numpy as np
+import pandas as pd
+
+
+class ThresholdSweep:
+    def __init__(self, data_agent, config):
+        self.data_agent = data_agent
+        self.config = config
+        self.settings = config.get('sweep', {})
+        self.results = {}
+
+    def _grid(self, metric, grid=None):
+        """Threshold grid from the argument, config.yaml, or around the configured threshold"""
+        if grid is not None:
+            return np.asarray(grid, dtype=float)
+        spec = self.settings.get(metric)
+        if spec:
+            return np.linspace(spec['start'], spec['stop'], spec['num'])
+        base = self.config['thresholds'][f'low_{metric}']
+        return np.linspace(base * 0.5, base * 1.5, 101)
+
+    @staticmethod
+    def _prefix(values):
+        """Cumulative sums with a leading zero, so prefix[k] sums the first k values"""
+        return np.concatenate([[0.0], np.cumsum(values)])
+
+    def _sweep(self, metric, grid):
+        """Segment sizes, spend covered and flagged adsets for every threshold"""
+        df = self.data_agent.df
+        valid = df[df[metric].notna()]
+        order = np.argsort(valid[metric].to_numpy(), kind='stable')
+        values = valid[metric].to_numpy()[order]
+        spend = valid['spend'].fillna(0).to_numpy()[order]
+
+        # rows with metric < threshold are "low", matching segment_by_performance
+        low_rows = np.searchsorted(values, grid, side='left')
+        spend_prefix = self._prefix(spend)
+        total_spend = spend_prefix[-1]
+
+        # an adset gets a recommendation as soon as one of its rows is low
+        adset_min = np.sort(valid.groupby(['campaign_name', 'adset_name'])[metric].min().to_numpy())
+        flagged_adsets = np.searchsorted(adset_min, grid, side='left')
+
+        result = pd.DataFrame({
+            'threshold': grid,
+            'low_rows': low_rows,
+            'high_rows': len(values) - low_rows,
+            'low_spend': spend_prefix[low_rows],
+            'low_spend_share': spend_prefix[low_rows] / total_spend if total_spend else np.nan,
+            'flagged_adsets': flagged_adsets
+        })
+        return result, valid, order, low_rows
+
+    def sweep_ctr(self, grid=None):
+        """Sweep low_ctr, including the H4 message-length outcome per threshold"""
+        grid = self._grid('ctr', grid)
+        result, valid, order, low_rows = self._sweep('ctr', grid)
+
+        # H4 compares mean message length of low- vs high-CTR rows
+        lengths = valid['creative_message'].str.len().to_numpy(dtype=float)[order]
+        length_prefix = self._prefix(lengths)
+        n = len(lengths)
+        with np.errstate(invalid='ignore', divide='ignore'):
+            low_len = length_prefix[low_rows] / low_rows
+            high_len = (length_prefix[-1] - length_prefix[low_rows]) / (n - low_rows)
+        length_diff = np.abs(low_len - high_len)
+
+        top_n = self.config['agents']['top_creative_samples']
+        result['recommendations'] = np.minimum(result['flagged_adsets'], top_n)
+        result['h4_generated'] = low_rows > 0
+        result['h4_length_diff'] = length_diff
+        result['h4_confidence'] = np.minimum(length_diff / 50, 1.0)
+        result['h4_validated'] = length_diff > 10
+
+        self.results['ctr'] = result
+        return result
+
+    def sweep_roas(self, grid=None):
+        """Sweep low_roas"""
+        grid = self._grid('roas', grid)
+        result, _, _, _ = self._sweep('roas', grid)
+        self.results['roas'] = result
+        return result
+
+    def run(self):
+        """Sweep both thresholds"""
+        if self.data_agent.df is None:
+            self.data_agent.load_data()
+
+        print("\nSweeping performance thresholds...")
+        ctr = self.sweep_ctr()
+        roas = self.sweep_roas()
+        print(f"Evaluated {len(ctr)} CTR and {len(roas)} ROAS thresholds")
+        return self.results
+
+    def save(self, path=None):
+        """Save sweep tables as JSON records"""
+        reports_dir = self.config['outputs']['reports_dir']
+        path = path or os.path.join(reports_dir, 'threshold_sweep.json')
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump({metric: json.loads(table.to_json(orient='records'))
+                       for metric, table in self.results.items()}, f, indent=2)
+        print(f"Saved {path}")
+
+
+if __name__ == "__main__":
+    import yaml
+    from data_agent import DataAgent
+
+    with open('config.yaml', 'r') as f:
+        config = yaml.safe_load(f)
+
+    data_agent = DataAgent()
+    data_agent.load_data()
+
+    sweep = ThresholdSweep(data_agent, config)
+    results = sweep.run()
+    sweep.save()
+    print(results['ctr'].iloc[::10].to_string(index=False))
@@ -0,0 +1,65 @@
+"""
+Variant Cache - Bounded LRU memo of creative variants and rationale, optionally persisted across runs
+"""
+import hashlib
+import json
+import os
+from collections import OrderedDict
+
+# bump whenever CreativeGenerator changes how variants or rationale are built, so persisted entries are not reused
+GENERATOR_VERSION = 1
+
+
+class VariantCache:
+    def __init__(self, config):
+        settings = config.get('variant_cache', {})
+        self.max_entries = settings.get('max_entries', 10000)
+        self.persist = settings.get('persist', False)
+        self.path = settings.get('path', '.cache/creatives/variants.json')
+        self.entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        if self.persist:
+            self.load()
+
+    @staticmethod
+    def make_key(context, message, creative_type):
+        """Key of one (message, creative_type) under a run context (patterns and top messages) and generator version"""
+        encoded = json.dumps([GENERATOR_VERSION, context, message, creative_type], ensure_ascii=False).encode('utf-8')
+        return hashlib.sha256(encoded).hexdigest()
+
+    @staticmethod
+    def fingerprint(value):
+        """Stable hash of the inputs every variant of a run depends on"""
+        return hashlib.sha256(json.dumps(value, sort_keys=True, default=str).encode('utf-8')).hexdigest()
+
+    def get(self, key):
+        """Cached value (most recently used from now on), or None"""
+        if key not in self.entries:
+            self.misses += 1
+            return None
+        self.entries.move_to_end(key)
+        self.hits += 1
+        return self.entries[key]
+
+    def put(self, key, value):
+        """Store value and evict least recently used entries beyond max_entries"""
+        self.entries[key] = value
+        self.entries.move_to_end(key)
+        while len(self.entries) > self.max_entries:
+            self.entries.popitem(last=False)
+
+    def load(self):
+        """Read persisted entries, keeping only the max_entries most recently used"""
+        if os.path.exists(self.path):
+            with open(self.path, 'r', encoding='utf-8') as f:
+                entries = json.load(f)
+            self.entries = OrderedDict(entries[-self.max_entries:] if self.max_entries > 0 else [])
+
+    def save(self):
+        """Write entries in LRU order (oldest first) when persistence is on"""
+        if not self.persist:
+            return
+        os.makedirs(os.path.dirname(self.path) or '.', exist_ok=True)
+        with open(self.path, 'w', encoding='utf-8') as f:
+            json.dump(list(self.entries.items()), f, ensure_ascii=False)